@@ -0,0 +1,65 @@
+"""
+Скорость построения моделей request_map из элементов страницы списка
+с чтением полей path и size.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.decode_bench [количество_элементов]
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+from Disk.rest_api import FileShort
+
+
+def listing_item(index: int) -> dict:
+    return {
+        "antivirus_status": "clean",
+        "file": f"https://downloader.disk.yandex.ru/disk/{index:08x}",
+        "size": 1024 + index,
+        "comment_ids": {"private_resource": f"{index}", "public_resource": f"{index}"},
+        "exif": {"date_time": "2019-08-13T12:52:22+00:00"},
+        "resource_id": f"4000000000:{index:064x}",
+        "name": f"photo_{index}.jpg",
+        "created": "2019-08-13T12:52:22+00:00",
+        "modified": "2019-08-13T12:52:22+00:00",
+        "path": f"disk:/Фотокамера/photo_{index}.jpg",
+        "md5": f"{index:032x}",
+        "sha256": f"{index:064x}",
+        "type": "file",
+        "mime_type": "image/jpeg",
+        "media_type": "image",
+        "revision": 1565700742 + index,
+    }
+
+
+def measure(
+        name: str, items: list[dict], timestamps: str = "datetime", lazy_fields: bool = False
+):
+    # Модели берут настройки из request.disk, сети бенчмарк не касается
+    request = SimpleNamespace(
+        disk=SimpleNamespace(timestamps=timestamps, lazy_fields=lazy_fields)
+    )
+    started = time.perf_counter()
+    for item in items:
+        resource = FileShort(request, item)
+        # Типичный узкий обход списка: читаются только путь и размер
+        resource.path, resource.size
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {len(items)} items, {elapsed:6.2f} s, {len(items) / elapsed:12,.0f} objects/s")
+
+
+def main(count: int = 100_000):
+    items = [listing_item(index) for index in range(count)]
+    measure("FileShort", items)
+    measure("FileShort, timestamps=epoch", items, "epoch")
+    measure("FileShort, timestamps=string", items, "string")
+    measure("FileShort, lazy_fields", items, lazy_fields=True)
+    # Без полей дат: видна стоимость самого разбора словаря, без парсера дат
+    for item in items:
+        del item["created"], item["modified"], item["exif"]
+    measure("FileShort, without dates", items)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,48 @@
+"""
+Скорость разбора JSON большой страницы списка разными разборщиками.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.json_bench [файл_с_сохранённым_ответом.json]
+
+Без файла разбирается синтетическая страница files() из 1000 элементов.
+"""
+import json
+import sys
+import time
+
+from Benchmarks.decode_bench import listing_item
+from Disk import jsonlib
+
+
+def captured_page(pathname: str = None) -> bytes:
+    if pathname is not None:
+        with open(pathname, "rb") as f:
+            return f.read()
+    items = [listing_item(index) for index in range(1000)]
+    return json.dumps({"items": items, "limit": 1000, "offset": 0}).encode()
+
+
+def measure(name: str, decode: jsonlib.Decoder, page: bytes, repeat: int = 50):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        decode(page)
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{name:<24} {elapsed * 1000:8.2f} ms/page {len(page) / elapsed / 2 ** 20:8.0f} MB/s")
+
+
+def main(pathname: str = None):
+    page = captured_page(pathname)
+    print(f"page: {len(page)} bytes")
+    # Так разбирает requests.Response.json(): сначала байты в str, затем json.loads
+    measure("response.json()", lambda content: json.loads(content.decode("utf-8")), page)
+    for name in jsonlib.BACKENDS:
+        try:
+            decode = jsonlib.get_decoder(name)
+        except ImportError:
+            print(f"{name:<24} not installed")
+            continue
+        measure(name, decode, page)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
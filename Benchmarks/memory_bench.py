@@ -0,0 +1,46 @@
+"""
+Память на один элемент списка: обычные модели request_map, compact() и Columns.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.memory_bench [количество_элементов]
+"""
+import sys
+import tracemalloc
+
+from Benchmarks.decode_bench import listing_item
+from Disk.columnar import Columns
+from Disk.rest_api import FileShort, compact
+
+
+def measure(name: str, item_type: type, items: list[dict]):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [item_type(None, item) for item in items]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{name:<24} {(after - before) / len(objects):8.0f} bytes/item")
+
+
+def measure_columns(items: list[dict]):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    columns = Columns().extend(items)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{'Columns':<24} {(after - before) / len(columns):8.0f} bytes/item")
+
+
+def main(count: int = 20_000):
+    items = [listing_item(index) for index in range(count)]
+    measure("FileShort", FileShort, items)
+    measure("compact(FileShort)", compact(FileShort), items)
+    measure_columns(items)
+    # Без полей дат: видна стоимость самого объекта, без объектов datetime и tzinfo
+    for item in items:
+        del item["created"], item["modified"], item["exif"]
+    measure("FileShort, no dates", FileShort, items)
+    measure("compact, no dates", compact(FileShort), items)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""
+Локальная заглушка REST API Диска для бенчмарков.
+
+Отвечает по HTTP/1.1 с keep-alive, поэтому на ней видна разница
+между новым соединением на каждый вызов и пулом соединений.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = json.dumps(
+        {
+            "path": "disk:/stub",
+            "type": "dir",
+            "name": "stub",
+            "revision": 1,
+            "_embedded": {"items": [], "limit": 20, "offset": 0, "total": 0},
+        }
+    ).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        ...
+
+
+class StubServer:
+    def __init__(self, handler: type[BaseHTTPRequestHandler] = StubHandler):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,115 @@
+"""
+Скорость передачи и количество выделений буферов на ГБ: обычный режим против zero_copy.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.transfer_bench [размер_МиБ]
+
+Сервер загрузки заменён локальной заглушкой, поэтому замеряется стоимость на стороне клиента.
+Выделения считаются по блокам данных: в обычном режиме каждый блок - новый bytes,
+в режиме zero_copy - буферы пула (BufferPool.allocated), для mmap - ни одного.
+"""
+import os
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler
+
+from Benchmarks.stub_server import StubServer
+from Disk import buffers
+from Disk.transport import Transport
+from Disk.upload import _FileReader
+
+BLOB = b""
+
+
+class TransferHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BLOB)))
+        self.end_headers()
+        view = memoryview(BLOB)
+        for start in range(0, len(view), 1 << 20):
+            self.wfile.write(view[start:start + (1 << 20)])
+
+    def do_PUT(self):
+        remaining = int(self.headers["Content-Length"])
+        buffer = bytearray(1 << 20)
+        while remaining:
+            remaining -= self.rfile.readinto(memoryview(buffer)[: min(remaining, len(buffer))])
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        ...
+
+
+def report(name: str, size: int, seconds: float, allocations: int):
+    gigabytes = size / (1 << 30)
+    print(
+        f"{name:<28} {size / (1 << 20) / seconds:9.1f} MB/s"
+        f"   {allocations / gigabytes:10.0f} allocations/GB"
+    )
+
+
+def download_default(transport, url, pathname) -> int:
+    allocations = 0
+    with transport.get(url, stream=True) as r, open(pathname, "wb") as f:
+        for chunk in r.iter_content(chunk_size=8192):
+            f.write(chunk)
+            allocations += 1
+    return allocations
+
+
+def download_zero_copy(transport, url, pathname) -> int:
+    pool = buffers.BufferPool(buffers.default_chunk_size(pathname))
+    with transport.get(url, stream=True) as r, open(pathname, "wb") as f:
+        for chunk in buffers.iter_into(r, pool):
+            f.write(chunk)
+    return pool.allocated
+
+
+def upload(transport, url, pathname, reader_type, chunk_size) -> int:
+    size = os.path.getsize(pathname)
+    with open(pathname, "rb") as f:
+        reader = reader_type(f, 0, size, chunk_size)
+        transport.put(url, data=reader).raise_for_status()
+        if isinstance(reader, buffers.MmapReader):
+            reader.close()
+            return 0
+    return -(-size // chunk_size)
+
+
+def timed(fn, *args) -> tuple[float, int]:
+    started = time.perf_counter()
+    allocations = fn(*args)
+    return time.perf_counter() - started, allocations
+
+
+def main(size_mb: int = 512):
+    global BLOB
+    BLOB = os.urandom(1 << 20) * size_mb
+    size = len(BLOB)
+    with StubServer(TransferHandler) as server, Transport() as transport, \
+            tempfile.TemporaryDirectory() as directory:
+        url = server.url + "/blob"
+        pathname = os.path.join(directory, "blob")
+
+        report("download, iter_content 8K", size, *timed(download_default, transport, url, pathname))
+        report("download, zero_copy", size, *timed(download_zero_copy, transport, url, pathname))
+        report(
+            "upload, read() 1M", size,
+            *timed(upload, transport, url, pathname, _FileReader, 1 << 20),
+        )
+        report(
+            "upload, zero_copy mmap", size,
+            *timed(upload, transport, url, pathname, buffers.MmapReader,
+                   buffers.default_chunk_size(pathname)),
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
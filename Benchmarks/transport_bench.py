@@ -0,0 +1,55 @@
+"""
+Задержка одного вызова API: requests.request на каждый вызов против общего Transport.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.transport_bench [количество_вызовов]
+
+Заглушка работает по http без TLS, поэтому реальный выигрыш против
+cloud-api.yandex.net больше: там каждый новый вызов платит ещё и за TLS-рукопожатие.
+"""
+import statistics
+import sys
+import time
+
+import requests
+
+from Benchmarks.stub_server import StubServer
+from Disk.transport import Transport
+
+
+def measure(call, count: int) -> list[float]:
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = call()
+        response.json()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1e6
+    p99 = timings[int(len(timings) * 0.99) - 1] * 1e6
+    mean = statistics.fmean(timings) * 1e6
+    print(f"{name:<22} mean {mean:8.1f} us   p50 {p50:8.1f} us   p99 {p99:8.1f} us")
+
+
+def main(count: int = 2000):
+    with StubServer() as server:
+        url = server.url + "/v1/disk/resources"
+        params = {"path": "/stub"}
+
+        report(
+            "requests.request",
+            measure(lambda: requests.request("GET", url, params=params), count),
+        )
+        with Transport(base_url=server.url) as transport:
+            report(
+                "Transport (pooled)",
+                measure(lambda: transport.request("GET", url, params=params), count),
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
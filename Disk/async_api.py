@@ -0,0 +1,730 @@
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import typing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+import aiohttp
+
+from py_utils.utils import args_asdict
+
+from . import jsonlib
+from .rest_api import (
+    DiskInfo,
+    ErrorInfo,
+    FilesResourceList,
+    LastUploadedResourceList,
+    Link,
+    PublicResource,
+    PublicResourcesList,
+    Request,
+    RequestError,
+    Resource,
+    ResourceLike,
+    ResourceShort,
+    ResourceUploadLink,
+    TrashResource,
+    _find_root_items,
+    _model,
+    fields_type,
+    href,
+    http_method,
+)
+from .page_cache import PageCache
+from .timestamps import TimestampMode
+from .transport import API_BASE_URL
+
+
+class AsyncTransport:
+    """
+    Асинхронный HTTP-транспорт: одна aiohttp.ClientSession с пулом соединений
+    и семафор, ограничивающий количество одновременных запросов.
+    """
+
+    base_url: str
+    timeout: float | None
+
+    def __init__(
+            self,
+            *,
+            base_url: str = API_BASE_URL,
+            max_concurrency: int = 100,
+            pool_maxsize: int = 100,
+            pool_maxsize_per_host: int = 0,
+            timeout: float | None = 60,
+    ):
+        """
+        Parameters
+        ----------
+        base_url : Адрес REST API
+        max_concurrency : Максимальное количество одновременных запросов
+        pool_maxsize : Максимальное количество соединений в пуле
+        pool_maxsize_per_host : Максимальное количество соединений с одним хостом, 0 - без ограничения
+        timeout : Таймаут запроса по умолчанию, секунды
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        self.pool_maxsize_per_host = pool_maxsize_per_host
+        self._semaphore = None
+        self._session = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Сессия создаётся внутри работающего цикла событий
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize, limit_per_host=self.pool_maxsize_per_host
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    @contextlib.asynccontextmanager
+    async def request(
+            self, method: str, url: str, *, timeout: float = None, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Выполнить запрос, не превышая max_concurrency одновременных запросов
+
+        Parameters
+        ----------
+        method : HTTP-метод
+        url : Полный URL
+        timeout : Таймаут этого вызова, секунды
+        kwargs : Остальные аргументы aiohttp.ClientSession.request
+        """
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        async with self.semaphore:
+            async with self.session.request(method, url, **kwargs) as response:
+                yield response
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class AsyncRequest(Request):
+    """
+    Запрос к API, выполняемый в цикле событий.
+    Создаётся без обращения к сети, выполняется через await request
+    """
+
+    disk: "AsyncDisk"
+
+    def __init__(
+            self,
+            disk: "AsyncDisk",
+            method: http_method,
+            href_api: href,
+            params: dict,
+            body=None,
+            timeout: float = None,
+    ):
+        self._setup(disk, method, href_api, params, body, timeout)
+
+    async def execute(self) -> "AsyncRequest":
+        if not self.executed:
+            self.response_body = await self._get()
+        return self
+
+    def __await__(self):
+        return self.execute().__await__()
+
+    async def _get(
+            self,
+            params: dict = None,
+    ) -> dict[str, ...]:
+
+        if params is None:
+            params = self.params
+
+        return (await self._fetch(params))[0]
+
+    async def _fetch(self, params: dict) -> tuple[dict[str, ...], int]:
+        async with self.disk.transport.request(
+                self.method,
+                self.url,
+                headers=self.headers,
+                params=params,
+                timeout=self.timeout,
+        ) as response:
+            content = await response.read()
+            status_code = response.status
+
+        response = self.disk.json_loads(content) if content else {}
+
+        if status_code >= 400:
+            raise RequestError(ErrorInfo(self, response))
+
+        self.status_code = status_code
+
+        return response, len(content)
+
+    async def get_embedded(self, keep: bool = True) -> AsyncIterator[dict[str, ...]]:
+        """
+        Элементы списка по всем страницам, по порядку, см. Request.get_embedded
+
+        Следующие страницы запрашиваются заранее задачами цикла событий:
+        disk.prefetch_pages страниц, если в ответе есть total, иначе одна
+        """
+        await self.execute()
+        self.resp_count = 0
+        root = _find_root_items(self.response_body)
+        items = root.get("items")
+        if not items:
+            return
+
+        # Запрос уже выполнен без limit: первая страница размера по умолчанию API
+        default_page = self._pages_by_default
+        step = int(self.params.get("limit", self.disk.page_size))
+        offset = int(self.params.get("offset", 0))
+        total = root.get("total")
+        window = max(1, self.disk.prefetch_pages) if total is not None else 1
+
+        async def fetch(page_offset: int, page_limit: int) -> tuple[dict[str, ...], int | None]:
+            if (response := self._cache.get((page_offset, page_limit))) is not None:
+                return response, None
+            params = self.params.copy()
+            params["offset"] = str(page_offset)
+            params["limit"] = str(page_limit)
+            return await self._fetch(params)
+
+        # ((offset, limit) страницы, её запрос)
+        pending: collections.deque[tuple[tuple[int, int], asyncio.Task]] = collections.deque()
+        try:
+            while True:
+                for item in items:
+                    yield item
+                offset += len(items)
+                if total is not None and offset >= total:
+                    return
+                if len(items) != step and not default_page:
+                    # Страница короче запрошенной: конец списка или сервер ограничил limit
+                    for _, task in pending:
+                        task.cancel()
+                    pending.clear()
+                    step = len(items)
+                default_page = False
+                self.resp_count += 1
+
+                next_offset = pending[-1][0][0] + step if pending else offset
+                while len(pending) < window and (total is None or next_offset < total):
+                    key = (next_offset, step)
+                    pending.append((key, asyncio.ensure_future(fetch(*key))))
+                    next_offset += step
+
+                key, task = pending.popleft()
+                response, size = await task
+                if keep and size is not None:
+                    self._cache.put(key, response, size)
+                items = _find_root_items(response).get("items")
+                if not items:
+                    return
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+
+@dataclass(unsafe_hash=True, frozen=True)
+class AsyncDisk:
+    """
+    Асинхронный клиент Диска с теми же методами и моделями, что и Disk.
+
+    Использование:
+        async with AsyncDisk(token) as disk:
+            resource = await disk.resource_info("/")
+            async for item in resource.embedded.items:
+                ...
+    """
+
+    token: str = dataclasses.field(hash=True)
+    transport: AsyncTransport = dataclasses.field(
+        default_factory=AsyncTransport, hash=False, compare=False, repr=False
+    )
+    "Общий пул соединений и ограничитель одновременных запросов"
+    page_size: int = dataclasses.field(default=1000, hash=False, compare=False)
+    "Сколько элементов запрашивать на странице при обходе списков"
+    prefetch_pages: int = dataclasses.field(default=4, hash=False, compare=False)
+    "Сколько следующих страниц списка запрашивать заранее, если известно общее количество"
+    page_cache: typing.Callable[[], PageCache] = dataclasses.field(
+        default=PageCache, hash=False, compare=False, repr=False
+    )
+    "Фабрика кэша страниц для каждого запроса, PageCache.stream - ничего не хранить"
+    timestamps: TimestampMode = dataclasses.field(
+        default="datetime", hash=False, compare=False
+    )
+    "Представление дат в моделях: datetime, string (исходная строка) или epoch (секунды)"
+    lazy_fields: bool = dataclasses.field(default=False, hash=False, compare=False)
+    "Разбирать поля моделей при первом обращении к ним, а не при создании объекта"
+    json_loads: jsonlib.Decoder = dataclasses.field(
+        default=jsonlib.loads, hash=False, compare=False, repr=False
+    )
+    "Разбор JSON ответов из байтов, по умолчанию orjson/msgspec/ujson, если установлены"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.transport.close()
+
+    async def _request(
+            self, method: http_method, href_api: href, params: dict, body=None
+    ) -> AsyncRequest:
+        return await AsyncRequest(self, method, href_api, params, body)
+
+    async def resource_info(
+            self,
+            path: str | ResourceShort,
+            *,
+            fields: fields_type = None,
+            limit: int = None,
+            offset: int = None,
+            preview_crop: bool = None,
+            preview_size: str = None,
+            sort: str = None,
+    ) -> Resource:
+        """
+        Получить метаинформацию о файле или каталоге, см. Disk.resource_info
+        """
+        params = args_asdict({"self": None})
+        if isinstance(path, ResourceLike):
+            params["path"] = path.path
+
+        request = await self._request("GET", "/v1/disk/resources", params)
+        return _model(Resource, fields)(request)
+
+    async def remove_resource(
+            self,
+            path: str | ResourceShort,
+            fields: fields_type = None,
+            md5: str = None,
+            permanently: bool = None,
+            force_async: bool = None,
+    ) -> Link | None:
+        """
+        Удаляет ресурс, см. Disk.remove_resource
+        """
+        params = args_asdict({"self": None})
+        if isinstance(path, ResourceLike):
+            params["path"] = path.path
+
+        request = await self._request("DELETE", "/v1/disk/resources", params)
+        if request.status_code == 204:
+            return None
+        return Link(request)
+
+    async def move_resource(
+            self,
+            path: str | ResourceShort,
+            target: str | ResourceShort,
+            *,
+            overwrite: bool = None,
+            fields: fields_type = None,
+            force_async: bool = None,
+    ) -> Link:
+        """
+        Переместить ресурс, см. Disk.move_resource
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        if isinstance(target, ResourceLike):
+            target = target.path
+        params = args_asdict({"self": None, "path": "from", "target": "path"})
+        request = await self._request("POST", "/v1/disk/resources/move", params)
+        return Link(request)
+
+    async def copy_resource(
+            self,
+            path: str | ResourceShort,
+            target: str | ResourceShort,
+            *,
+            overwrite: bool = False,
+            fields: fields_type = None,
+            force_async: bool = None,
+    ) -> Link:
+        """
+        Создать копию ресурса, см. Disk.copy_resource
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        if isinstance(target, ResourceLike):
+            target = target.path
+        params = args_asdict({"self": None, "path": "from", "target": "path"})
+        request = await self._request("POST", "/v1/disk/resources", params)
+        return Link(request)
+
+    async def update_resource(
+            self, path: str | ResourceShort, body: Any, *, fields: fields_type = None
+    ) -> ResourceShort:
+        """
+        Обновить пользовательские данные, см. Disk.update_resource
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None, "body": None})
+        request = await self._request("PATCH", "/v1/disk/resources", params, body=body)
+        return _model(ResourceShort, fields)(request)
+
+    async def mkdir(self, path: str | ResourceShort, *, fields: fields_type = None) -> Link:
+        """
+        Создает папку, см. Disk.mkdir
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request("PUT", "/v1/disk/resources", params)
+        return Link(request)
+
+    async def download_resource(
+            self, path: str | ResourceShort, *, fields: fields_type = None
+    ) -> Link:
+        """
+        Получить ссылку на скачивание файла, см. Disk.download_resource
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request("GET", "/v1/disk/resources/download", params)
+        return Link(request)
+
+    async def download_public_resource(
+            self, public_key: str, *, path: str = None, fields: fields_type = None
+    ) -> Link:
+        """
+        Получить ссылку на скачивание публичного файла, см. Disk.download_public_resource
+        """
+        params = args_asdict({"self": None})
+        request = await self._request(
+            "GET", "/v1/disk/public/resources/download", params
+        )
+        return Link(request)
+
+    async def files(
+            self,
+            *,
+            fields: fields_type = None,
+            media_type: str = None,
+            limit: int = None,
+            offset: int = None,
+            preview_crop: bool = None,
+            preview_size: str = None,
+            sort: str = None,
+    ) -> FilesResourceList:
+        """
+        Получить список всех файлов упорядоченный по имени, см. Disk.files
+        """
+        params = args_asdict({"self": None})
+        request = await self._request("GET", "/v1/disk/resources/files", params)
+        return _model(FilesResourceList, fields)(request)
+
+    async def last_uploaded(
+            self,
+            *,
+            limit: int = None,
+            fields: fields_type = None,
+            media_type: str = None,
+            preview_crop: bool = None,
+            preview_size: str = None,
+    ) -> LastUploadedResourceList:
+        """
+        Получить список всех файлов упорядоченный по дате загрузки, см. Disk.last_uploaded
+        """
+        params = args_asdict({"self": None})
+        request = await self._request(
+            "GET", "/v1/disk/resources/last-uploaded", params
+        )
+        return _model(LastUploadedResourceList, fields)(request)
+
+    async def public(
+            self,
+            *,
+            fields: fields_type = None,
+            limit: int = None,
+            offset: int = None,
+            preview_crop: bool = None,
+            preview_size: str = None,
+            type_resource: str = None,
+    ) -> PublicResourcesList:
+        """
+        Получить список опубликованных ресурсов, см. Disk.public
+        """
+        params = args_asdict({"self": None, "type_resource": "type"})
+        request = await self._request("GET", "/v1/disk/resources/public", params)
+        return _model(PublicResourcesList, fields)(request)
+
+    async def publish(self, path: str | ResourceShort, *, fields: fields_type = None) -> Link:
+        """
+        Опубликовать ресурс, см. Disk.publish
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request(
+            "PUT", "/v1/disk/public/resources/publish", params
+        )
+        return Link(request)
+
+    async def unpublish(
+            self, path: str | ResourceShort, *, fields: fields_type = None
+    ) -> Link:
+        """
+        Отменить публикацию ресурса, см. Disk.unpublish
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request(
+            "PUT", "/v1/disk/public/resources/unpublish", params
+        )
+        return Link(request)
+
+    async def upload_file(
+            self, path: str | ResourceShort, *, fields: fields_type = None, overwrite: bool = None
+    ) -> ResourceUploadLink:
+        """
+        Получить ссылку для загрузки файла, см. Disk.upload_file
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request("GET", "/v1/disk/resources/upload", params)
+        return ResourceUploadLink(request)
+
+    async def upload_by_url(
+            self,
+            path: str | ResourceShort,
+            url: href,
+            *,
+            disable_redirects: bool = None,
+            fields: fields_type = None,
+    ) -> Link:
+        """
+        Загрузить файл в Диск по url, см. Disk.upload_by_url
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request("POST", "/v1/disk/resources/upload", params)
+        return Link(request)
+
+    async def info_public_resource(
+            self,
+            public_key: str,
+            *,
+            fields: fields_type = None,
+            limit: int = None,
+            offset: int = None,
+            path: str = None,
+            preview_crop: bool = None,
+            preview_size: str = None,
+            sort: str = None,
+    ) -> PublicResource:
+        """
+        Получить метаинформацию о публичном файле или каталоге, см. Disk.info_public_resource
+        """
+        params = args_asdict({"self": None})
+        request = await self._request("GET", "/v1/disk/public/resources", params)
+        return _model(PublicResource, fields)(request)
+
+    async def savetodisk_public_resource(
+            self,
+            public_key: str,
+            *,
+            fields: fields_type = None,
+            name: str = None,
+            path: str = None,
+            save_path: str = None,
+            force_async: bool = None,
+    ) -> Link:
+        """
+        Сохранить публичный ресурс в папку Загрузки, см. Disk.savetodisk_public_resource
+        """
+        params = args_asdict({"self": None})
+        request = await self._request(
+            "POST", "/v1/disk/public/resources/save-to-disk", params
+        )
+        return Link(request)
+
+    async def trash_restore(
+            self,
+            path: str | ResourceShort,
+            fields: fields_type = None,
+            name: str = None,
+            overwrite: bool = None,
+            force_async: bool = None,
+    ) -> Link:
+        """
+        Восстановить ресурс из корзины, см. Disk.trash_restore
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request(
+            "PUT", "/v1/disk/trash/resources/restore", params
+        )
+        return Link(request)
+
+    async def trash(
+            self,
+            path: str | ResourceShort = "/",
+            fields: fields_type = None,
+            preview_crop: bool = None,
+            preview_size: str = None,
+            sort: str = None,
+            limit: int = None,
+            offset: int = None,
+    ) -> TrashResource:
+        """
+        Получить содержимое корзины, см. Disk.trash
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request("GET", "/v1/disk/trash/resources", params)
+        return _model(TrashResource, fields)(request)
+
+    async def trash_clear(
+            self,
+            *,
+            path: str | ResourceShort = None,
+            fields: fields_type = None,
+            force_async: bool = None,
+    ) -> Link:
+        """
+        Очистить корзину или только выбранный ресурс, см. Disk.trash_clear
+        """
+        if isinstance(path, ResourceLike):
+            path = path.path
+        params = args_asdict({"self": None})
+        request = await self._request("DELETE", "/v1/disk/trash/resources", params)
+        return Link(request)
+
+    async def status_operation(
+            self,
+            operation_id: str,
+            *,
+            fields: fields_type = None,
+    ) -> str:
+        """
+        Получить статус асинхронной операции, см. Disk.status_operation
+        """
+        params = args_asdict({"self": None, "operation_id": None})
+        request = await self._request(
+            "GET", "/v1/disk/operations/" + operation_id, params
+        )
+        return request.response_body["status"]
+
+    async def info(
+            self,
+            *,
+            fields: fields_type = None,
+            preview_crop: bool = None,
+            preview_size: str = None,
+            sort: str = None,
+    ) -> DiskInfo:
+        """
+        Получить метаинформацию о диске пользователя, см. Disk.info
+        """
+        params = args_asdict({"self": None})
+        request = await self._request("GET", "/v1/disk/", params)
+        return _model(DiskInfo, fields)(request)
+
+    async def download_file(
+            self,
+            remote_pathname: str,
+            local_pathname: str,
+            progress_fn: typing.Callable[[int], None] = None,
+            chunk_size: int = 65536,
+            timeout: float = None,
+    ):
+        """
+        Скачать файл, читая ответ по частям без блокировки цикла событий:
+        запись в файл выполняется через asyncio.to_thread
+        """
+        link = await self.download_resource(path=remote_pathname)
+        async with self.transport.request("GET", link.href, timeout=timeout) as r:
+            r.raise_for_status()
+            # Файл пишется в потоках пула, чтобы запись на диск не останавливала цикл событий
+            f = await asyncio.to_thread(open, local_pathname, "wb")
+            try:
+                loaded_size = 0
+                async for chunk in r.content.iter_chunked(chunk_size):
+                    await asyncio.to_thread(f.write, chunk)
+                    loaded_size += len(chunk)
+                    if callable(progress_fn):
+                        progress_fn(loaded_size)
+            finally:
+                await asyncio.to_thread(f.close)
+
+    async def upload(
+            self,
+            remote_pathname: str,
+            local_pathname: str,
+            overwrite: bool = False,
+            progress_fn: typing.Callable[[int], None] = None,
+            chunk_size: int = 65536,
+            timeout: float = None,
+    ):
+        """
+        Загрузить файл, передавая его по частям из асинхронного генератора,
+        который читает файл через asyncio.to_thread
+        """
+
+        def none_if_false(value):
+            return True if value is not None and value else None
+
+        async def get_chunks():
+            # Чтение файла в потоках пула, как и запись в download_file
+            total_read = 0
+            f = await asyncio.to_thread(open, local_pathname, "rb")
+            try:
+                while chunk := await asyncio.to_thread(f.read, chunk_size):
+                    total_read += len(chunk)
+                    yield chunk
+                    if callable(progress_fn):
+                        progress_fn(total_read)
+            finally:
+                await asyncio.to_thread(f.close)
+
+        link = await self.upload_file(
+            path=remote_pathname, overwrite=none_if_false(overwrite)
+        )
+        async with self.transport.request(
+                "PUT", link.href, data=get_chunks(), timeout=timeout
+        ) as r:
+            r.raise_for_status()
+        return link.operation_id
+
+    async def remove(
+            self,
+            remote_pathname: str,
+            permanently: bool = False,
+            check_md5: str = None,
+            force_async: bool = False,
+    ):
+        def none_if_false(value):
+            return True if value is not None and value else None
+
+        link = await self.remove_resource(
+            path=remote_pathname,
+            permanently=none_if_false(permanently),
+            md5=none_if_false(check_md5),
+            force_async=none_if_false(force_async),
+        )
+        if force_async and isinstance(link, Link):
+            return link.operation_id
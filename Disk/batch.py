@@ -0,0 +1,117 @@
+import collections
+import threading
+import typing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+K = typing.TypeVar("K")
+T = typing.TypeVar("T")
+
+
+@dataclass
+class BatchResult(typing.Generic[K, T]):
+    """
+    Результат одного элемента пакетной операции
+    """
+
+    key: K
+    "Входной элемент: путь или пара (path, target)"
+    value: T = None
+    "Результат вызова, если он завершился без ошибки"
+    error: Exception = None
+    "Ошибка вызова (RequestError), остальные элементы пакета при этом продолжают выполняться"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_batch(
+        fn: typing.Callable[[K], T],
+        keys: typing.Iterable[K],
+        *,
+        max_workers: int = 8,
+        ordered: bool = False,
+        errors: tuple[type[Exception], ...] = (Exception,),
+) -> typing.Iterator[BatchResult[K, T]]:
+    """
+    Выполнить fn для каждого ключа в пуле потоков, не более max_workers вызовов одновременно
+
+    Parameters
+    ----------
+    fn : Вызов для одного элемента
+    keys : Входные элементы, читаются по мере освобождения потоков
+    max_workers : Максимальное количество одновременных вызовов
+    ordered : True - результаты в порядке keys, False - в порядке завершения
+    errors : Исключения, которые попадают в BatchResult.error, а не прерывают пакет
+
+    Returns
+    -------
+    Генератор BatchResult
+    """
+
+    def call(key: K) -> BatchResult[K, T]:
+        try:
+            return BatchResult(key, fn(key))
+        except errors as e:
+            return BatchResult(key, error=e)
+
+    keys = iter(keys)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def submit_next(pending) -> bool:
+            for key in keys:
+                pending.append(executor.submit(call, key))
+                return True
+            return False
+
+        if ordered:
+            pending: collections.deque[Future] = collections.deque()
+            while len(pending) < max_workers and submit_next(pending):
+                ...
+            while pending:
+                result = pending.popleft().result()
+                submit_next(pending)
+                yield result
+        else:
+            pending: list[Future] = []
+            while len(pending) < max_workers and submit_next(pending):
+                ...
+            while pending:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                pending = list(not_done)
+                for future in done:
+                    submit_next(pending)
+                for future in done:
+                    yield future.result()
+
+
+class InflightCalls:
+    """
+    Объединение одинаковых одновременных вызовов: пока вызов с ключом выполняется,
+    остальные вызовы с тем же ключом ждут и получают его результат
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[typing.Hashable, Future] = {}
+
+    def run(self, key: typing.Hashable, fn: typing.Callable[[], T]) -> T:
+        with self._lock:
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._pending[key]
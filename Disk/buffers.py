@@ -0,0 +1,114 @@
+import mmap
+import os
+import queue
+import threading
+import typing
+
+import requests
+
+ZERO_COPY_CHUNK_SIZE = 4 << 20
+"Размер блока по умолчанию для режима zero_copy"
+
+
+def default_chunk_size(pathname: str) -> int:
+    """
+    Размер блока для файла: не меньше ZERO_COPY_CHUNK_SIZE и кратный размеру блока файловой системы
+    """
+    try:
+        block_size = os.stat(os.path.dirname(os.path.abspath(pathname))).st_blksize
+    except OSError:
+        return ZERO_COPY_CHUNK_SIZE
+    return max(block_size, ZERO_COPY_CHUNK_SIZE // block_size * block_size)
+
+
+class BufferPool:
+    """
+    Пул переиспользуемых буферов одного размера, общий для потоков
+    """
+
+    def __init__(self, buffer_size: int = ZERO_COPY_CHUNK_SIZE):
+        self.buffer_size = buffer_size
+        self.allocated = 0
+        "Сколько буферов создано за время жизни пула"
+        self._free = queue.SimpleQueue()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bytearray:
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.allocated += 1
+            return bytearray(self.buffer_size)
+
+    def release(self, buffer: bytearray):
+        self._free.put(buffer)
+
+
+class MmapReader:
+    """
+    Тело PUT из отображённого в память файла: read отдаёт memoryview без копирования данных
+    """
+
+    def __init__(
+            self,
+            f: typing.BinaryIO,
+            offset: int,
+            size: int,
+            chunk_size: int,
+            progress_fn: typing.Callable[[int], None] = None,
+    ):
+        self.position = offset
+        self.size = size
+        self.chunk_size = chunk_size
+        self.progress_fn = progress_fn
+        self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._mmap) if size else memoryview(b"")
+
+    def __len__(self):
+        return self.size - self.position
+
+    def read(self, size: int = -1) -> memoryview:
+        end = min(self.size, self.position + max(size, self.chunk_size))
+        chunk = self._view[self.position:end]
+        self.position = end
+        if chunk and callable(self.progress_fn):
+            self.progress_fn(self.position)
+        return chunk
+
+    def close(self):
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Срез ещё держит http.client, отображение закроется сборщиком мусора
+                ...
+
+
+def iter_into(
+        response: requests.Response, pool: BufferPool
+) -> typing.Iterator[memoryview]:
+    """
+    Читать тело ответа в переиспользуемые буферы пула
+
+    Отдаёт memoryview на заполненную часть буфера, действительный до следующей итерации.
+    Ответ без Content-Encoding читается через response.raw.readinto, иначе через requests
+    с распаковкой. Чтение идёт через urllib3, поэтому прочитанное до конца соединение
+    возвращается в пул Transport.
+    """
+    buffer = pool.acquire()
+    view = memoryview(buffer)
+    try:
+        raw = response.raw
+        encoding = response.headers.get("Content-Encoding", "identity").lower()
+        if raw is not None and hasattr(raw, "readinto") and encoding == "identity":
+            while (count := raw.readinto(view)) > 0:
+                yield view[:count]
+        else:
+            for chunk in response.iter_content(chunk_size=pool.buffer_size):
+                view[: len(chunk)] = chunk
+                yield view[: len(chunk)]
+    finally:
+        view.release()
+        pool.release(buffer)
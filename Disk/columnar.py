@@ -0,0 +1,103 @@
+import collections
+import sys
+import typing
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .timestamps import to_epoch
+
+INT_FIELDS = frozenset({"size", "revision"})
+"Целые поля: array('q'), отсутствующее значение -1"
+TIME_FIELDS = frozenset({"created", "modified", "deleted", "photoslice_time"})
+"Даты: array('q') секунд от начала эпохи, отсутствующее значение -1"
+CATEGORY_FIELDS = frozenset({"type", "media_type", "mime_type", "antivirus_status"})
+"Строки с небольшим набором значений: интернированы, одинаковые значения - один объект"
+DEFAULT_FIELDS = ("path", "size", "md5", "media_type", "mime_type", "modified")
+
+MISSING = -1
+
+
+class Columns:
+    """
+    Элементы списка по колонкам, заполняются прямо из словарей страниц ответа,
+    без создания объекта на каждый элемент
+    """
+
+    def __init__(self, fields: typing.Sequence[str] = DEFAULT_FIELDS):
+        self.fields = tuple(fields)
+        self._columns: dict[str, array | list] = {
+            name: array("q") if name in INT_FIELDS | TIME_FIELDS else []
+            for name in self.fields
+        }
+        self._length = 0
+
+    def append(self, item: dict[str, ...]):
+        """Добавить элемент списка (словарь из _embedded.items)"""
+        for name, column in self._columns.items():
+            value = item.get(name)
+            if name in INT_FIELDS:
+                column.append(MISSING if value is None else int(value))
+            elif name in TIME_FIELDS:
+                column.append(MISSING if value is None else to_epoch(value))
+            elif name in CATEGORY_FIELDS and value is not None:
+                column.append(sys.intern(value))
+            else:
+                column.append(value)
+        self._length += 1
+
+    def extend(self, items: typing.Iterable[dict[str, ...]]) -> "Columns":
+        for item in items:
+            self.append(item)
+        return self
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name: str) -> array | list:
+        return self._columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def to_numpy(self) -> dict[str, "numpy.ndarray"]:
+        """
+        Колонки в виде массивов NumPy: целые и даты - int64, строки - object
+
+        Raises
+        ------
+        ImportError : NumPy не установлен
+        """
+        if numpy is None:
+            raise ImportError("Для to_numpy требуется NumPy")
+        return {
+            name: numpy.frombuffer(column, dtype=numpy.int64)
+            if isinstance(column, array)
+            else numpy.array(column, dtype=object)
+            for name, column in self._columns.items()
+        }
+
+    def group_sum(self, by: str, value: str = "size") -> dict[str, int]:
+        """
+        Сумма колонки value по значениям колонки by, например объём по media_type.
+        Отсутствующие значения value не учитываются.
+        """
+        keys, values = self._columns[by], self._columns[value]
+        if numpy is not None:
+            weights = numpy.frombuffer(values, dtype=numpy.int64)
+            present = weights != MISSING
+            labels, inverse = numpy.unique(
+                numpy.array(keys, dtype=object)[present].astype(str), return_inverse=True
+            )
+            totals = numpy.bincount(inverse, weights=weights[present], minlength=len(labels))
+            return {label: int(total) for label, total in zip(labels.tolist(), totals)}
+
+        totals = collections.defaultdict(int)
+        for key, amount in zip(keys, values):
+            if amount != MISSING:
+                totals[str(key)] += amount
+        return dict(totals)
+
@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+import typing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+
+from .buffers import BufferPool, iter_into
+from .hashing import file_hashes
+from .transport import Transport, timeout_type
+
+MIN_RANGE_SIZE = 1 << 20
+STATE_SUFFIX = ".ydpart"
+"Суффикс файла состояния рядом с докачиваемым файлом"
+STATE_SAVE_EVERY = 8 << 20
+"Как часто (в байтах) сохранять состояние докачки"
+
+
+class ChecksumError(Exception):
+    ...
+
+
+class RangeNotSupportedError(Exception):
+    ...
+
+
+class NotAFileError(Exception):
+    """Путь на Диске указывает не на файл, а на папку"""
+
+
+def split_ranges(size: int, parts: int, min_size: int = MIN_RANGE_SIZE) -> list[tuple[int, int]]:
+    """
+    Разбить [0, size) на не более чем parts диапазонов не меньше min_size байт
+
+    Returns
+    -------
+    Список (start, end), end включительно, как в заголовке Range
+    """
+    if size <= 0:
+        return []
+    parts = max(1, min(parts, -(-size // min_size)))
+    step = -(-size // parts)
+    return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+
+@dataclass
+class DownloadState:
+    """
+    Состояние докачки: скачанные диапазоны и версия удалённого файла, для которой они скачаны
+    """
+
+    size: int
+    md5: str = None
+    sha256: str = None
+    modified: str = None
+    revision: int = None
+    completed: list[list[int]] = field(default_factory=list)
+    "Скачанные диапазоны [start, end), упорядочены и не пересекаются"
+
+    def matches(self, other: "DownloadState") -> bool:
+        """Тот же ли это удалённый файл"""
+        return (self.size, self.md5, self.modified, self.revision) == (
+            other.size,
+            other.md5,
+            other.modified,
+            other.revision,
+        )
+
+    @property
+    def completed_size(self) -> int:
+        return sum(end - start for start, end in self.completed)
+
+    def add(self, start: int, end: int):
+        """Отметить диапазон [start, end) скачанным"""
+        merged = []
+        for a, b in self.completed:
+            if b < start or a > end:
+                merged.append([a, b])
+            else:
+                start, end = min(a, start), max(b, end)
+        merged.append([start, end])
+        merged.sort()
+        self.completed = merged
+
+    def missing(self) -> list[tuple[int, int]]:
+        """Недостающие диапазоны, (start, end) с end включительно, как в заголовке Range"""
+        result = []
+        position = 0
+        for start, end in self.completed:
+            if start > position:
+                result.append((position, start - 1))
+            position = max(position, end)
+        if position < self.size:
+            result.append((position, self.size - 1))
+        return result
+
+    @classmethod
+    def load(cls, pathname: str) -> typing.Optional["DownloadState"]:
+        try:
+            with open(pathname, "r", encoding="utf-8") as f:
+                return cls(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, pathname: str):
+        temp_pathname = pathname + ".tmp"
+        with open(temp_pathname, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(temp_pathname, pathname)
+
+
+def _preallocate(fd: int, size: int):
+    if hasattr(os, "posix_fallocate") and size > 0:
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            ...
+    os.ftruncate(fd, size)
+
+
+def _pwrite(fd: int, data: bytes | memoryview, offset: int):
+    while data:
+        written = os.pwrite(fd, data, offset)
+        data = data[written:]
+        offset += written
+
+
+def download_ranged(
+        transport: Transport,
+        url: str,
+        local_pathname: str,
+        size: int,
+        *,
+        connections: int = 4,
+        chunk_size: int = 1 << 16,
+        progress_fn: typing.Callable[[int], None] = None,
+        timeout: timeout_type = None,
+        state: DownloadState = None,
+        state_pathname: str = None,
+        pool: BufferPool = None,
+):
+    """
+    Скачать файл по частям через несколько соединений
+
+    Файл заранее создаётся размером size, каждый диапазон пишется на своё место через os.pwrite.
+    Ошибка любого диапазона сразу останавливает остальные: они прерываются на следующем блоке
+    и завершаются, ещё не начатые диапазоны отменяются.
+
+    Parameters
+    ----------
+    transport : Транспорт Disk
+    url : Ссылка на скачивание (Disk.download_resource)
+    local_pathname : Локальный файл
+    size : Размер файла, из resource_info
+    connections : Количество одновременных соединений
+    chunk_size : Размер блока чтения ответа
+    progress_fn : Вызывается с общим количеством скачанных байт, из рабочих потоков
+    timeout : Таймаут запросов
+    state : Состояние докачки, скачиваются только недостающие диапазоны
+    state_pathname : Куда периодически и при ошибке сохранять state
+    pool : Пул буферов, если задан - ответ читается в буферы пула без выделения памяти на каждый блок
+
+    Raises
+    ------
+    RangeNotSupportedError : Сервер не поддерживает Range, ответ не 206
+    """
+    if state is None:
+        state = DownloadState(size)
+    lock = threading.Lock()
+    stop = threading.Event()
+    loaded_size = state.completed_size
+    unsaved_size = 0
+
+    def save_state():
+        nonlocal unsaved_size
+        if state_pathname is not None:
+            # Диапазон отмечается скачанным только после записи данных на диск
+            os.fsync(fd)
+            state.save(state_pathname)
+        unsaved_size = 0
+
+    def fetch(byte_range: tuple[int, int]):
+        nonlocal loaded_size, unsaved_size
+        start, end = byte_range
+        headers = {"Range": f"bytes={start}-{end}"}
+        with transport.get(url, headers=headers, stream=True, timeout=timeout) as r:
+            r.raise_for_status()
+            if r.status_code != 206:
+                raise RangeNotSupportedError(url)
+            offset = start
+            chunks = (
+                iter_into(r, pool)
+                if pool is not None
+                else r.iter_content(chunk_size=chunk_size)
+            )
+            for chunk in chunks:
+                if stop.is_set():
+                    return
+                _pwrite(fd, chunk, offset)
+                with lock:
+                    state.add(offset, offset + len(chunk))
+                    loaded_size += len(chunk)
+                    unsaved_size += len(chunk)
+                    if unsaved_size >= STATE_SAVE_EVERY:
+                        save_state()
+                    if callable(progress_fn):
+                        progress_fn(loaded_size)
+                offset += len(chunk)
+
+    ranges = [
+        (base + start, base + end)
+        for base, last in state.missing()
+        for start, end in split_ranges(last - base + 1, connections)
+    ]
+    flags = os.O_WRONLY | os.O_CREAT
+    if not state.completed:
+        flags |= os.O_TRUNC
+    fd = os.open(local_pathname, flags, 0o666)
+    try:
+        _preallocate(fd, size)
+        if not ranges:
+            return
+        executor = ThreadPoolExecutor(max_workers=min(connections, len(ranges)))
+        try:
+            for future in as_completed([executor.submit(fetch, r) for r in ranges]):
+                future.result()
+        finally:
+            stop.set()
+            # Дождаться уже начатых диапазонов: они пишут в fd
+            executor.shutdown(wait=True, cancel_futures=True)
+    finally:
+        with lock:
+            save_state()
+        os.close(fd)
+
+
+def verify_checksum(
+        local_pathname: str, *, md5: str = None, sha256: str = None, block_size: int = 1 << 20
+):
+    """
+    Сверить хэши скачанного файла с md5/sha256 из метаинформации ресурса
+
+    Raises
+    ------
+    ChecksumError : Хэш не совпал
+    """
+    expected = {name: value for name, value in (("md5", md5), ("sha256", sha256)) if value}
+    if not expected:
+        return
+    actual = file_hashes(local_pathname, expected, block_size)
+    for name, value in expected.items():
+        if actual[name] != value.lower():
+            raise ChecksumError(f"{local_pathname}: {name} {actual[name]} != {value}")
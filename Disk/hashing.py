@@ -0,0 +1,107 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import typing
+
+HASH_BLOCK_SIZE = 1 << 20
+"Размер блока чтения файла при подсчёте хэшей"
+
+
+def file_hashes(
+        pathname: str,
+        names: typing.Iterable[str] = ("md5", "sha256"),
+        block_size: int = HASH_BLOCK_SIZE,
+        stop: threading.Event = None,
+) -> dict[str, str]:
+    """
+    Хэши файла за одно чтение
+
+    Parameters
+    ----------
+    pathname : Файл
+    names : Алгоритмы hashlib
+    block_size : Размер блока чтения
+    stop : Прервать чтение, когда событие установлено (из другого потока)
+
+    Returns
+    -------
+    Имя алгоритма -> hexdigest, пустой словарь, если чтение прервано
+    """
+    hashers = {name: hashlib.new(name) for name in names}
+    with open(pathname, "rb") as f:
+        while block := f.read(block_size):
+            if stop is not None and stop.is_set():
+                return {}
+            for hasher in hashers.values():
+                hasher.update(block)
+    return {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+
+class HashCache:
+    """
+    Кэш md5/sha256 локальных файлов: файл перечитывается, только если изменились
+    его inode, время изменения или размер
+
+    Хранится в SQLite, pathname=":memory:" - только на время работы процесса.
+    """
+
+    def __init__(self, pathname: str = ":memory:"):
+        self._db = sqlite3.connect(pathname, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "device INTEGER, inode INTEGER, mtime_ns INTEGER, size INTEGER, md5 TEXT, sha256 TEXT,"
+            "PRIMARY KEY (device, inode))"
+        )
+        self._lock = threading.Lock()
+        self.hashed = 0
+        "Сколько файлов пришлось прочитать"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def hashes(self, pathname: str, stop: threading.Event = None) -> tuple[str, str] | None:
+        """
+        md5 и sha256 файла
+
+        Parameters
+        ----------
+        pathname : Файл
+        stop : Прервать чтение файла, когда событие установлено (из другого потока)
+
+        Returns
+        -------
+        (md5, sha256), None - чтение прервано
+        """
+        st = os.stat(pathname)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT md5, sha256 FROM hashes "
+                "WHERE device = ? AND inode = ? AND mtime_ns = ? AND size = ?",
+                (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size),
+            ).fetchone()
+        if row is not None:
+            return row
+        hashes = file_hashes(pathname, stop=stop)
+        if not hashes:
+            return None
+        self.hashed += 1
+        self._put(st, hashes["md5"], hashes["sha256"])
+        return hashes["md5"], hashes["sha256"]
+
+    def put(self, pathname: str, md5: str, sha256: str):
+        """Хэши файла известны заранее (например, из метаинформации скачанного ресурса)"""
+        self._put(os.stat(pathname), md5, sha256)
+
+    def _put(self, st: os.stat_result, md5: str, sha256: str):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size, md5, sha256),
+            )
@@ -0,0 +1,345 @@
+import itertools
+import sqlite3
+import threading
+import typing
+from dataclasses import dataclass
+
+from .metadata_cache import normalize_path
+from .rest_api import (
+    Disk,
+    FilesResourceList,
+    RequestError,
+    Resource,
+    _find_root_items,
+    projection,
+)
+from .timestamps import to_epoch
+
+COLUMNS = ("path", "type", "resource_id", "size", "md5", "sha256", "modified", "revision")
+"Поля ресурса в индексе, совпадают с ключами ответа API"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    type TEXT,
+    resource_id TEXT,
+    size INTEGER,
+    md5 TEXT,
+    sha256 TEXT,
+    modified INTEGER,
+    revision INTEGER
+);
+CREATE INDEX IF NOT EXISTS resources_parent ON resources (parent);
+CREATE INDEX IF NOT EXISTS resources_md5 ON resources (md5);
+CREATE INDEX IF NOT EXISTS resources_sha256 ON resources (sha256);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+_UPSERT_INTO = (
+    f"INSERT OR REPLACE INTO {{table}} (parent, {', '.join(COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' * len(COLUMNS))})"
+)
+_UPSERT = _UPSERT_INTO.format(table="resources")
+_ENSURE_DIR = "INSERT OR IGNORE INTO resources (parent, path, type) VALUES (?, ?, 'dir')"
+
+BUILD_CHUNK = 1000
+"По сколько записей вставлять в build одной транзакцией, весь обход в памяти не держится"
+
+
+@dataclass
+class IndexEntry:
+    """
+    Ресурс в индексе
+    """
+
+    path: str
+    "Путь без префикса disk:, например /Фото/1.jpg"
+    type: str
+    "file или dir"
+    resource_id: str | None = None
+    size: int | None = None
+    md5: str | None = None
+    sha256: str | None = None
+    modified: int | None = None
+    "Дата изменения, секунды от начала эпохи"
+    revision: int | None = None
+    "Ревизия Диска, в которой ресурс изменён последний раз. None у папок, ещё не прочитанных списком"
+
+
+@dataclass
+class RefreshResult:
+    """
+    Итог обновления индекса
+    """
+
+    revision: int
+    "Ревизия Диска, до которой обновлён индекс"
+    listed_dirs: int = 0
+    "Сколько папок прочитано списком"
+    updated: int = 0
+    "Сколько записей добавлено или изменено"
+    removed: int = 0
+    "Сколько записей удалено"
+
+
+def _parent(path: str) -> str:
+    return path.rsplit("/", 1)[0] or "/"
+
+
+def _entry_row(entry) -> tuple:
+    """Запись индекса из ResourceShort, как _row из словаря ответа"""
+    return _row(
+        {name: value for name in COLUMNS if (value := getattr(entry, name, None)) is not None}
+    )
+
+
+def _row(item: dict[str, ...]) -> tuple:
+    path = normalize_path(item["path"])
+    modified = item.get("modified")
+    return (
+        _parent(path),
+        path,
+        item.get("type", "file"),
+        item.get("resource_id"),
+        item.get("size"),
+        item.get("md5"),
+        item.get("sha256"),
+        None if modified is None else to_epoch(modified),
+        item.get("revision"),
+    )
+
+
+class RemoteIndex:
+    """
+    Локальный индекс дерева Диска в SQLite
+
+    build() заполняет индекс обходом дерева (Disk.walk) с полями COLUMNS, refresh() обновляет
+    его по изменениям: если ревизия Диска не изменилась, ничего не запрашивается, иначе
+    добавляются последние загруженные файлы и заново читаются только папки,
+    у которых изменились modified/revision. Папки, известные только по путям файлов
+    (например, без build), читаются при первом refresh.
+
+    Использование:
+        with RemoteIndex(disk, "disk.sqlite") as index:
+            index.refresh()
+            entry = index.get("/Фото/1.jpg")
+            duplicates = index.find_md5(entry.md5)
+    """
+
+    ITEM_FIELDS = projection(FilesResourceList, *(f"items.{name}" for name in COLUMNS))
+    DIR_FIELDS = projection(
+        Resource,
+        *COLUMNS,
+        *(f"embedded.items.{name}" for name in COLUMNS),
+        "embedded.total",
+        "embedded.limit",
+        "embedded.offset",
+    )
+
+    def __init__(self, disk: Disk, pathname: str = ":memory:", last_uploaded_limit: int = 1000):
+        """
+        Parameters
+        ----------
+        disk : Клиент Диска
+        pathname : Файл базы SQLite
+        last_uploaded_limit : Сколько последних загруженных файлов просматривать при refresh
+        """
+        self.disk = disk
+        self.last_uploaded_limit = last_uploaded_limit
+        self._db = sqlite3.connect(pathname, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    @property
+    def revision(self) -> int | None:
+        """Ревизия Диска, до которой обновлён индекс, None - индекс не построен"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return None if row is None else row[0]
+
+    def _disk_revision(self) -> int:
+        return self.disk.info(fields="revision").revision
+
+    def _set_revision(self, revision: int):
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('revision', ?)", (revision,))
+
+    def _ensure_parents(self, rows: typing.Iterable[tuple]):
+        known = set()
+        dirs = []
+        for row in rows:
+            path = row[0]
+            while path not in known:
+                known.add(path)
+                if path != "/":
+                    dirs.append((_parent(path), path))
+                    path = _parent(path)
+                else:
+                    dirs.append(("/", "/"))
+        self._db.executemany(_ENSURE_DIR, dirs)
+
+    def build(self, max_workers: int = 8) -> RefreshResult:
+        """
+        Построить индекс заново обходом дерева Диска
+
+        Папки записываются с modified/revision, поэтому следующий refresh не читает их заново,
+        пустые папки тоже попадают в индекс. Обход пишется короткими транзакциями во временную
+        таблицу, которая в конце одной транзакцией заменяет индекс: во время чтения сети
+        читатели индекса не ждут и видят прежнее состояние.
+
+        Parameters
+        ----------
+        max_workers : Сколько папок читать одновременно
+        """
+        # Ревизия до обхода: изменения во время обхода подхватит следующий refresh
+        revision = self._disk_revision()
+        result = RefreshResult(revision, listed_dirs=1)
+        with self._lock, self._db:
+            self._db.execute("DROP TABLE IF EXISTS temp.resources_build")
+            self._db.execute("CREATE TEMP TABLE resources_build AS SELECT * FROM resources WHERE 0")
+        upsert = _UPSERT_INTO.format(table="temp.resources_build")
+        entries = self.disk.walk("/", max_workers=max_workers, fields=COLUMNS)
+        try:
+            while rows := [_entry_row(entry) for entry in itertools.islice(entries, BUILD_CHUNK)]:
+                with self._lock, self._db:
+                    self._db.executemany(upsert, rows)
+                result.updated += len(rows)
+                result.listed_dirs += sum(row[2] == "dir" for row in rows)
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM resources")
+                self._db.execute("INSERT INTO resources SELECT * FROM temp.resources_build")
+                self._db.execute(_ENSURE_DIR, ("/", "/"))
+                self._set_revision(revision)
+        finally:
+            entries.close()
+            with self._lock, self._db:
+                self._db.execute("DROP TABLE IF EXISTS temp.resources_build")
+        return result
+
+    def refresh(self) -> RefreshResult:
+        """
+        Обновить индекс по изменениям с прошлого build/refresh
+
+        Raises
+        ------
+        RequestError : Ответ API с ошибкой
+        """
+        stored = self.revision
+        if stored is None:
+            return self.build()
+        revision = self._disk_revision()
+        result = RefreshResult(revision)
+        if revision == stored:
+            return result
+
+        uploaded = self.disk.last_uploaded(limit=self.last_uploaded_limit, fields=self.ITEM_FIELDS)
+        # last-uploaded не листается по offset: только одна страница
+        rows = [
+            _row(item)
+            for item in _find_root_items(uploaded._request.response_body).get("items", ())
+            if item.get("revision", stored + 1) > stored
+        ]
+        with self._lock, self._db:
+            self._db.executemany(_UPSERT, rows)
+            self._ensure_parents(rows)
+        result.updated += len(rows)
+
+        pending = ["/"]
+        while pending:
+            self._refresh_dir(pending.pop(), pending, result)
+
+        with self._lock, self._db:
+            self._set_revision(revision)
+        return result
+
+    def _refresh_dir(self, path: str, pending: list[str], result: RefreshResult):
+        try:
+            # Папка, удалённая после чтения родителя, отвечает DiskNotFoundError
+            listing = self.disk.resource_info(
+                path, fields=self.DIR_FIELDS, limit=self.disk.page_size
+            )
+            own = _row(listing._request.response_body)
+            children = {
+                row[1]: row
+                for row in map(_row, listing._request.get_embedded(keep=False))
+            }
+        except RequestError as e:
+            if e.args[0].error != "DiskNotFoundError":
+                raise
+            with self._lock, self._db:
+                result.removed += self._remove(path)
+            return
+
+        with self._lock, self._db:
+            known = {
+                row[0]: row[1:]
+                for row in self._db.execute(
+                    f"SELECT {', '.join(COLUMNS)} FROM resources WHERE parent = ? AND path != ?",
+                    (path, path),
+                )
+            }
+            changed = []
+            for child, row in children.items():
+                old = known.get(child)
+                if row[2] == "dir":
+                    # Запись папки обновится, когда она будет прочитана списком
+                    if old is None or old[-1] is None or old != row[2:]:
+                        pending.append(child)
+                        self._db.execute(_ENSURE_DIR, (path, child))
+                elif old != row[2:]:
+                    changed.append(row)
+            self._db.executemany(_UPSERT, changed + [own])
+            result.updated += len(changed)
+            for child in known.keys() - children.keys():
+                result.removed += self._remove(child)
+        result.listed_dirs += 1
+
+    def _remove(self, path: str) -> int:
+        # Поддерево: path/... лежит между "path/" и "path0" ("0" следует за "/" в ASCII)
+        cursor = self._db.execute(
+            "DELETE FROM resources WHERE path = ? OR (path >= ? AND path < ?)",
+            (path, path.rstrip("/") + "/", path.rstrip("/") + "0"),
+        )
+        return cursor.rowcount
+
+    def _entries(self, where: str, params: tuple) -> list[IndexEntry]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM resources WHERE {where} ORDER BY path",
+                params,
+            ).fetchall()
+        return [IndexEntry(*row) for row in rows]
+
+    def get(self, path: str) -> IndexEntry | None:
+        entries = self._entries("path = ?", (normalize_path(path),))
+        return entries[0] if entries else None
+
+    def children(self, path: str) -> list[IndexEntry]:
+        path = normalize_path(path)
+        return self._entries("parent = ? AND path != ?", (path, path))
+
+    def files(self, path: str = "/") -> list[IndexEntry]:
+        """Все файлы в папке path и её подпапках"""
+        prefix = normalize_path(path).rstrip("/")
+        return self._entries(
+            "type = 'file' AND path >= ? AND path < ?", (prefix + "/", prefix + "0")
+        )
+
+    def find_md5(self, md5: str) -> list[IndexEntry]:
+        return self._entries("md5 = ?", (md5,))
+
+    def find_sha256(self, sha256: str) -> list[IndexEntry]:
+        return self._entries("sha256 = ?", (sha256,))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM resources").fetchone()[0]
@@ -0,0 +1,64 @@
+import json
+import typing
+
+Decoder: typing.TypeAlias = typing.Callable[[bytes], typing.Any]
+"Разбор тела ответа: байты ответа -> объект"
+
+
+def _orjson() -> Decoder:
+    import orjson
+
+    return orjson.loads
+
+
+def _msgspec() -> Decoder:
+    import msgspec
+
+    return msgspec.json.Decoder().decode
+
+
+def _ujson() -> Decoder:
+    import ujson
+
+    return ujson.loads
+
+
+def _stdlib() -> Decoder:
+    # json.loads сам определяет кодировку байтов (UTF-8/16/32)
+    return json.loads
+
+
+BACKENDS: dict[str, typing.Callable[[], Decoder]] = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "ujson": _ujson,
+    "json": _stdlib,
+}
+"Доступные разборщики JSON в порядке предпочтения"
+
+
+def get_decoder(name: str = None) -> Decoder:
+    """
+    Разборщик JSON по имени или первый установленный из BACKENDS
+
+    Parameters
+    ----------
+    name : orjson, msgspec, ujson или json, None - первый установленный
+
+    Raises
+    ------
+    ImportError : Указанный разборщик не установлен
+    KeyError : Неизвестное имя разборщика
+    """
+    if name is not None:
+        return BACKENDS[name]()
+    for backend in BACKENDS.values():
+        try:
+            return backend()
+        except ImportError:
+            ...
+    return json.loads
+
+
+loads: Decoder = get_decoder()
+"Разборщик по умолчанию для Disk и AsyncDisk"
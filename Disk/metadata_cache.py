@@ -0,0 +1,125 @@
+import collections
+import threading
+import time
+import typing
+
+
+def normalize_path(path: str) -> str:
+    """disk:/a/b/, /a/b и a/b -> /a/b"""
+    if path.startswith("disk:"):
+        path = path[len("disk:"):]
+    path = "/" + path.strip("/")
+    return path
+
+
+class MetadataCache:
+    """
+    Кэш ответов resource_info с ограничением по времени жизни (TTL) и количеству записей (LRU)
+
+    Ключ - (path, fields, остальные параметры запроса). Записи сбрасываются при изменении
+    ресурсов через этот же Disk (invalidate) и при смене ревизии Диска (observe_revision).
+    Изменения, сделанные другими клиентами, видны не позже чем через ttl секунд
+    или после смены ревизии.
+    """
+
+    def __init__(
+            self,
+            ttl: float | None = 60.0,
+            max_entries: int | None = 10_000,
+            revision_interval: float | None = None,
+            clock: typing.Callable[[], float] = time.monotonic,
+    ):
+        """
+        Parameters
+        ----------
+        ttl : Время жизни записи, секунды, None - без ограничения
+        max_entries : Максимальное количество записей, None - без ограничения
+        revision_interval : Как часто сверять ревизию Диска перед чтением из кэша, секунды,
+            None - только когда ревизию сообщает Disk.info()
+        clock : Источник времени
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.revision_interval = revision_interval
+        self.revision: int | None = None
+        "Последняя известная ревизия Диска"
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._revision_checked = clock()
+        self._entries: collections.OrderedDict[tuple, tuple[float, dict[str, ...]]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(params: dict[str, str]) -> tuple:
+        """Ключ записи по параметрам запроса resource_info"""
+        return (
+            normalize_path(params.get("path", "/")),
+            params.get("fields"),
+            tuple(sorted((k, v) for k, v in params.items() if k not in ("path", "fields"))),
+        )
+
+    def get(self, key: tuple) -> dict[str, ...] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and entry[0] <= self._clock()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, body: dict[str, ...]):
+        if self.max_entries == 0:
+            return
+        expires = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (expires, body)
+            self._entries.move_to_end(key)
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *paths: str):
+        """
+        Сбросить записи ресурсов, их вложенных ресурсов и родительских папок
+        (в списке родителя есть изменённый ресурс)
+        """
+        affected = set()
+        prefixes = []
+        for path in map(normalize_path, paths):
+            affected.add(path)
+            affected.add(path.rsplit("/", 1)[0] or "/")
+            prefixes.append(path.rstrip("/") + "/")
+        prefixes = tuple(prefixes)
+        with self._lock:
+            for key in [
+                key for key in self._entries
+                if key[0] in affected or key[0].startswith(prefixes)
+            ]:
+                del self._entries[key]
+
+    def revision_due(self) -> bool:
+        """Пора сверить ревизию Диска (см. revision_interval)"""
+        return (
+                self.revision_interval is not None
+                and self._clock() - self._revision_checked >= self.revision_interval
+        )
+
+    def observe_revision(self, revision: int):
+        """Ревизия Диска из ответа API: если она изменилась, весь кэш устарел"""
+        with self._lock:
+            self._revision_checked = self._clock()
+            if self.revision is not None and revision != self.revision:
+                self._entries.clear()
+            self.revision = revision
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,227 @@
+import heapq
+import itertools
+import random
+import time
+import typing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from .rate_limit import Throttle
+
+if typing.TYPE_CHECKING:
+    from .rest_api import Disk, Link
+
+OperationStatus: typing.TypeAlias = typing.Literal["success", "failed", "timeout", "error"]
+"Итог ожидания: success/failed - статус операции от API, timeout - истёк срок, error - ошибка запроса"
+
+TERMINAL_STATUSES = frozenset({"success", "failed"})
+"Статусы API, после которых операция больше не меняется"
+
+OPERATIONS_PATH = "/operations/"
+
+
+def operation_id_of(operation: typing.Union[str, "Link", None]) -> str | None:
+    """
+    Идентификатор операции из строки или Link
+
+    Returns
+    -------
+    None, если операция уже выполнена синхронно (ответ 201/204, Link на ресурс или None)
+    """
+    if operation is None or isinstance(operation, str):
+        return operation
+    request = getattr(operation, "_request", None)
+    if request is not None and request.status_code != 202:
+        return None
+    operation_id = getattr(operation, "operation_id", None)
+    if operation_id:
+        return operation_id
+    href = getattr(operation, "href", None) or ""
+    if OPERATIONS_PATH in href:
+        return href.rsplit(OPERATIONS_PATH, 1)[1].split("?", 1)[0]
+    return None
+
+
+@dataclass
+class OperationResult:
+    """
+    Итог ожидания асинхронной операции
+    """
+
+    operation_id: str | None
+    "None - операция выполнилась синхронно, ждать не пришлось"
+    status: OperationStatus
+    polls: int = 0
+    "Сколько раз запрашивался статус"
+    elapsed: float = 0.0
+    "Сколько секунд длилось ожидание"
+    error: Exception = None
+    "Ошибка запроса статуса при status == error"
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "success"
+
+
+@dataclass(eq=False)
+class _Pending:
+    operation_id: str
+    started: float
+    deadline: float | None
+    delay: float
+    polls: int = 0
+
+
+class OperationWaiter:
+    """
+    Ожидание асинхронных операций Диска (move, copy, remove, trash_clear, savetodisk...)
+
+    Статус запрашивается с экспоненциально растущим интервалом и случайным разбросом
+    (jitter), чтобы множество операций не опрашивалось одновременно. Все операции
+    обслуживает один планировщик: запросы статуса выполняются в общем пуле потоков
+    (max_workers) через общий Transport и с общим ограничением rate запросов в секунду.
+
+    Использование:
+        waiter = OperationWaiter(disk, rate=20)
+        links = [disk.move_resource(src, dst) for src, dst in moves]
+        for result in waiter.wait_many(links, timeout=600):
+            if not result.ok:
+                print(result.operation_id, result.status)
+    """
+
+    def __init__(
+            self,
+            disk: "Disk",
+            *,
+            initial_delay: float = 0.2,
+            max_delay: float = 10.0,
+            multiplier: float = 2.0,
+            jitter: float = 0.5,
+            max_workers: int = 4,
+            rate: float = None,
+            errors: tuple[type[Exception], ...] = (Exception,),
+    ):
+        """
+        Parameters
+        ----------
+        disk : Клиент Диска
+        initial_delay : Интервал после первого запроса статуса, секунды
+        max_delay : Максимальный интервал между запросами статуса одной операции
+        multiplier : Во сколько раз растёт интервал после каждого запроса
+        jitter : Доля интервала, на которую он случайно сокращается (0 - без разброса)
+        max_workers : Сколько запросов статуса выполнять одновременно
+        rate : Не больше rate запросов статуса в секунду на все операции, None - без ограничения
+        errors : Исключения запроса статуса, которые дают OperationResult со status=error,
+            а не прерывают ожидание остальных операций
+        """
+        self.disk = disk
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.errors = errors
+        self._throttle = Throttle(rate) if rate else None
+
+    def _poll(self, operation_id: str) -> str:
+        if self._throttle is not None:
+            self._throttle.wait()
+        return self.disk.status_operation(operation_id)
+
+    def _next_delay(self, pending: _Pending) -> float:
+        delay = pending.delay * random.uniform(1 - self.jitter, 1)
+        pending.delay = min(pending.delay * self.multiplier, self.max_delay)
+        return delay
+
+    def wait(self, operation: typing.Union[str, "Link", None], timeout: float = None) -> OperationResult:
+        """
+        Дождаться одной операции
+
+        Parameters
+        ----------
+        operation : Идентификатор операции или Link, который вернул метод API
+        timeout : Предельное время ожидания, секунды, None - без ограничения
+        """
+        return next(iter(self.wait_many([operation], timeout)))
+
+    def wait_many(
+            self,
+            operations: typing.Iterable[typing.Union[str, "Link", None]],
+            timeout: float = None,
+    ) -> typing.Iterator[OperationResult]:
+        """
+        Дождаться множества операций
+
+        Parameters
+        ----------
+        operations : Идентификаторы операций или Link
+        timeout : Предельное время ожидания каждой операции от начала вызова, None - без ограничения
+
+        Returns
+        -------
+        Генератор OperationResult в порядке завершения операций
+        """
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        order = itertools.count()
+        # (время следующего запроса, порядковый номер, операция)
+        schedule: list[tuple[float, int, _Pending]] = []
+        for operation in operations:
+            operation_id = operation_id_of(operation)
+            if operation_id is None:
+                yield OperationResult(None, "success")
+                continue
+            pending = _Pending(operation_id, started, deadline, self.initial_delay)
+            schedule.append((started, next(order), pending))
+        heapq.heapify(schedule)
+
+        def finish(pending: _Pending, status: OperationStatus, error: Exception = None):
+            return OperationResult(
+                pending.operation_id,
+                status,
+                pending.polls,
+                time.monotonic() - pending.started,
+                error,
+            )
+
+        inflight: dict[Future, _Pending] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while schedule or inflight:
+                    now = time.monotonic()
+                    while schedule and schedule[0][0] <= now and len(inflight) < self.max_workers:
+                        _, _, pending = heapq.heappop(schedule)
+                        inflight[executor.submit(self._poll, pending.operation_id)] = pending
+                    next_due = (
+                        max(schedule[0][0] - now, 0)
+                        if schedule and len(inflight) < self.max_workers
+                        else None
+                    )
+                    if not inflight:
+                        time.sleep(next_due)
+                        continue
+
+                    done, _ = wait(inflight, timeout=next_due, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending = inflight.pop(future)
+                        pending.polls += 1
+                        try:
+                            status = future.result()
+                        except self.errors as e:
+                            yield finish(pending, "error", e)
+                            continue
+                        if status in TERMINAL_STATUSES:
+                            yield finish(pending, status)
+                            continue
+                        now = time.monotonic()
+                        if pending.deadline is not None and now >= pending.deadline:
+                            yield finish(pending, "timeout")
+                            continue
+                        due = now + self._next_delay(pending)
+                        if pending.deadline is not None:
+                            # Последний запрос - ровно к сроку
+                            due = min(due, pending.deadline)
+                        heapq.heappush(schedule, (due, next(order), pending))
+            finally:
+                for future in inflight:
+                    future.cancel()
@@ -0,0 +1,66 @@
+import collections
+import threading
+import typing
+
+
+class PageCache:
+    """
+    Кэш страниц списка одного запроса, с вытеснением давно не использованных страниц (LRU)
+
+    Ключ страницы - её номер или (offset, limit).
+    Ограничивается количеством страниц и/или суммарным размером ответов в байтах.
+    PageCache(max_pages=0) ничего не хранит: режим однопроходного обхода,
+    повторный обход списка заново запрашивает страницы.
+    """
+
+    def __init__(self, max_pages: int | None = 32, max_bytes: int | None = 32 << 20):
+        """
+        Parameters
+        ----------
+        max_pages : Максимальное количество страниц, None - без ограничения
+        max_bytes : Максимальный суммарный размер ответов, None - без ограничения
+        """
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.size = 0
+        "Суммарный размер хранимых ответов, байт"
+        self._pages: collections.OrderedDict[typing.Hashable, tuple[dict[str, ...], int]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @classmethod
+    def stream(cls) -> "PageCache":
+        """Кэш, который ничего не хранит"""
+        return cls(max_pages=0)
+
+    def get(self, page: typing.Hashable) -> dict[str, ...] | None:
+        with self._lock:
+            if page not in self._pages:
+                return None
+            self._pages.move_to_end(page)
+            return self._pages[page][0]
+
+    def put(self, page: typing.Hashable, response: dict[str, ...], size: int = 0):
+        if self.max_pages == 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+        with self._lock:
+            if page in self._pages:
+                self.size -= self._pages.pop(page)[1]
+            self._pages[page] = (response, size)
+            self.size += size
+            while (self.max_pages is not None and len(self._pages) > self.max_pages) or (
+                    self.max_bytes is not None and self.size > self.max_bytes
+            ):
+                self.size -= self._pages.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._pages)
+
+    def __contains__(self, page: typing.Hashable) -> bool:
+        return page in self._pages
@@ -0,0 +1,152 @@
+import threading
+import time
+import typing
+
+THROTTLE_STATUSES = frozenset({429, 503})
+"Ответы API, означающие превышение лимита запросов или перегрузку сервера"
+
+
+def retry_after(headers: typing.Mapping[str, str]) -> float | None:
+    """Значение заголовка Retry-After в секундах, None - нет или задан датой"""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+class Throttle:
+    """
+    Не чаще rate вызовов wait() в секунду на все потоки
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class RateLimiter:
+    """
+    Общий для всех запросов Disk ограничитель: token bucket по частоте запросов
+    и AIMD-регулировка количества одновременных запросов
+
+    Каждый успешный ответ увеличивает допустимое число одновременных запросов
+    примерно на increase за "окно" (increase / concurrency на ответ), ответ 429
+    (или другой из THROTTLE_STATUSES) уменьшает его в decrease раз и приостанавливает все запросы на Retry-After секунд
+    (или на backoff, если заголовка нет). Поле limit ошибки API ограничивает rate сверху.
+    Так batch-, walk- и transfer-вызовы, работающие в нескольких потоках, сами сходятся
+    к допустимой частоте, а ответ 429 повторяется, а не прерывает задачу.
+    """
+
+    def __init__(
+            self,
+            rate: float | None = 20.0,
+            *,
+            burst: int = None,
+            max_concurrency: int = 16,
+            min_concurrency: int = 1,
+            increase: float = 1.0,
+            decrease: float = 0.5,
+            backoff: float = 1.0,
+            max_retries: int = 5,
+            clock: typing.Callable[[], float] = time.monotonic,
+    ):
+        """
+        Parameters
+        ----------
+        rate : Запросов в секунду, None - без ограничения частоты
+        burst : Ёмкость корзины токенов, по умолчанию max(1, rate)
+        max_concurrency : Максимальное количество одновременных запросов
+        min_concurrency : Ниже этого значения количество одновременных запросов не уменьшается
+        increase : Прибавка к количеству одновременных запросов за окно успешных ответов
+        decrease : Множитель количества одновременных запросов после ответа 429
+        backoff : Пауза после 429 без Retry-After, секунды
+        max_retries : Сколько раз повторять запрос после ответа 429
+        clock : Источник времени
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate or 1))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.backoff = backoff
+        self.max_retries = max_retries
+        self.concurrency = float(max_concurrency)
+        "Текущее допустимое количество одновременных запросов"
+        self.active = 0
+        self.throttled = 0
+        "Сколько получено ответов 429"
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._refilled = clock()
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        if self.rate is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _delay(self, now: float) -> float:
+        """Сколько ждать до разрешения запроса, 0 - можно сейчас"""
+        delay = self._paused_until - now
+        if self.active >= int(self.concurrency):
+            # Ждём release(), а не время
+            return max(delay, 0) or None
+        if self.rate is not None and self._tokens < 1:
+            delay = max(delay, (1 - self._tokens) / self.rate)
+        return max(delay, 0)
+
+    def acquire(self):
+        """Дождаться разрешения на запрос, после запроса обязателен release()"""
+        with self._condition:
+            while True:
+                now = self._clock()
+                self._refill(now)
+                delay = self._delay(now)
+                if delay == 0:
+                    break
+                self._condition.wait(delay)
+            if self.rate is not None:
+                self._tokens -= 1
+            self.active += 1
+
+    def release(self, throttled: bool = False, retry_after: float = None, limit: int = None):
+        """
+        Запрос завершён
+
+        Parameters
+        ----------
+        throttled : Ответ 429
+        retry_after : Retry-After ответа, секунды
+        limit : Поле limit ошибки API: допустимое количество запросов в секунду
+        """
+        with self._condition:
+            self.active -= 1
+            if throttled:
+                self.throttled += 1
+                self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease)
+                pause = retry_after if retry_after is not None else self.backoff
+                self._paused_until = max(self._paused_until, self._clock() + pause)
+                if isinstance(limit, (int, float)) and limit > 0:
+                    burst = max(1, int(limit))
+                    self.burst = burst if self.rate is None else min(self.burst, burst)
+                    self.rate = limit if self.rate is None else min(self.rate, limit)
+                    self._tokens = min(self._tokens, self.burst)
+            else:
+                self.concurrency = min(
+                    self.max_concurrency, self.concurrency + self.increase / self.concurrency
+                )
+            self._condition.notify_all()
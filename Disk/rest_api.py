@@ -1,41 +1,121 @@
+import abc
+import collections
 import dataclasses
+import functools
+import os
+import threading
 import typing
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from functools import partial
 from typing import Any, Iterable, TypeAlias
 
-import dateutil.parser
-import requests
-
 from py_utils import utils
 from py_utils.utils import args_asdict
 
+from . import (
+    buffers,
+    download,
+    jsonlib,
+    operations,
+    rate_limit,
+    sync,
+    timestamps,
+    transfers,
+    upload,
+    walk,
+)
+from .batch import BatchResult, InflightCalls, run_batch
+from .columnar import DEFAULT_FIELDS, Columns
+from .hashing import HashCache
+from .metadata_cache import MetadataCache
+from .page_cache import PageCache
+from .rate_limit import RateLimiter
+from .timestamps import TimestampMode
+from .transport import Transport, timeout_type
+
 _DEBUG_ = True
 
 href: TypeAlias = str
 http_method: TypeAlias = typing.Literal["PUT", "GET", "POST", "PATCH", "DELETE"]
+fields_type: TypeAlias = str | Iterable[str] | type
+"""
+Параметр fields: строка API, список ключей ответа API или класс slim(...)
+
+Список передаётся как есть, через запятую: это ключи ответа ("_embedded.items.path"),
+а не имена полей моделей. Для имён полей ("embedded.items.path") - projection или slim.
+"""
 
 T = typing.TypeVar("T")
 
+PAGED_LISTINGS = frozenset(
+    {
+        "/v1/disk/resources",
+        "/v1/disk/resources/files",
+        "/v1/disk/resources/public",
+        "/v1/disk/public/resources",
+        "/v1/disk/trash/resources",
+    }
+)
+"Списки, которые листаются по offset, см. Request.get_embedded"
+
 
 class RequestError(Exception):
     ...
 
 
+def _find_root_items(response: dict[str, ...]) -> dict[str, ...]:
+    value = response
+    if "_embedded" in value:
+        value = value["_embedded"]
+    return value
+
+
 class Request:
+    """
+    Запрос к API
+
+    GET-запросы отложенные: выполняются при первом обращении к response_body/status_code
+    (то есть к полям модели или её списку) или явно через execute().
+    Остальные методы меняют данные на Диске и выполняются сразу.
+
+    При Disk(lazy=False) GET-запросы тоже выполняются сразу, в конструкторе, то есть
+    RequestError выбрасывает уже вызов метода Disk (resource_info и т.п.), а не обращение
+    к полям. Код, который обрабатывает ошибку запроса, должен охватывать и сам вызов.
+    """
+
     disk: "Disk"
     method: http_method
     href_api: href
     params: dict[str, ...]
-    response_body: dict[str, ...]
-    status_code: int
     body: ...
 
-    _cache: list[dict[str, ...], ...]
+    _cache: PageCache
+    _response_body: dict[str, ...] | None
+    _status_code: int | None
 
     def __init__(
-            self, disk: "Disk", method: http_method, href_api: href, params: dict, body=None
+            self,
+            disk: "Disk",
+            method: http_method,
+            href_api: href,
+            params: dict,
+            body=None,
+            timeout: timeout_type = None,
+    ):
+        self._setup(disk, method, href_api, params, body, timeout)
+        if method != "GET" or not disk.lazy:
+            self.execute()
+
+    def _setup(
+            self,
+            disk: "Disk",
+            method: http_method,
+            href_api: href,
+            params: dict,
+            body,
+            timeout: timeout_type,
     ):
         self.disk = disk
         self.method = method
@@ -44,6 +124,10 @@ class Request:
         if params is None:
             params = {}
 
+        if (fields := params.get("fields")) and not isinstance(fields, str):
+            # Список - ключи ответа API как есть, см. fields_type
+            params["fields"] = fields.__fields__ if isinstance(fields, type) else ",".join(fields)
+
         params = {
             key: str(value)
             for key, value in params.items()
@@ -56,75 +140,375 @@ class Request:
             "Depth": "1",
             "Authorization": f"OAuth {self.disk.token}",
         }
-        self.url = "https://cloud-api.yandex.net" + href_api
+        self.url = self.disk.transport.base_url + href_api
         self.body = body
-        self._cache = []
+        self.timeout = timeout
+        self._cache = disk.page_cache()
         self.resp_count = 0
-        self.response_body = self._get()
+        self._response_body = None
+        self._status_code = None
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> tuple:
+        """Одинаковые запросы имеют одинаковый ключ"""
+        return self.disk.token, self.method, self.url, tuple(sorted(self.params.items()))
+
+    @property
+    def executed(self) -> bool:
+        return self._response_body is not None
+
+    @property
+    def _pages_by_default(self) -> bool:
+        """Список без limit в запросе: страницы размера disk.page_size, см. get_embedded"""
+        return (
+                self.method == "GET"
+                and self.href_api in PAGED_LISTINGS
+                and "limit" not in self.params
+        )
 
-    def _get(
-            self,
-            params: dict = None,
-    ) -> dict[str, ...]:
+    @property
+    def response_body(self) -> dict[str, ...]:
+        if self._response_body is None:
+            self.execute()
+        return self._response_body
 
-        if params is None:
-            params = self.params
+    @response_body.setter
+    def response_body(self, value: dict[str, ...]):
+        self._response_body = value
 
-        if len(self._cache) > self.resp_count:
-            return self._cache[self.resp_count]
+    @property
+    def status_code(self) -> int:
+        if self._status_code is None:
+            self.execute()
+        return self._status_code
 
-        response = requests.request(
-            method=self.method, url=self.url, headers=self.headers, params=params,
-        )
+    @status_code.setter
+    def status_code(self, value: int):
+        self._status_code = value
 
-        if response.status_code >= 400:
-            raise RequestError(ErrorInfo(response.json()))
+    def execute(self) -> "Request":
+        """
+        Выполнить запрос, если он ещё не выполнен
 
-        self.status_code = response.status_code
+        Одинаковые GET-запросы, выполняемые в это же время из других потоков,
+        не отправляются повторно, а дожидаются ответа на первый.
 
-        response = response.json()
-        self._cache.append(response)
+        Raises
+        ------
+        RequestError : Ответ API с ошибкой
+        """
+        with self._lock:
+            if self._response_body is None:
+                if self.method == "GET":
+                    body, status_code = self.disk._inflight.run(self.key, self._execute)
+                else:
+                    body, status_code = self._execute()
+                self._status_code = status_code
+                self._response_body = body
+        return self
+
+    def _execute(self) -> tuple[dict[str, ...], int]:
+        cache = self.disk.metadata_cache
+        if cache is None:
+            body, _ = self._fetch(self.params)
+            return body, self._status_code
+
+        if self.method != "GET":
+            try:
+                body, _ = self._fetch(self.params)
+            finally:
+                self._invalidate_metadata(cache)
+            return body, self._status_code
+
+        if self.href_api == "/v1/disk/resources":
+            if cache.revision_due():
+                self.disk.info(fields="revision").revision
+            key = cache.key(self.params)
+            if (body := cache.get(key)) is not None:
+                return body, 200
+            body, _ = self._fetch(self.params)
+            cache.put(key, body)
+            return body, self._status_code
+
+        body, _ = self._fetch(self.params)
+        if self.href_api == "/v1/disk/" and "revision" in body:
+            cache.observe_revision(body["revision"])
+        return body, self._status_code
+
+    def _invalidate_metadata(self, cache: MetadataCache):
+        if self.href_api.startswith("/v1/disk/trash/"):
+            # Куда восстановится ресурс из корзины, по запросу не известно
+            cache.clear()
+        else:
+            cache.invalidate(*(self.params[key] for key in ("from", "path") if key in self.params))
+
+    def _fetch(self, params: dict) -> tuple[dict[str, ...], int]:
+        """
+        Returns
+        -------
+        Тело ответа и его размер в байтах
+        """
+        limiter = self.disk.rate_limiter
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            throttled = False
+            try:
+                response = self.disk.transport.request(
+                    method=self.method,
+                    url=self.url,
+                    headers=self.headers,
+                    params=params,
+                    timeout=self.timeout,
+                )
+
+                throttled = response.status_code in rate_limit.THROTTLE_STATUSES
+                # Разбор прямо из байтов ответа, без декодирования в str, как в response.json()
+                content = response.content
+                try:
+                    body = self.disk.json_loads(content) if content else {}
+                except Exception:
+                    # Перегруженный балансировщик отвечает 429/503 не JSON, а HTML:
+                    # запрос всё равно повторяется после паузы. Исключения разборщиков
+                    # разные (msgspec.DecodeError - не ValueError), поэтому Exception
+                    if not throttled:
+                        raise
+                    body = {}
+            finally:
+                if limiter is not None:
+                    limiter.release(
+                        throttled,
+                        rate_limit.retry_after(response.headers) if throttled else None,
+                        body.get("limit") if throttled and isinstance(body, dict) else None,
+                    )
+            if not throttled or limiter is None or attempt >= limiter.max_retries:
+                break
+            attempt += 1
 
-        return response
+        if response.status_code >= 400:
+            raise RequestError(ErrorInfo(self, body))
 
-    def get_embedded(self) -> Iterable[dict[str, ...]]:
-        def find_root_items(response):
-            value = response
-            if "_embedded" in value:
-                value = value["_embedded"]
-            return value
+        self.status_code = response.status_code
 
-        self.resp_count = offset = 0
-        params = self.params.copy()
+        # 204 No Content: пустое тело, но запрос выполнен
+        return body, len(content)
 
-        while (
-                (response := self._get(params)) is not None
-                and (root := find_root_items(response))
-                and (items := root["items"])
-                and len(items) > 0
-        ):
-            yield from items
-            self.resp_count += 1
-            offset += len(items)
-            params["offset"] = offset
+    def get_embedded(self, keep: bool = True) -> Iterable[dict[str, ...]]:
+        """
+        Элементы списка по всем страницам, по порядку
+
+        Первая страница - ответ на сам запрос, следующие запрашиваются по limit запроса.
+        Если в запросе нет limit, то отложенный запрос, ещё не выполненный к началу обхода,
+        выполняется с limit=disk.page_size. Если он уже выполнен (Disk(lazy=False) или
+        чтение полей ресурса), то первая страница - размера по умолчанию API, а следующие -
+        по disk.page_size. Так resource_info папки без обхода списка не запрашивает
+        page_size элементов. Обход items списка (files(), trash() ...) до обращения к другим
+        полям выполняет запрос с page_size, resource_info(...).embedded сначала читает ресурс.
+
+        Если в ответе есть total, то disk.prefetch_pages следующих страниц запрашиваются
+        параллельно, иначе одна следующая страница запрашивается заранее,
+        пока обрабатывается текущая.
+
+        Первая страница хранится в response_body, остальные - в кэше страниц disk.page_cache,
+        keep=False не кладёт новые страницы в кэш (однопроходный обход).
+        """
+        with self._lock:
+            if self._response_body is None and self._pages_by_default:
+                self.params["limit"] = str(self.disk.page_size)
+        self.resp_count = 0
+        root = _find_root_items(self.response_body)
+        items = root.get("items")
+        if not items:
+            return
+
+        # Первая страница размера по умолчанию API: её длина - не ограничение limit сервером
+        default_page = self._pages_by_default
+        step = int(self.params.get("limit", self.disk.page_size))
+        offset = int(self.params.get("offset", 0))
+        total = root.get("total")
+        window = max(1, self.disk.prefetch_pages) if total is not None else 1
+
+        def fetch(page_offset: int, page_limit: int) -> tuple[dict[str, ...], int | None]:
+            if (response := self._cache.get((page_offset, page_limit))) is not None:
+                return response, None
+            params = self.params.copy()
+            params["offset"] = str(page_offset)
+            params["limit"] = str(page_limit)
+            return self._fetch(params)
+
+        executor = ThreadPoolExecutor(max_workers=window)
+        # ((offset, limit) страницы, её запрос)
+        pending: collections.deque[tuple[tuple[int, int], Future]] = collections.deque()
+        try:
+            while True:
+                yield from items
+                offset += len(items)
+                if total is not None and offset >= total:
+                    return
+                if len(items) != step and not default_page:
+                    # Страница короче запрошенной: конец списка или сервер ограничил limit,
+                    # заранее запрошенные смещения больше не годятся
+                    for _, future in pending:
+                        future.cancel()
+                    pending.clear()
+                    step = len(items)
+                default_page = False
+                self.resp_count += 1
+
+                next_offset = pending[-1][0][0] + step if pending else offset
+                while len(pending) < window and (total is None or next_offset < total):
+                    key = (next_offset, step)
+                    pending.append((key, executor.submit(fetch, *key)))
+                    next_offset += step
+
+                key, future = pending.popleft()
+                response, size = future.result()
+                # В кэш попадают только прочитанные страницы и под ключом (offset, limit):
+                # заранее запрошенные страницы после смены step не подменяют другие смещения
+                if keep and size is not None:
+                    self._cache.put(key, response, size)
+                items = _find_root_items(response).get("items")
+                if not items:
+                    return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
 
 class EmbeddedResources(typing.Generic[T]):
 
+    def __init__(self, item_type: type[T] = None):
+        self.item_type = item_type
+
     def __set_name__(self, owner_type, field_name):
         self.name = field_name
         self.owner_type = owner_type
-        annotations = utils.full_annotations(self.owner_type)
-        self.item_type = annotations[field_name].__args__[0]
+        if self.item_type is None:
+            annotations = utils.full_annotations(self.owner_type)
+            self.item_type = annotations[field_name].__args__[0]
 
     def __set__(self, instance, value):
         self.value = value
         self.instance = instance
 
-    def __get__(self, owner, owner_type) -> Iterable[T]:
-        request = owner._request
-        for resource in request.get_embedded():
-            yield self.item_type(request, resource)
+    def __get__(self, owner, owner_type) -> "EmbeddedItems[T]":
+        return EmbeddedItems(owner._request, self.item_type)
+
+
+class EmbeddedItems(typing.Generic[T]):
+    """
+    Постраничный обход вложенных ресурсов.
+    Для Request обходится через for, для AsyncRequest через async for
+    """
+
+    def __init__(self, request: "Request", item_type: type[T], keep: bool = True):
+        self.request = request
+        self.item_type = item_type
+        self.keep = keep
+
+    def stream(self) -> "EmbeddedItems[T]":
+        """Однопроходный обход: прочитанные страницы не сохраняются в кэше запроса"""
+        return EmbeddedItems(self.request, self.item_type, keep=False)
+
+    def compact(self, keep_request: bool = False) -> "EmbeddedItems[T]":
+        """Элементы в виде компактных объектов со __slots__, см. compact"""
+        return EmbeddedItems(
+            self.request, compact(self.item_type, keep_request), keep=self.keep
+        )
+
+    def columns(self, fields: typing.Sequence[str] = DEFAULT_FIELDS) -> Columns:
+        """
+        Элементы по колонкам (см. Columns): размеры и даты в array('q'), без объекта на элемент
+
+        Parameters
+        ----------
+        fields : Нужные поля элементов
+        """
+        return Columns(fields).extend(self.request.get_embedded(keep=self.keep))
+
+    async def acolumns(self, fields: typing.Sequence[str] = DEFAULT_FIELDS) -> Columns:
+        """Columns для AsyncRequest"""
+        columns = Columns(fields)
+        async for resource in self.request.get_embedded(keep=self.keep):
+            columns.append(resource)
+        return columns
+
+    def __iter__(self) -> typing.Iterator[T]:
+        for resource in self.request.get_embedded(keep=self.keep):
+            yield self.item_type(self.request, resource)
+
+    async def __aiter__(self) -> typing.AsyncIterator[T]:
+        async for resource in self.request.get_embedded(keep=self.keep):
+            yield self.item_type(self.request, resource)
+
+
+_DESCRIPTOR = object()
+"Поле-дескриптор (EmbeddedResources): значение из ответа не сохраняется в объекте"
+
+field_converter: TypeAlias = typing.Callable[["Request", Any], Any]
+
+
+def _convert_datetime(request: "Request", value) -> datetime | str | int:
+    mode = getattr(getattr(request, "disk", None), "timestamps", "datetime")
+    return timestamps.convert(value, mode)
+
+
+def _field_converter(ann_type) -> field_converter | None:
+    if hasattr(ann_type, "__request_map__"):
+        return ann_type
+    if ann_type is datetime:
+        return _convert_datetime
+    if isinstance(ann_type, type):
+        def convert(request: "Request", value):
+            return value if isinstance(value, ann_type) else ann_type(value)
+
+        return convert
+    return None
+
+
+def _request_plan(cls) -> dict[str, tuple[str, field_converter | None]]:
+    """
+    План разбора ответа для класса: ключ словаря ответа -> (имя поля, преобразование)
+
+    Строится один раз на класс при создании первого объекта (аннотации могут ссылаться
+    на классы, объявленные ниже), заодно устанавливает дескрипторы списков.
+    """
+    plan = cls.__dict__.get("__request_plan__")
+    if plan is not None:
+        return plan
+
+    keys_rename = {}
+    for klass in reversed(cls.__mro__):
+        keys_rename.update(klass.__dict__.get("__keys_rename__", {}))
+    attr_keys = {attr_name: key_dict for key_dict, attr_name in keys_rename.items()}
+
+    plan = {key_dict: (attr_name, None) for key_dict, attr_name in keys_rename.items()}
+    for attr_name, annotation in utils.full_annotations(cls).items():
+        key_dict = attr_keys.get(attr_name, attr_name)
+        ann_type = utils.get_origin_type(annotation)
+        if utils.is_datadescriptor(ann_type):
+            descriptor = ann_type()
+            descriptor.__set_name__(cls, attr_name)
+            setattr(cls, attr_name, descriptor)
+            plan[key_dict] = (attr_name, _DESCRIPTOR)
+        else:
+            plan[key_dict] = (attr_name, _field_converter(ann_type))
+
+    cls.__request_plan__ = plan
+    return plan
+
+
+def _attr_plan(cls) -> dict[str, tuple[str, field_converter | None]]:
+    """Обратный план разбора: имя поля -> (ключ словаря ответа, преобразование)"""
+    attr_plan = cls.__dict__.get("__attr_plan__")
+    if attr_plan is None:
+        attr_plan = {
+            attr_name: (key_dict, convert)
+            for key_dict, (attr_name, convert) in _request_plan(cls).items()
+        }
+        cls.__attr_plan__ = attr_plan
+    return attr_plan
 
 
 def request_map(cls=None, /, *, keys_rename: dict[str, str] = None):
@@ -143,35 +527,82 @@ def request_map(cls=None, /, *, keys_rename: dict[str, str] = None):
     """
 
     def __init__(self, request: "Request", from_dict: dict = None):
-        nonlocal keys_rename
+        self._request = request
         if from_dict is None:
+            if not request.executed:
+                # Поля заполнятся при первом обращении, см. __getattr__. План строится сразу:
+                # он устанавливает дескрипторы списков, и обход items не выполняет запрос заранее
+                _request_plan(type(self))
+                self._filled = False
+                return
             from_dict = request.response_body
-        self._request = request
+        _fill(self, from_dict)
+
+    def _fill(self, from_dict: dict):
+        request = self._request
+        self._filled = True
+        # План строится и для lazy_fields: он устанавливает дескрипторы списков на класс
+        plan = type(self).__dict__.get("__request_plan__") or _request_plan(type(self))
+        if getattr(getattr(request, "disk", None), "lazy_fields", False):
+            # Поля разбираются при первом обращении, см. __getattr__
+            self._raw = from_dict
+            return
+        # slim-класс хранит только поля проекции, полная модель - и неизвестные ключи ответа
+        projected = "__slim_of__" in type(self).__dict__
         for key_dict, value in from_dict.items():
-            attr_name = key_dict
-            if key_dict in keys_rename:
-                attr_name = keys_rename[key_dict]
-            annotations = utils.full_annotations(self)
-            if attr_name in annotations:
-                ann_type = utils.get_origin_type(annotations[attr_name])
+            entry = plan.get(key_dict)
+            if entry is None and projected:
+                continue
+            attr_name, convert = entry or (key_dict, None)
+            if convert is _DESCRIPTOR:
+                continue
+            if convert is not None:
                 try:
-                    if utils.is_datadescriptor(ann_type):
-                        #desc_value = ann_type(request)
-                        desc_value = ann_type()
-                        desc_value.__set_name__(type(self), attr_name)
-                        setattr(self.__class__, attr_name, desc_value)
-                    elif hasattr(ann_type, "__request_map__"):
-                        value = ann_type(request, value)
-                    elif not isinstance(value, ann_type):
-                        if (ann_type == datetime) and isinstance(value, str):
-                            value = dateutil.parser.parse(value)
-                        else:
-                            value = ann_type(value)
+                    value = convert(request, value)
                 except Exception:
                     ...
             setattr(self, attr_name, value)
 
+    def _decode(self, name: str):
+        raw = self.__dict__.get("_raw")
+        if raw is not None:
+            entry = _attr_plan(type(self)).get(name)
+            if entry is None and "__slim_of__" not in type(self).__dict__:
+                entry = (name, None)
+            if entry is not None and entry[0] in raw and entry[1] is not _DESCRIPTOR:
+                key_dict, convert = entry
+                value = raw[key_dict]
+                if convert is not None:
+                    try:
+                        value = convert(self._request, value)
+                    except Exception:
+                        ...
+                setattr(self, name, value)
+                return value
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def __getattr__(self, name: str):
+        # Вызывается только для отсутствующих атрибутов: выполнить отложенный запрос
+        # и заполнить поля или разобрать поле из исходного словаря (lazy_fields)
+        if name.startswith("_"):
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        if not self.__dict__.get("_filled", True):
+            _fill(self, self._request.response_body)
+            return getattr(self, name)
+        return _decode(self, name)
+
     def __repr__(self):
+        if not self.__dict__.get("_filled", True):
+            _fill(self, self._request.response_body)
+        for key_dict in self.__dict__.get("_raw", ()):
+            attr_name = _request_plan(type(self)).get(key_dict, (key_dict,))[0]
+            if attr_name not in self.__dict__:
+                try:
+                    _decode(self, attr_name)
+                except AttributeError:
+                    ...
         return (
                 f"{cls.__name__}: ("
                 + f", ".join(
@@ -190,11 +621,236 @@ def request_map(cls=None, /, *, keys_rename: dict[str, str] = None):
         keys_rename = {}
 
     cls.__request_map__ = {}
+    cls.__keys_rename__ = keys_rename
     cls.__init__ = __init__
+    cls.__getattr__ = __getattr__
     cls.__repr__ = __repr__
     return cls
 
 
+def execute(model: T) -> T:
+    """
+    Выполнить отложенный запрос модели сейчас, а не при первом обращении к её полям
+
+    Raises
+    ------
+    RequestError : Ответ API с ошибкой
+    """
+    model._request.execute()
+    return model
+
+
+def _compact_init(self, request: "Request", from_dict: dict = None):
+    if from_dict is None:
+        from_dict = request.response_body
+    if self.__keep_request__:
+        self._request = request
+    plan = self.__request_plan__
+    for key_dict, value in from_dict.items():
+        if (entry := plan.get(key_dict)) is None:
+            continue
+        attr_name, convert = entry
+        if convert is not None:
+            try:
+                value = convert(request, value)
+            except Exception:
+                ...
+        setattr(self, attr_name, value)
+
+
+def _compact_repr(self):
+    fields = (
+        f"{key}:{repr(getattr(self, key))}"
+        for key in self.__request_fields__
+        if hasattr(self, key)
+    )
+    return f"{type(self).__name__}: (" + ", ".join(fields) + ")"
+
+
+def _compact_reduce(self):
+    state = {key: getattr(self, key) for key in self.__request_fields__ if hasattr(self, key)}
+    cls = self.__compact_of__
+    if "__slim_of__" in cls.__dict__:
+        # slim-класс не найти по имени в модуле, сохраняется способ его построить
+        cls = (cls.__slim_of__, cls.__slim_attrs__)
+    return _compact_restore, (cls, self.__keep_request__, state)
+
+
+def _compact_restore(cls: type | tuple[type, tuple[str, ...]], keep_request: bool, state: dict):
+    if isinstance(cls, tuple):
+        cls = _slim(*cls)
+    instance = object.__new__(_compact(cls, keep_request))
+    for key, value in state.items():
+        setattr(instance, key, value)
+    return instance
+
+
+def compact(cls: type[T], keep_request: bool = False) -> type[T]:
+    """
+    Компактный вариант модели request_map для элементов больших списков
+
+    Класс с __slots__ вместо __dict__: хранит только объявленные поля (неизвестные ключи ответа
+    отбрасываются), незаданные поля не занимают места в словаре, вложенные модели тоже компактные.
+    Объект создаётся сразу из словаря, без отложенного запроса.
+    Компактный класс не наследует модель, исходный класс - в __compact_of__.
+    Компактные ресурсы (от ResourceShort) - экземпляры ResourceLike, их можно передавать
+    как path в методы Disk.
+
+    Parameters
+    ----------
+    cls : Класс, объявленный через request_map
+    keep_request : Хранить ссылку на запрос в поле _request
+
+    Returns
+    -------
+    Класс с тем же конструктором (request, from_dict)
+    """
+    return _compact(cls, bool(keep_request))
+
+
+@functools.cache
+def _compact(cls: type[T], keep_request: bool) -> type[T]:
+    plan = _request_plan(cls)
+    parents = [base for base in cls.__bases__ if hasattr(base, "__request_map__")]
+    if "__slim_of__" in cls.__dict__:
+        # Слоты только для полей проекции, а не для всех полей полной модели
+        parents = []
+    bases = tuple(_compact(base, keep_request) for base in parents) or (object,)
+    inherited = {key for base in bases for key in getattr(base, "__request_fields__", ())}
+
+    own_fields = [
+        attr_name
+        for attr_name, convert in plan.values()
+        if convert is not _DESCRIPTOR and attr_name not in inherited
+    ]
+    slots = list(own_fields)
+    if not parents and keep_request:
+        slots.append("_request")
+
+    compact_plan = {}
+    for key_dict, (attr_name, convert) in plan.items():
+        if convert is _DESCRIPTOR:
+            continue
+        if isinstance(convert, type) and hasattr(convert, "__request_map__"):
+            convert = _compact(convert, keep_request)
+        compact_plan[key_dict] = (attr_name, convert)
+
+    compact_cls = type(
+        cls.__name__,
+        bases,
+        {
+            "__slots__": tuple(slots),
+            "__module__": cls.__module__,
+            "__qualname__": f"compact({cls.__qualname__})",
+            "__doc__": cls.__doc__,
+            "__request_map__": {},
+            "__request_plan__": compact_plan,
+            "__request_fields__": tuple(sorted(inherited | set(own_fields))),
+            "__keep_request__": keep_request,
+            "__init__": _compact_init,
+            "__repr__": _compact_repr,
+            "__reduce__": _compact_reduce,
+            "__compact_of__": cls,
+        },
+    )
+    if issubclass(cls, ResourceShort):
+        ResourceLike.register(compact_cls)
+    return compact_cls
+
+
+def _class_attr(cls: type, name: str):
+    return next(klass.__dict__[name] for klass in cls.__mro__ if name in klass.__dict__)
+
+
+def projection(cls: type, *attrs: str) -> str:
+    """
+    Значение параметра fields для чтения только перечисленных полей модели
+
+    projection(Resource, "path", "embedded.items.size") == "path,_embedded.items.size"
+
+    Parameters
+    ----------
+    cls : Класс, объявленный через request_map
+    attrs : Имена полей, вложенные поля через точку
+    """
+    return slim(cls, *attrs).__fields__
+
+
+def slim(cls: type[T], *attrs: str) -> type[T]:
+    """
+    Подкласс модели, который разбирает только перечисленные поля
+
+    Класс можно передать в параметр fields методов Disk: запрос получит projection(cls, *attrs),
+    а результат будет объектом этого класса. Ключи ответа вне проекции не сохраняются,
+    вложенные модели и элементы списков тоже урезаны.
+    compact(slim(...)) хранит слоты только для полей проекции.
+
+    Parameters
+    ----------
+    cls : Класс, объявленный через request_map
+    attrs : Имена полей, вложенные поля через точку: "embedded.items.path"
+    """
+    return _slim(cls, tuple(dict.fromkeys(attrs)))
+
+
+@functools.cache
+def _slim(cls: type[T], attrs: tuple[str, ...]) -> type[T]:
+    attr_plan = _attr_plan(cls)
+    nested: dict[str, list[str]] = {}
+    for attr in attrs:
+        head, _, rest = attr.partition(".")
+        nested.setdefault(head, [])
+        if rest:
+            nested[head].append(rest)
+
+    namespace = {}
+    slim_plan = {}
+    fields = []
+    for attr_name, rest in nested.items():
+        # Поля, не объявленные в модели (например size у элементов ResourceList),
+        # читаются из ответа как есть, так же как в request_map
+        key_dict, convert = attr_plan.get(attr_name, (attr_name, None))
+        if convert is _DESCRIPTOR:
+            item_type = _class_attr(cls, attr_name).item_type
+            if rest:
+                item_type = _slim(item_type, tuple(rest))
+            namespace[attr_name] = descriptor = EmbeddedResources(item_type)
+            descriptor.__set_name__(cls, attr_name)
+            nested_fields = item_type.__fields__ if rest else ""
+        elif rest and isinstance(convert, type) and hasattr(convert, "__request_map__"):
+            convert = _slim(convert, tuple(rest))
+            nested_fields = convert.__fields__
+        else:
+            nested_fields = ",".join(rest)
+        slim_plan[key_dict] = (attr_name, convert)
+        if nested_fields:
+            fields += (f"{key_dict}.{path}" for path in nested_fields.split(","))
+        else:
+            fields.append(key_dict)
+
+    slim_cls = type(
+        cls.__name__,
+        (cls,),
+        namespace | {
+            "__module__": cls.__module__,
+            "__qualname__": f"slim({cls.__qualname__})",
+            "__doc__": cls.__doc__,
+            "__request_plan__": slim_plan,
+            "__fields__": ",".join(fields),
+            "__slim_of__": cls,
+            "__slim_attrs__": attrs,
+        },
+    )
+    return slim_cls
+
+
+def _model(model_type: type[T], fields: fields_type) -> type[T]:
+    """Класс результата метода: slim-класс из fields, если он построен от model_type"""
+    if isinstance(fields, type) and issubclass(fields, model_type):
+        return fields
+    return model_type
+
+
 @request_map
 class UserInfo:
     country: str
@@ -256,6 +912,15 @@ class ShareInfo:
     rights: str  # (string): <Права доступа>
 
 
+class ResourceLike(abc.ABC):
+    """
+    Ресурс с полем path: ResourceShort и его подклассы, а также их компактные варианты
+
+    Методы Disk проверяют аргументы path через isinstance(path, ResourceLike):
+    compact-классы не наследуют модели и регистрируются здесь
+    """
+
+
 @request_map
 class ResourceShort:
     resource_id: str  # (string, optional): <Идентификатор ресурса>,
@@ -269,6 +934,9 @@ class ResourceShort:
     comment_ids: CommentIds  # , optional)
 
 
+ResourceLike.register(ResourceShort)
+
+
 @request_map
 class FileShort(ResourceShort):
     antivirus_status: str  # (object, optional): <Статус проверки антивирусом>,
@@ -427,12 +1095,47 @@ class Link:
 @dataclass(unsafe_hash=True, frozen=True)
 class Disk:
     token: str = dataclasses.field(hash=True)
+    transport: Transport = dataclasses.field(
+        default_factory=Transport, hash=False, compare=False, repr=False
+    )
+    "Общий пул HTTP-соединений для всех запросов и передач файлов"
+    page_size: int = dataclasses.field(default=1000, hash=False, compare=False)
+    "Сколько элементов запрашивать на странице при обходе списков"
+    prefetch_pages: int = dataclasses.field(default=4, hash=False, compare=False)
+    "Сколько следующих страниц списка запрашивать параллельно, если известно общее количество"
+    page_cache: typing.Callable[[], PageCache] = dataclasses.field(
+        default=PageCache, hash=False, compare=False, repr=False
+    )
+    "Фабрика кэша страниц для каждого запроса, PageCache.stream - ничего не хранить"
+    lazy: bool = dataclasses.field(default=True, hash=False, compare=False)
+    "Откладывать GET-запросы до первого обращения к результату, см. Request"
+    timestamps: TimestampMode = dataclasses.field(
+        default="datetime", hash=False, compare=False
+    )
+    "Представление дат в моделях: datetime, string (исходная строка) или epoch (секунды)"
+    lazy_fields: bool = dataclasses.field(default=False, hash=False, compare=False)
+    "Разбирать поля моделей при первом обращении к ним, а не при создании объекта"
+    json_loads: jsonlib.Decoder = dataclasses.field(
+        default=jsonlib.loads, hash=False, compare=False, repr=False
+    )
+    "Разбор JSON ответов из байтов, по умолчанию orjson/msgspec/ujson, если установлены"
+    metadata_cache: MetadataCache | None = dataclasses.field(
+        default=None, hash=False, compare=False, repr=False
+    )
+    "Кэш ответов resource_info, None - не кэшировать"
+    rate_limiter: RateLimiter | None = dataclasses.field(
+        default=None, hash=False, compare=False, repr=False
+    )
+    "Общий ограничитель частоты и числа одновременных запросов к API, None - без ограничения"
+    _inflight: InflightCalls = dataclasses.field(
+        default_factory=InflightCalls, init=False, hash=False, compare=False, repr=False
+    )
 
     def resource_info(
             self,
             path: str | ResourceShort,
             *,
-            fields: str = None,
+            fields: fields_type = None,
             limit: int = None,
             offset: int = None,
             preview_crop: bool = None,
@@ -459,16 +1162,16 @@ class Disk:
         """
 
         params = args_asdict({"self": None})
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             params["path"] = path.path
 
         request = Request(self, "GET", "/v1/disk/resources", params=params)
-        return Resource(request)
+        return _model(Resource, fields)(request)
 
     def remove_resource(
             self,
             path: str | ResourceShort,
-            fields: str = None,
+            fields: fields_type = None,
             md5: str = None,
             permanently: bool = None,
             force_async: bool = None,
@@ -490,7 +1193,7 @@ class Disk:
 
         """
         params = args_asdict({"self": None})
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             params["path"] = path.path
 
         request = Request(self, "DELETE", "/v1/disk/resources", params)
@@ -504,7 +1207,7 @@ class Disk:
             target: str | ResourceShort,
             *,
             overwrite: bool = None,
-            fields: str = None,
+            fields: fields_type = None,
             force_async: bool = None,
     ) -> Link:
         """
@@ -522,9 +1225,9 @@ class Disk:
         Иначе вернёт ответ с кодом 201 и ссылкой на созданный ресурс.
         """
 
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
-        if isinstance(target, ResourceShort):
+        if isinstance(target, ResourceLike):
             target = target.path
         params = args_asdict({"self": None, "path": "from", "target": "path"})
         request = Request(self, "POST", "/v1/disk/resources/move", params)
@@ -536,7 +1239,7 @@ class Disk:
             target: str | ResourceShort,
             *,
             overwrite: bool = False,
-            fields: str = None,
+            fields: fields_type = None,
             force_async: bool = None,
     ) -> Link:
         """
@@ -554,9 +1257,9 @@ class Disk:
         Иначе вернёт ответ с кодом 201 и ссылкой на созданный ресурс.
         """
 
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
-        if isinstance(target, ResourceShort):
+        if isinstance(target, ResourceLike):
             target = target.path
 
         params = args_asdict({"self": None, "path": "from", "target": "path"})
@@ -564,7 +1267,7 @@ class Disk:
         return Link(request)
 
     def update_resource(
-            self, path: str | ResourceShort, body: Any, *, fields: str = None
+            self, path: str | ResourceShort, body: Any, *, fields: fields_type = None
     ) -> ResourceShort:
         """
         Обновить пользовательские данные
@@ -578,13 +1281,13 @@ class Disk:
         -------
 
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
         params = args_asdict({"self": None, "body": None})
         request = Request(self, "PATCH", "/v1/disk/resources", params, body=body)
-        return ResourceShort(request)
+        return _model(ResourceShort, fields)(request)
 
-    def mkdir(self, path: str | ResourceShort, *, fields: str = None) -> Link:
+    def mkdir(self, path: str | ResourceShort, *, fields: fields_type = None) -> Link:
         """
         Создает папку
         Parameters
@@ -596,14 +1299,14 @@ class Disk:
         -------
 
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
         params = args_asdict({"self": None})
         request = Request(self, "PUT", "/v1/disk/resources", params)
         return Link(request)
 
     def download_resource(
-            self, path: str | ResourceShort, *, fields: str = None
+            self, path: str | ResourceShort, *, fields: fields_type = None
     ) -> Link:
         """
         Получить ссылку на скачивание файла
@@ -615,14 +1318,14 @@ class Disk:
         Returns
         -------
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
         params = args_asdict({"self": None})
         request = Request(self, "GET", "/v1/disk/resources/download", params)
         return Link(request)
 
     def download_public_resource(
-            self, public_key: str, *, path: str = None, fields: str = None
+            self, public_key: str, *, path: str = None, fields: fields_type = None
     ) -> Link:
         """
         Получить ссылку на скачивание файла
@@ -642,7 +1345,7 @@ class Disk:
     def files(
             self,
             *,
-            fields: str = None,
+            fields: fields_type = None,
             media_type: str = None,
             limit: int = None,
             offset: int = None,
@@ -669,13 +1372,13 @@ class Disk:
 
         params = args_asdict({"self": None})
         request = Request(self, "GET", "/v1/disk/resources/files", params)
-        return FilesResourceList(request)
+        return _model(FilesResourceList, fields)(request)
 
     def last_uploaded(
             self,
             *,
             limit: int = None,
-            fields: str = None,
+            fields: fields_type = None,
             media_type: str = None,
             preview_crop: bool = None,
             preview_size: str = None,
@@ -699,12 +1402,12 @@ class Disk:
         """
         params = args_asdict({"self": None})
         request = Request(self, "GET", "/v1/disk/resources/last-uploaded", params)
-        return LastUploadedResourceList(request)
+        return _model(LastUploadedResourceList, fields)(request)
 
     def public(
             self,
             *,
-            fields: str = None,
+            fields: fields_type = None,
             limit: int = None,
             offset: int = None,
             preview_crop: bool = None,
@@ -730,9 +1433,9 @@ class Disk:
 
         params = args_asdict({"self": None, "type_resource": "type"})
         request = Request(self, "GET", "/v1/disk/resources/public", params)
-        return PublicResourcesList(request)
+        return _model(PublicResourcesList, fields)(request)
 
-    def publish(self, path: str | ResourceShort, *, fields: str = None) -> Link:
+    def publish(self, path: str | ResourceShort, *, fields: fields_type = None) -> Link:
         """
         Опубликовать ресурс
         Parameters
@@ -744,13 +1447,13 @@ class Disk:
         -------
 
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
         params = args_asdict({"self": None})
         request = Request(self, "PUT", "/v1/disk/public/resources/publish", params)
         return Link(request)
 
-    def unpublish(self, path: str | ResourceShort, *, fields: str = None) -> Link:
+    def unpublish(self, path: str | ResourceShort, *, fields: fields_type = None) -> Link:
         """
         Отметить публикацию ресурса
         Parameters
@@ -762,7 +1465,7 @@ class Disk:
         -------
 
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
 
         params = args_asdict({"self": None})
@@ -770,7 +1473,7 @@ class Disk:
         return Link(request)
 
     def upload_file(
-            self, path: str | ResourceShort, *, fields: str = None, overwrite: bool = None
+            self, path: str | ResourceShort, *, fields: fields_type = None, overwrite: bool = None
     ) -> ResourceUploadLink:
         """
         Получить ссылку для загрузки файла
@@ -785,7 +1488,7 @@ class Disk:
         -------
 
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
         params = args_asdict({"self": None})
         request = Request(self, "GET", "/v1/disk/resources/upload", params)
@@ -797,7 +1500,7 @@ class Disk:
             url: href,
             *,
             disable_redirects: bool = None,
-            fields: str = None,
+            fields: fields_type = None,
     ) -> Link:
         """
         Загрузить файл в Диск по url
@@ -813,7 +1516,7 @@ class Disk:
         Загрузка происходит асинхронно. Поэтому в ответ на запрос возвращается ссылка на асинхронную операцию.
 
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
 
         params = args_asdict({"self": None})
@@ -824,7 +1527,7 @@ class Disk:
             self,
             public_key: str,
             *,
-            fields: str = None,
+            fields: fields_type = None,
             limit: int = None,
             offset: int = None,
             path: str = None,
@@ -853,13 +1556,13 @@ class Disk:
 
         params = args_asdict({"self": None})
         request = Request(self, "GET", "/v1/disk/public/resources", params)
-        return PublicResource(request)
+        return _model(PublicResource, fields)(request)
 
     def savetodisk_public_resource(
             self,
             public_key: str,
             *,
-            fields: str = None,
+            fields: fields_type = None,
             name: str = None,
             path: str = None,
             save_path: str = None,
@@ -891,7 +1594,7 @@ class Disk:
     def trash_restore(
             self,
             path: str | ResourceShort,
-            fields: str = None,
+            fields: fields_type = None,
             name: str = None,
             overwrite: bool = None,
             force_async: bool = None,
@@ -910,7 +1613,7 @@ class Disk:
         Если восстановление происходит асинхронно, то вернёт ответ с кодом 202 и ссылкой на асинхронную операцию.
         Иначе вернёт ответ с кодом 201 и ссылкой на созданный ресурс.
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
 
         params = args_asdict({"self": None})
@@ -920,7 +1623,7 @@ class Disk:
     def trash(
             self,
             path: str | ResourceShort = "/",
-            fields: str = None,
+            fields: fields_type = None,
             preview_crop: bool = None,
             preview_size: str = None,
             sort: str = None,
@@ -941,18 +1644,18 @@ class Disk:
         -------
 
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
 
         params = args_asdict({"self": None})
         request = Request(self, "GET", "/v1/disk/trash/resources", params)
-        return TrashResource(request)
+        return _model(TrashResource, fields)(request)
 
     def trash_clear(
             self,
             *,
             path: str = ResourceShort | None,
-            fields: str = None,
+            fields: fields_type = None,
             force_async: bool = None,
     ) -> Link:
         """
@@ -970,7 +1673,7 @@ class Disk:
         Если удаление происходит асинхронно, то вернёт ответ со статусом 202 и ссылкой на асинхронную операцию.
         Иначе вернёт ответ со статусом 204 и пустым телом.
         """
-        if isinstance(path, ResourceShort):
+        if isinstance(path, ResourceLike):
             path = path.path
 
         params = args_asdict({"self": None})
@@ -981,7 +1684,7 @@ class Disk:
             self,
             operation_id: str,
             *,
-            fields: str = None,
+            fields: fields_type = None,
     ) -> str:
         """
         Получить статус асинхронной операции
@@ -1000,10 +1703,57 @@ class Disk:
         )
         return request.response_body["status"]
 
+    def wait_operation(
+            self,
+            operation: str | Link | None,
+            *,
+            timeout: float = None,
+            max_delay: float = 10.0,
+    ) -> operations.OperationResult:
+        """
+        Дождаться завершения асинхронной операции, опрашивая статус с растущим интервалом
+
+        Parameters
+        ----------
+        operation : Идентификатор операции или Link, который вернул move_resource, copy_resource и т.п.
+        timeout : Предельное время ожидания, секунды, None - без ограничения
+        max_delay : Максимальный интервал между запросами статуса
+
+        Returns
+        -------
+        OperationResult со статусом success, failed, timeout или error
+        """
+        return operations.OperationWaiter(self, max_delay=max_delay).wait(operation, timeout)
+
+    def wait_operations(
+            self,
+            pending: Iterable[str | Link | None],
+            *,
+            timeout: float = None,
+            max_workers: int = 4,
+            rate: float = None,
+    ) -> Iterable[operations.OperationResult]:
+        """
+        Дождаться множества асинхронных операций одним планировщиком, см. operations.OperationWaiter
+
+        Parameters
+        ----------
+        pending : Идентификаторы операций или Link
+        timeout : Предельное время ожидания каждой операции, секунды
+        max_workers : Сколько запросов статуса выполнять одновременно
+        rate : Не больше rate запросов статуса в секунду, None - без ограничения
+
+        Returns
+        -------
+        Генератор OperationResult в порядке завершения
+        """
+        waiter = operations.OperationWaiter(self, max_workers=max_workers, rate=rate)
+        return waiter.wait_many(pending, timeout)
+
     def info(
             self,
             *,
-            fields: str = None,
+            fields: fields_type = None,
             preview_crop: bool = None,
             preview_size: str = None,
             sort: str = None,
@@ -1023,20 +1773,116 @@ class Disk:
         """
         params = args_asdict({"self": None})
         request = Request(self, "GET", "/v1/disk/", params)
-        return DiskInfo(request)
+        return _model(DiskInfo, fields)(request)
 
     def download_file(
             self,
             remote_pathname: str,
             local_pathname: str,
             progress_fn: typing.Callable[[int], None] = None,
-            chunk_size: int = 8192,
+            chunk_size: int = None,
+            timeout: timeout_type = None,
+            connections: int = 1,
+            verify: bool = True,
+            resume: bool = False,
+            zero_copy: bool = False,
     ):
+        """
+        Скачать файл
+
+        Parameters
+        ----------
+        remote_pathname : Путь к файлу на Диске
+        local_pathname : Локальный файл
+        progress_fn : Вызывается с количеством скачанных байт
+        chunk_size : Размер блока чтения ответа, по умолчанию 8 КиБ, для zero_copy - под файловую систему
+        timeout : Таймаут запросов
+        connections : Больше 1 - скачивать диапазонами через несколько соединений
+        verify : Для скачивания диапазонами сверить md5/sha256 результата
+        resume : Докачивать: скачанные диапазоны хранятся в файле local_pathname + ".ydpart",
+            повторный вызов запрашивает только недостающие, если удалённый файл не изменился
+        zero_copy : Читать ответ в переиспользуемые буферы (readinto) вместо нового bytes на каждый блок
+
+        Returns
+        -------
+
+        Raises
+        ------
+        download.NotAFileError : remote_pathname - папка (при connections > 1 или resume)
+        download.ChecksumError : Хэш скачанного файла не совпал с метаинформацией
+        """
+        pool = None
+        if zero_copy:
+            if chunk_size is None:
+                chunk_size = buffers.default_chunk_size(local_pathname)
+            pool = buffers.BufferPool(chunk_size)
+        elif chunk_size is None:
+            chunk_size = 8192
+
+        if connections > 1 or resume:
+            info = self.resource_info(
+                remote_pathname, fields="type,size,md5,sha256,modified,revision"
+            )
+            if info.type != "file":
+                raise download.NotAFileError(f"{remote_pathname}: {info.type}")
+            modified = getattr(info, "modified", None)
+            remote = download.DownloadState(
+                size=info.size,
+                md5=getattr(info, "md5", None),
+                sha256=getattr(info, "sha256", None),
+                modified=None if modified is None else str(modified),
+                revision=getattr(info, "revision", None),
+            )
+            state = state_pathname = None
+            if resume:
+                state_pathname = local_pathname + download.STATE_SUFFIX
+                state = download.DownloadState.load(state_pathname)
+                if (
+                        state is None
+                        or not state.matches(remote)
+                        or not os.path.exists(local_pathname)
+                ):
+                    state = remote
+            link = self.download_resource(path=remote_pathname)
+            try:
+                download.download_ranged(
+                    self.transport,
+                    link.href,
+                    local_pathname,
+                    remote.size,
+                    connections=connections,
+                    chunk_size=chunk_size,
+                    progress_fn=progress_fn,
+                    timeout=timeout,
+                    state=state,
+                    state_pathname=state_pathname,
+                    pool=pool,
+                )
+            except download.RangeNotSupportedError:
+                if state_pathname is not None:
+                    os.remove(state_pathname)
+            else:
+                try:
+                    if verify:
+                        download.verify_checksum(
+                            local_pathname, md5=remote.md5, sha256=remote.sha256
+                        )
+                finally:
+                    # После ошибки сверки следующая попытка начнёт с нуля
+                    if state_pathname is not None:
+                        os.remove(state_pathname)
+                return
+
         link = self.download_resource(path=remote_pathname)
-        with requests.get(link.href, stream=True) as r:
+        with self.transport.get(link.href, stream=True, timeout=timeout) as r:
             with open(local_pathname, "wb") as f:
                 loaded_size = 0
-                for chunk in r.iter_content(chunk_size=chunk_size):
+                chunks = (
+                    buffers.iter_into(r, pool)
+                    if pool is not None
+                    else r.iter_content(chunk_size=chunk_size)
+                )
+                for chunk in chunks:
                     f.write(chunk)
                     loaded_size += len(chunk)
                     if callable(progress_fn):
@@ -1048,25 +1894,89 @@ class Disk:
             local_pathname: str,
             overwrite: bool = False,
             progress_fn: typing.Callable[[int], None] = None,
-            chunk_size: int = 8192,
-    ):
+            chunk_size: int = None,
+            timeout: timeout_type = None,
+            retries: int = 5,
+            resume: bool = False,
+            zero_copy: bool = False,
+            skip_identical: bool = False,
+            hash_cache: HashCache = None,
+    ) -> upload.UploadResult:
+        """
+        Загрузить файл на Диск
+
+        Parameters
+        ----------
+        remote_pathname : Путь к файлу на Диске
+        local_pathname : Локальный файл
+        overwrite : Перезаписать существующий файл
+        progress_fn : Вызывается с количеством переданных байт
+        chunk_size : Размер блока чтения файла, по умолчанию 1 МиБ, для zero_copy - под файловую систему
+        timeout : Таймаут запросов
+        retries : Количество повторов при обрыве соединения или временной ошибке сервера
+        resume : Продолжать прерванную передачу с принятого сервером смещения. Включать только
+            для сервера загрузки с поддержкой докачки (ответ 308 на PUT с Content-Range: bytes */size)
+        zero_copy : Передавать файл из mmap срезами memoryview, без копии каждого блока
+        skip_identical : Не передавать файл, если на Диске по этому пути уже лежит файл
+            того же размера с теми же md5/sha256 (хэши считаются параллельно с запросом метаинформации)
+        hash_cache : Кэш хэшей локальных файлов для skip_identical
+
+        Returns
+        -------
+        UploadResult с идентификатором операции и итоговым статусом,
+        skipped=True - файл уже был на Диске
+        """
+
+        def remote_file():
+            try:
+                resource = self.resource_info(
+                    remote_pathname, fields=("type", "size", "md5", "sha256")
+                )
+                return resource if resource.type == "file" else None
+            except RequestError as e:
+                if e.args[0].error != "DiskNotFoundError":
+                    raise
+                return None
+
         def none_if_false(value):
             return True if value is not None and value else None
 
-        def get_chunks():
-            total_read = 0
-            with open(local_pathname, "rb") as f:
-                while chunk := f.read(chunk_size):
-                    total_read += len(chunk)
-                    yield chunk
-                    if callable(progress_fn):
-                        progress_fn(total_read)
+        if chunk_size is None:
+            chunk_size = (
+                buffers.default_chunk_size(local_pathname) if zero_copy else 1 << 20
+            )
 
-        link = self.upload_file(
-            path=remote_pathname, overwrite=none_if_false(overwrite)
-        )
-        requests.put(link.href, data=get_chunks(), stream=True)
-        return link.operation_id
+        if skip_identical and upload.is_uploaded(
+                local_pathname,
+                remote_file,
+                hash_cache.hashes if hash_cache is not None else None,
+        ):
+            return upload.UploadResult(
+                operation_id=None,
+                href=None,
+                status_code=200,
+                size=os.path.getsize(local_pathname),
+                attempts=0,
+                skipped=True,
+            )
+        try:
+            return upload.upload_file(
+                self.transport,
+                partial(
+                    self.upload_file, path=remote_pathname, overwrite=none_if_false(overwrite)
+                ),
+                local_pathname,
+                chunk_size=chunk_size,
+                retries=retries,
+                resume=resume,
+                progress_fn=progress_fn,
+                timeout=timeout,
+                zero_copy=zero_copy,
+            )
+        finally:
+            # Файл загружается мимо API, Request кэш не сбросит
+            if self.metadata_cache is not None:
+                self.metadata_cache.invalidate(remote_pathname)
 
     def remove(
             self,
@@ -1086,3 +1996,257 @@ class Disk:
         )
         if force_async and isinstance(link, Link):
             return link.operation_id
+
+    def walk(
+            self,
+            root: str | ResourceShort = "/",
+            *,
+            max_workers: int = 8,
+            max_depth: int = None,
+            filter: typing.Callable[[ResourceShort], bool] = None,
+            order: typing.Literal["bfs", "dfs"] = "bfs",
+            fields: typing.Sequence[str] = None,
+            rate: float = None,
+    ) -> typing.Iterator[ResourceShort]:
+        """
+        Рекурсивный обход дерева, папки читаются параллельно, см. walk.walk
+
+        Parameters
+        ----------
+        root : Папка, с которой начинается обход
+        max_workers : Сколько папок читать одновременно
+        max_depth : Глубина обхода, 1 - только содержимое root, None - без ограничения
+        filter : filter(resource) == False - ресурс не выдаётся, а папка не обходится
+        order : bfs - по уровням, dfs - сначала вглубь
+        fields : Нужные поля элементов, path и type запрашиваются всегда
+        rate : Не больше rate запросов списков в секунду
+
+        Returns
+        -------
+        Генератор ResourceShort
+        """
+        if isinstance(root, ResourceLike):
+            root = root.path
+        return walk.walk(
+            self,
+            root,
+            max_workers=max_workers,
+            max_depth=max_depth,
+            filter=filter,
+            order=order,
+            fields=fields,
+            rate=rate,
+        )
+
+    def sync(
+            self,
+            local_dir: str,
+            remote_dir: str,
+            direction: sync.Direction = "both",
+            *,
+            delete: bool = False,
+            max_workers: int = 4,
+            hash_cache: HashCache = None,
+            dry_run: bool = False,
+            progress_fn: typing.Callable[[BatchResult], None] = None,
+    ) -> sync.SyncResult:
+        """
+        Синхронизировать локальную папку с папкой на Диске, см. sync.sync
+
+        Parameters
+        ----------
+        local_dir : Локальная папка
+        remote_dir : Папка на Диске
+        direction : upload - на Диск, download - с Диска, both - в обе стороны без удалений
+        delete : Для upload/download удалять на принимающей стороне то, чего нет на исходной
+        max_workers : Сколько файлов передавать одновременно
+        hash_cache : Кэш хэшей локальных файлов, HashCache(файл) - между запусками
+        dry_run : Только составить план (SyncResult.plan)
+        progress_fn : Вызывается с результатом каждого выполненного действия
+
+        Returns
+        -------
+        SyncResult с планом и результатами действий
+        """
+        return sync.sync(
+            self,
+            local_dir,
+            remote_dir,
+            direction,
+            delete=delete,
+            max_workers=max_workers,
+            hash_cache=hash_cache,
+            dry_run=dry_run,
+            progress_fn=progress_fn,
+        )
+
+    def transfers(
+            self,
+            *,
+            max_workers: int = 4,
+            split_size: int = transfers.SPLIT_SIZE,
+            connections: int = 4,
+            progress_fn: typing.Callable[[transfers.TransferJob, transfers.TransferStats], None] = None,
+    ) -> transfers.TransferManager:
+        """
+        Очередь параллельных загрузок и скачиваний, см. transfers.TransferManager
+
+        Parameters
+        ----------
+        max_workers : Сколько файлов передавать одновременно
+        split_size : Размер файла, с которого скачивание идёт диапазонами
+        connections : Количество соединений для скачивания диапазонами
+        progress_fn : Вызывается с заданием и общей сводкой при передаче очередного блока
+        """
+        return transfers.TransferManager(
+            self,
+            max_workers=max_workers,
+            split_size=split_size,
+            connections=connections,
+            progress_fn=progress_fn,
+        )
+
+    def resource_info_many(
+            self,
+            paths: Iterable[str | ResourceShort],
+            *,
+            fields: fields_type = None,
+            max_workers: int = 8,
+            ordered: bool = False,
+    ) -> Iterable[BatchResult[str | ResourceShort, Resource]]:
+        """
+        Получить метаинформацию о множестве ресурсов параллельно
+
+        Parameters
+        ----------
+        paths : Пути к ресурсам
+        fields : Список возвращаемых атрибутов
+        max_workers : Максимальное количество одновременных запросов,
+            имеет смысл не больше transport pool_maxsize
+        ordered : True - результаты в порядке paths, False - в порядке завершения
+
+        Returns
+        -------
+        Генератор BatchResult, ошибка RequestError для пути попадает в BatchResult.error
+        """
+        return run_batch(
+            lambda path: execute(self.resource_info(path, fields=fields)),
+            paths,
+            max_workers=max_workers,
+            ordered=ordered,
+            errors=(RequestError,),
+        )
+
+    def remove_resource_many(
+            self,
+            paths: Iterable[str | ResourceShort],
+            *,
+            permanently: bool = None,
+            force_async: bool = None,
+            max_workers: int = 8,
+            ordered: bool = False,
+    ) -> Iterable[BatchResult[str | ResourceShort, Link | None]]:
+        """
+        Удалить множество ресурсов параллельно, см. remove_resource и resource_info_many
+        """
+        return run_batch(
+            partial(
+                self.remove_resource, permanently=permanently, force_async=force_async
+            ),
+            paths,
+            max_workers=max_workers,
+            ordered=ordered,
+            errors=(RequestError,),
+        )
+
+    def move_resource_many(
+            self,
+            pairs: Iterable[tuple[str | ResourceShort, str | ResourceShort]],
+            *,
+            overwrite: bool = None,
+            force_async: bool = None,
+            max_workers: int = 8,
+            ordered: bool = False,
+    ) -> Iterable[BatchResult[tuple[str | ResourceShort, str | ResourceShort], Link]]:
+        """
+        Переместить множество ресурсов параллельно
+
+        Parameters
+        ----------
+        pairs : Пары (path, target)
+
+        Остальное см. move_resource и resource_info_many
+        """
+        return run_batch(
+            lambda pair: self.move_resource(
+                *pair, overwrite=overwrite, force_async=force_async
+            ),
+            pairs,
+            max_workers=max_workers,
+            ordered=ordered,
+            errors=(RequestError,),
+        )
+
+    def copy_resource_many(
+            self,
+            pairs: Iterable[tuple[str | ResourceShort, str | ResourceShort]],
+            *,
+            overwrite: bool = False,
+            force_async: bool = None,
+            max_workers: int = 8,
+            ordered: bool = False,
+    ) -> Iterable[BatchResult[tuple[str | ResourceShort, str | ResourceShort], Link]]:
+        """
+        Скопировать множество ресурсов параллельно
+
+        Parameters
+        ----------
+        pairs : Пары (path, target)
+
+        Остальное см. copy_resource и resource_info_many
+        """
+        return run_batch(
+            lambda pair: self.copy_resource(
+                *pair, overwrite=overwrite, force_async=force_async
+            ),
+            pairs,
+            max_workers=max_workers,
+            ordered=ordered,
+            errors=(RequestError,),
+        )
+
+    def publish_many(
+            self,
+            paths: Iterable[str | ResourceShort],
+            *,
+            max_workers: int = 8,
+            ordered: bool = False,
+    ) -> Iterable[BatchResult[str | ResourceShort, Link]]:
+        """
+        Опубликовать множество ресурсов параллельно, см. publish и resource_info_many
+        """
+        return run_batch(
+            self.publish,
+            paths,
+            max_workers=max_workers,
+            ordered=ordered,
+            errors=(RequestError,),
+        )
+
+    def unpublish_many(
+            self,
+            paths: Iterable[str | ResourceShort],
+            *,
+            max_workers: int = 8,
+            ordered: bool = False,
+    ) -> Iterable[BatchResult[str | ResourceShort, Link]]:
+        """
+        Отменить публикацию множества ресурсов параллельно, см. unpublish и resource_info_many
+        """
+        return run_batch(
+            self.unpublish,
+            paths,
+            max_workers=max_workers,
+            ordered=ordered,
+            errors=(RequestError,),
+        )
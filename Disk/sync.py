@@ -0,0 +1,372 @@
+import os
+import shutil
+import typing
+from dataclasses import dataclass, field
+
+from .batch import BatchResult, run_batch
+from .hashing import HashCache
+from .metadata_cache import normalize_path
+from .transfers import TransferManager
+from .timestamps import to_epoch
+
+if typing.TYPE_CHECKING:
+    from .rest_api import Disk
+
+Direction: typing.TypeAlias = typing.Literal["upload", "download", "both"]
+ActionKind: typing.TypeAlias = typing.Literal[
+    "mkdir_remote", "mkdir_local", "upload", "download", "delete_remote", "delete_local"
+]
+
+SYNC_FIELDS = ("size", "md5", "sha256", "modified")
+"Поля элементов удалённого списка, нужные для сравнения"
+
+
+@dataclass
+class Entry:
+    """
+    Файл или папка одной из сторон синхронизации
+    """
+
+    is_dir: bool
+    size: int | None = None
+    modified: int | None = None
+    "Время изменения, секунды от начала эпохи"
+    md5: str | None = None
+    sha256: str | None = None
+
+
+@dataclass
+class SyncAction:
+    """
+    Одно действие плана синхронизации
+    """
+
+    kind: ActionKind
+    path: str
+    "Путь относительно local_dir/remote_dir, через /"
+    size: int = 0
+    "Размер передаваемого файла"
+    remote: Entry | None = None
+    "Удалённый ресурс: для download его хэши и время изменения переносятся на локальный файл"
+
+
+@dataclass
+class SyncPlan:
+    """
+    План синхронизации: что передать, создать и удалить
+    """
+
+    local_dir: str
+    remote_dir: str
+    actions: list[SyncAction] = field(default_factory=list)
+    unchanged: int = 0
+    "Сколько файлов совпадают и не передаются"
+
+    @property
+    def transfer_bytes(self) -> int:
+        return sum(
+            action.size for action in self.actions if action.kind in ("upload", "download")
+        )
+
+
+@dataclass
+class SyncResult:
+    """
+    Итог синхронизации
+    """
+
+    plan: SyncPlan
+    results: list[BatchResult[SyncAction, typing.Any]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    @property
+    def errors(self) -> list[BatchResult[SyncAction, typing.Any]]:
+        return [result for result in self.results if not result.ok]
+
+
+def _join(remote_dir: str, path: str) -> str:
+    return remote_dir.rstrip("/") + "/" + path
+
+
+def local_entries(local_dir: str) -> dict[str, Entry]:
+    """Файлы и папки local_dir: относительный путь через / -> Entry"""
+    entries = {}
+    for dirpath, dirnames, filenames in os.walk(local_dir):
+        relative = os.path.relpath(dirpath, local_dir).replace(os.sep, "/")
+        prefix = "" if relative == "." else relative + "/"
+        for name in dirnames:
+            entries[prefix + name] = Entry(is_dir=True)
+        for name in filenames:
+            st = os.stat(os.path.join(dirpath, name))
+            entries[prefix + name] = Entry(
+                is_dir=False, size=st.st_size, modified=int(st.st_mtime)
+            )
+    return entries
+
+
+def remote_entries(disk: "Disk", remote_dir: str, max_workers: int = 8) -> dict[str, Entry]:
+    """Файлы и папки remote_dir (рекурсивно, через Disk.walk): относительный путь -> Entry"""
+    root = normalize_path(remote_dir).rstrip("/") + "/"
+    entries = {}
+    for resource in disk.walk(remote_dir, max_workers=max_workers, fields=SYNC_FIELDS):
+        modified = getattr(resource, "modified", None)
+        entries[normalize_path(resource.path)[len(root):]] = Entry(
+            is_dir=resource.type == "dir",
+            size=getattr(resource, "size", None),
+            modified=None if modified is None else to_epoch(modified),
+            md5=getattr(resource, "md5", None),
+            sha256=getattr(resource, "sha256", None),
+        )
+    return entries
+
+
+def _same_content(
+        local_pathname: str, local: Entry, remote: Entry, hash_cache: HashCache
+) -> bool:
+    if local.size != remote.size or not (remote.md5 or remote.sha256):
+        return False
+    md5, sha256 = hash_cache.hashes(local_pathname)
+    return remote.md5 in (None, md5) and remote.sha256 in (None, sha256)
+
+
+def _outermost(paths: typing.Iterable[str]) -> list[str]:
+    """Только пути, не вложенные в другие пути из списка: папка удаляется вместе с содержимым"""
+    result = []
+    for path in sorted(paths):
+        if not result or not path.startswith(result[-1] + "/"):
+            result.append(path)
+    return result
+
+
+def plan_sync(
+        disk: "Disk",
+        local_dir: str,
+        remote_dir: str,
+        direction: Direction = "both",
+        *,
+        delete: bool = False,
+        hash_cache: HashCache = None,
+        max_workers: int = 8,
+) -> SyncPlan:
+    """
+    Сравнить local_dir и remote_dir и составить план синхронизации
+
+    Файлы считаются одинаковыми, если совпадают размер и md5/sha256. Локальный файл
+    хэшируется, только если размер совпал, хэши берутся из hash_cache.
+    При direction="both" различающийся файл передаётся в сторону более старой копии,
+    а удаления не выполняются: без прошлого состояния удаление не отличить от создания.
+    Отсутствующая принимающая папка создаётся, отсутствующая исходная - ошибка
+    (иначе с delete=True план удалил бы всё на принимающей стороне).
+
+    Parameters
+    ----------
+    disk : Клиент Диска
+    local_dir : Локальная папка
+    remote_dir : Папка на Диске
+    direction : upload - локальная папка на Диск, download - с Диска, both - в обе стороны
+    delete : Для upload/download удалять на принимающей стороне то, чего нет на исходной
+    hash_cache : Кэш хэшей локальных файлов, None - только на время этого вызова
+    max_workers : Сколько папок Диска читать одновременно
+
+    Raises
+    ------
+    RequestError : remote_dir не существует при direction="download"
+    FileNotFoundError : local_dir не существует при direction="upload"
+    """
+    from .rest_api import RequestError
+
+    if hash_cache is None:
+        hash_cache = HashCache()
+    plan = SyncPlan(local_dir, remote_dir)
+
+    try:
+        disk.resource_info(remote_dir, fields="path").path
+    except RequestError as e:
+        if e.args[0].error != "DiskNotFoundError" or direction == "download":
+            raise
+        remote = {}
+        plan.actions.append(SyncAction("mkdir_remote", ""))
+    else:
+        remote = remote_entries(disk, remote_dir, max_workers)
+    if os.path.isdir(local_dir):
+        local = local_entries(local_dir)
+    elif direction == "upload":
+        raise FileNotFoundError(local_dir)
+    else:
+        local = {}
+        plan.actions.append(SyncAction("mkdir_local", ""))
+
+    push = direction in ("upload", "both")
+    pull = direction in ("download", "both")
+    deletions = []
+    for path in sorted(local.keys() | remote.keys()):
+        local_entry, remote_entry = local.get(path), remote.get(path)
+        if remote_entry is None:
+            if push:
+                kind = "mkdir_remote" if local_entry.is_dir else "upload"
+                plan.actions.append(SyncAction(kind, path, local_entry.size or 0))
+            elif delete:
+                deletions.append(("delete_local", path))
+        elif local_entry is None:
+            if pull:
+                kind = "mkdir_local" if remote_entry.is_dir else "download"
+                plan.actions.append(
+                    SyncAction(kind, path, remote_entry.size or 0, remote=remote_entry)
+                )
+            elif delete:
+                deletions.append(("delete_remote", path))
+        elif local_entry.is_dir or remote_entry.is_dir:
+            if local_entry.is_dir != remote_entry.is_dir:
+                # Файл с одной стороны и папка с другой: решать пользователю
+                continue
+        elif _same_content(
+                os.path.join(local_dir, *path.split("/")), local_entry, remote_entry, hash_cache
+        ):
+            plan.unchanged += 1
+        elif direction == "upload" or (
+                direction == "both" and (local_entry.modified or 0) >= (remote_entry.modified or 0)
+        ):
+            plan.actions.append(SyncAction("upload", path, local_entry.size or 0))
+        else:
+            plan.actions.append(
+                SyncAction("download", path, remote_entry.size or 0, remote=remote_entry)
+            )
+
+    for kind in ("delete_local", "delete_remote"):
+        paths = _outermost(path for action_kind, path in deletions if action_kind == kind)
+        plan.actions += (SyncAction(kind, path) for path in paths)
+    return plan
+
+
+def _transfer(
+        disk: "Disk",
+        plan: SyncPlan,
+        max_workers: int,
+        hash_cache: HashCache | None,
+        errors: tuple[type[Exception], ...],
+) -> typing.Iterator[BatchResult[SyncAction, typing.Any]]:
+    """Загрузки и скачивания плана через TransferManager"""
+    manager = TransferManager(disk, max_workers=max_workers)
+    for action in plan.actions:
+        local = os.path.join(plan.local_dir, *action.path.split("/"))
+        remote = _join(plan.remote_dir, action.path)
+        if action.kind == "upload":
+            manager.add_upload(local, remote, overwrite=True).tag = action
+        elif action.kind == "download":
+            manager.add_download(remote, local, action.size).tag = action
+
+    for result in manager.run(errors):
+        job, action = result.key, result.key.tag
+        value, error = result.value, result.error
+        if action.kind == "download" and result.ok:
+            value = job.local_pathname
+            remote = action.remote
+            try:
+                if remote is not None and remote.modified is not None:
+                    os.utime(value, (remote.modified, remote.modified))
+                if hash_cache is not None and remote is not None and remote.md5 and remote.sha256:
+                    hash_cache.put(value, remote.md5, remote.sha256)
+            except errors as e:
+                value, error = None, e
+        yield BatchResult(action, value, error)
+
+
+def execute_plan(
+        disk: "Disk",
+        plan: SyncPlan,
+        *,
+        max_workers: int = 4,
+        hash_cache: HashCache = None,
+        progress_fn: typing.Callable[[BatchResult[SyncAction, typing.Any]], None] = None,
+) -> SyncResult:
+    """
+    Выполнить план: сначала создаются папки, затем параллельно передаются файлы
+    (крупные первыми), в конце выполняются удаления
+
+    Parameters
+    ----------
+    disk : Клиент Диска
+    plan : План из plan_sync
+    max_workers : Сколько файлов передавать одновременно
+    hash_cache : Сюда записываются хэши скачанных файлов, чтобы не хэшировать их заново
+    progress_fn : Вызывается с результатом каждого выполненного действия
+    """
+    result = SyncResult(plan)
+    local_dir, remote_dir = plan.local_dir, plan.remote_dir
+
+    def local(path: str) -> str:
+        return os.path.join(local_dir, *path.split("/")) if path else local_dir
+
+    def run(action: SyncAction):
+        if action.kind == "mkdir_remote":
+            return disk.mkdir(_join(remote_dir, action.path) if action.path else remote_dir)
+        if action.kind == "mkdir_local":
+            return os.makedirs(local(action.path), exist_ok=True)
+        if action.kind == "delete_remote":
+            return disk.remove_resource(_join(remote_dir, action.path))
+        if action.kind == "delete_local":
+            pathname = local(action.path)
+            return shutil.rmtree(pathname) if os.path.isdir(pathname) else os.remove(pathname)
+        raise ValueError(action.kind)
+
+    def record(batch: typing.Iterable[BatchResult[SyncAction, typing.Any]]):
+        for item in batch:
+            result.results.append(item)
+            if callable(progress_fn):
+                progress_fn(item)
+
+    # Ошибка одного действия не останавливает остальные, она попадает в SyncResult.errors
+    errors = (Exception,)
+    # Папки по порядку: родитель раньше вложенных
+    mkdirs = sorted(
+        (action for action in plan.actions if action.kind.startswith("mkdir")),
+        key=lambda action: action.path,
+    )
+    record(run_batch(run, mkdirs, max_workers=1, ordered=True, errors=errors))
+    record(_transfer(disk, plan, max_workers, hash_cache, errors))
+    deletions = [action for action in plan.actions if action.kind.startswith("delete")]
+    record(run_batch(run, deletions, max_workers=max_workers, errors=errors))
+    return result
+
+
+def sync(
+        disk: "Disk",
+        local_dir: str,
+        remote_dir: str,
+        direction: Direction = "both",
+        *,
+        delete: bool = False,
+        max_workers: int = 4,
+        hash_cache: HashCache = None,
+        dry_run: bool = False,
+        progress_fn: typing.Callable[[BatchResult[SyncAction, typing.Any]], None] = None,
+) -> SyncResult:
+    """
+    Синхронизировать local_dir и remote_dir: plan_sync + execute_plan
+
+    Совпадающие файлы не передаются. Для повторных синхронизаций стоит передавать
+    hash_cache = HashCache(файл), чтобы не хэшировать неизменённые локальные файлы заново.
+
+    Parameters
+    ----------
+    disk : Клиент Диска
+    local_dir : Локальная папка
+    remote_dir : Папка на Диске
+    direction : upload, download или both
+    delete : Для upload/download удалять на принимающей стороне то, чего нет на исходной
+    max_workers : Сколько файлов передавать одновременно
+    hash_cache : Кэш хэшей локальных файлов
+    dry_run : Только составить план
+    progress_fn : Вызывается с результатом каждого выполненного действия
+    """
+    if hash_cache is None:
+        hash_cache = HashCache()
+    plan = plan_sync(disk, local_dir, remote_dir, direction, delete=delete, hash_cache=hash_cache)
+    if dry_run:
+        return SyncResult(plan)
+    return execute_plan(
+        disk, plan, max_workers=max_workers, hash_cache=hash_cache, progress_fn=progress_fn
+    )
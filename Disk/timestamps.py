@@ -0,0 +1,70 @@
+import typing
+from datetime import datetime, timedelta, timezone
+
+import dateutil.parser
+
+TimestampMode = typing.Literal["datetime", "string", "epoch"]
+"""
+Представление дат в моделях request_map:
+datetime - объект datetime,
+string - исходная строка ISO-8601 из ответа, разбирается при необходимости через parse_datetime,
+epoch - целое количество секунд от начала эпохи
+"""
+
+_TIMEZONES: dict[str, timezone] = {"+00:00": timezone.utc, "Z": timezone.utc}
+"Часовые пояса по суффиксу строки: один объект tzinfo на смещение, а не на каждое значение"
+
+
+def _timezone(suffix: str) -> timezone | None:
+    tz = _TIMEZONES.get(suffix)
+    if tz is None and len(suffix) == 6 and suffix[0] in "+-" and suffix[3] == ":":
+        try:
+            offset = timedelta(hours=int(suffix[1:3]), minutes=int(suffix[4:6]))
+        except ValueError:
+            return None
+        tz = _TIMEZONES[suffix] = timezone(-offset if suffix[0] == "-" else offset)
+    return tz
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Разобрать дату ISO-8601 из ответа API
+
+    Строки вида 2019-08-13T12:52:22+00:00 разбираются datetime.fromisoformat с общим объектом
+    часового пояса, остальные форматы - через dateutil.
+    """
+    if value.endswith("Z"):
+        tz, local = _TIMEZONES["Z"], value[:-1]
+    else:
+        tz, local = _timezone(value[-6:]), value[:-6]
+    if tz is not None:
+        try:
+            return datetime.fromisoformat(local).replace(tzinfo=tz)
+        except ValueError:
+            ...
+    return dateutil.parser.isoparse(value)
+
+
+def to_datetime(value: str | int | float | datetime) -> datetime:
+    """Дата в любом представлении TimestampMode -> datetime"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return parse_datetime(value)
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+def to_epoch(value: str | int | float | datetime) -> int:
+    """Дата в любом представлении TimestampMode -> секунды от начала эпохи"""
+    if isinstance(value, int):
+        return value
+    return int(to_datetime(value).timestamp())
+
+
+def convert(value, mode: TimestampMode = "datetime"):
+    """Дата из ответа API в представление mode"""
+    if mode == "string":
+        return value
+    if mode == "epoch":
+        return to_epoch(value)
+    return to_datetime(value)
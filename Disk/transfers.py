@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+import typing
+from dataclasses import dataclass, field
+from functools import partial
+
+from .batch import BatchResult, run_batch
+
+if typing.TYPE_CHECKING:
+    from .rest_api import Disk
+
+TransferKind: typing.TypeAlias = typing.Literal["upload", "download"]
+
+SPLIT_SIZE = 64 << 20
+"Файлы от этого размера скачиваются диапазонами через несколько соединений"
+
+
+@dataclass(eq=False)
+class TransferJob:
+    """
+    Передача одного файла
+    """
+
+    kind: TransferKind
+    local_pathname: str
+    remote_pathname: str
+    size: int = 0
+    "Размер файла, для download - если известен заранее (от него зависят порядок и разбиение)"
+    options: dict[str, typing.Any] = field(default_factory=dict)
+    "Дополнительные аргументы Disk.upload / Disk.download_file"
+    tag: typing.Any = None
+    "Произвольные данные вызывающего кода, например действие плана синхронизации"
+    transferred: int = 0
+    "Сколько байт уже передано"
+
+
+@dataclass
+class TransferStats:
+    """
+    Сводка по всем передачам TransferManager
+    """
+
+    files: int = 0
+    total_bytes: int = 0
+    "Суммарный размер файлов (для download - известных заранее)"
+    completed: int = 0
+    failed: int = 0
+    transferred: int = 0
+    "Сколько байт передано всеми заданиями"
+    started: float | None = None
+    "time.monotonic() начала run()"
+    finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Средняя скорость, байт в секунду"""
+        elapsed = self.elapsed
+        return self.transferred / elapsed if elapsed > 0 else 0.0
+
+
+class TransferManager:
+    """
+    Очередь загрузок и скачиваний, выполняемых в пуле потоков
+
+    Каждый поток сам получает ссылку и передаёт файл, так что получение ссылок одних файлов
+    идёт одновременно с передачей других. Крупные файлы запускаются первыми, чтобы не
+    оказаться в хвосте очереди, мелкие заполняют освободившиеся потоки. Мелкие файлы
+    не объединяются: каждый передаётся отдельным заданием со своей ссылкой, выигрыш
+    только от параллельности. Скачивания от split_size байт идут диапазонами через
+    connections соединений.
+
+    Использование:
+        manager = disk.transfers(max_workers=8)
+        for local, remote in pairs:
+            manager.add_upload(local, remote, overwrite=True)
+        for result in manager.run():
+            if not result.ok:
+                print(result.key.local_pathname, result.error)
+        print(manager.stats.throughput)
+    """
+
+    def __init__(
+            self,
+            disk: "Disk",
+            *,
+            max_workers: int = 4,
+            split_size: int = SPLIT_SIZE,
+            connections: int = 4,
+            progress_fn: typing.Callable[[TransferJob, TransferStats], None] = None,
+    ):
+        """
+        Parameters
+        ----------
+        disk : Клиент Диска
+        max_workers : Сколько файлов передавать одновременно
+        split_size : Размер файла, с которого скачивание идёт диапазонами
+        connections : Количество соединений для скачивания диапазонами
+        progress_fn : Вызывается из рабочих потоков при передаче очередного блока
+            с заданием и общей сводкой
+        """
+        self.disk = disk
+        self.max_workers = max_workers
+        self.split_size = split_size
+        self.connections = connections
+        self.progress_fn = progress_fn
+        self.jobs: list[TransferJob] = []
+        self.stats = TransferStats()
+        self._lock = threading.Lock()
+
+    def add(self, job: TransferJob) -> TransferJob:
+        self.jobs.append(job)
+        self.stats.files += 1
+        self.stats.total_bytes += job.size
+        return job
+
+    def add_upload(self, local_pathname: str, remote_pathname: str, **options) -> TransferJob:
+        """
+        Parameters
+        ----------
+        local_pathname : Локальный файл
+        remote_pathname : Путь на Диске
+        options : Аргументы Disk.upload (overwrite, skip_identical, ...)
+        """
+        return self.add(
+            TransferJob(
+                "upload", local_pathname, remote_pathname, os.path.getsize(local_pathname), options
+            )
+        )
+
+    def add_download(
+            self, remote_pathname: str, local_pathname: str, size: int = 0, **options
+    ) -> TransferJob:
+        """
+        Parameters
+        ----------
+        remote_pathname : Путь на Диске
+        local_pathname : Локальный файл
+        size : Размер файла, если известен (например, из списка папки)
+        options : Аргументы Disk.download_file (verify, resume, ...)
+        """
+        return self.add(TransferJob("download", local_pathname, remote_pathname, size, options))
+
+    def _progress(self, job: TransferJob, transferred: int):
+        with self._lock:
+            self.stats.transferred += transferred - job.transferred
+            job.transferred = transferred
+        if callable(self.progress_fn):
+            self.progress_fn(job, self.stats)
+
+    def _transfer(self, job: TransferJob):
+        progress_fn = partial(self._progress, job)
+        if job.kind == "upload":
+            result = self.disk.upload(
+                job.remote_pathname, job.local_pathname, progress_fn=progress_fn, **job.options
+            )
+        elif job.kind == "download":
+            options = job.options
+            if job.size >= self.split_size and "connections" not in options:
+                options = {**options, "connections": self.connections}
+            result = self.disk.download_file(
+                job.remote_pathname, job.local_pathname, progress_fn=progress_fn, **options
+            )
+        else:
+            raise ValueError(job.kind)
+        if job.size and not getattr(result, "skipped", False):
+            self._progress(job, job.size)
+        return result
+
+    def run(
+            self, errors: tuple[type[Exception], ...] = (Exception,)
+    ) -> typing.Iterator[BatchResult[TransferJob, typing.Any]]:
+        """
+        Выполнить добавленные задания, крупные первыми
+
+        Parameters
+        ----------
+        errors : Исключения, которые попадают в BatchResult.error, а не прерывают остальные передачи
+
+        Returns
+        -------
+        Генератор BatchResult в порядке завершения: key - задание, value - UploadResult для upload
+        """
+        jobs, self.jobs = sorted(self.jobs, key=lambda job: -job.size), []
+        self.stats.started = self.stats.started or time.monotonic()
+        self.stats.finished = None
+        try:
+            for result in run_batch(
+                    self._transfer, jobs, max_workers=self.max_workers, errors=errors
+            ):
+                with self._lock:
+                    if result.ok:
+                        self.stats.completed += 1
+                    else:
+                        self.stats.failed += 1
+                yield result
+        finally:
+            self.stats.finished = time.monotonic()
@@ -0,0 +1,94 @@
+import typing
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE_URL = "https://cloud-api.yandex.net"
+
+timeout_type: typing.TypeAlias = float | tuple[float, float] | None
+
+
+class Transport:
+    """
+    HTTP-транспорт Диска: одна requests.Session с пулами keep-alive соединений.
+
+    Один экземпляр принадлежит Disk и используется всеми Request,
+    а также download_file/upload, поэтому TCP+TLS соединения с API
+    и хостами загрузки переиспользуются между вызовами.
+    """
+
+    base_url: str
+    timeout: timeout_type
+    session: requests.Session
+
+    def __init__(
+            self,
+            *,
+            base_url: str = API_BASE_URL,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            timeout: timeout_type = None,
+            max_retries: int = 0,
+    ):
+        """
+        Parameters
+        ----------
+        base_url : Адрес REST API
+        pool_connections : Количество хостов, для которых держится пул соединений
+        pool_maxsize : Максимальное количество соединений в пуле одного хоста
+        timeout : Таймаут по умолчанию, секунды или (connect, read), None - без таймаута,
+            как у requests. Например, (10, 60) - не ждать соединения дольше 10 секунд
+            и очередного блока ответа дольше 60
+        max_retries : Количество повторов при ошибке соединения (urllib3)
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(
+            self,
+            method: str,
+            url: str,
+            *,
+            timeout: timeout_type = None,
+            **kwargs,
+    ) -> requests.Response:
+        """
+        Выполнить запрос через пул соединений
+
+        Parameters
+        ----------
+        method : HTTP-метод
+        url : Полный URL
+        timeout : Таймаут этого вызова, по умолчанию self.timeout
+        kwargs : Остальные аргументы requests.Session.request
+
+        Returns
+        -------
+        requests.Response
+        """
+        if timeout is None:
+            timeout = self.timeout
+        return self.session.request(method, url, timeout=timeout, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,278 @@
+import os
+import random
+import re
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+
+from .buffers import MmapReader, default_chunk_size
+from .hashing import file_hashes
+from .transport import Transport, timeout_type
+
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+"Временные ошибки сервера загрузки, после которых передачу стоит повторить"
+RELINK_STATUSES = frozenset({404, 409, 410})
+"Ссылка на загрузку больше не действительна, нужна новая"
+
+
+class UploadError(Exception):
+    ...
+
+
+class UploadLink(typing.Protocol):
+    operation_id: str
+    href: str
+
+
+@dataclass
+class UploadResult:
+    """
+    Итог загрузки файла
+    """
+
+    operation_id: str
+    "Идентификатор операции загрузки, для Disk.status_operation"
+    href: str
+    "Ссылка, по которой файл был загружен"
+    status_code: int
+    "HTTP-статус ответа сервера загрузки: 201 - файл принят, 202 - принят и обрабатывается"
+    size: int
+    "Размер загруженного файла"
+    attempts: int = 1
+    "Количество попыток передачи"
+    resumed_bytes: int = 0
+    "Сколько байт не пришлось передавать повторно благодаря докачке"
+    skipped: bool = False
+    "Файл не передавался: на Диске уже лежит файл с тем же размером и хэшами"
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+
+class _FileReader:
+    """
+    Файл, начиная с offset, для тела PUT: известная длина и блоки по chunk_size
+    """
+
+    def __init__(
+            self,
+            f: typing.BinaryIO,
+            offset: int,
+            size: int,
+            chunk_size: int,
+            progress_fn: typing.Callable[[int], None] = None,
+    ):
+        self.f = f
+        self.position = offset
+        self.size = size
+        self.chunk_size = chunk_size
+        self.progress_fn = progress_fn
+        f.seek(offset)
+
+    def __len__(self):
+        return self.size - self.position
+
+    def read(self, size: int = -1) -> bytes:
+        # http.client/urllib3 отправляют всё, что вернул read, поэтому блок берём не меньше chunk_size
+        chunk = self.f.read(max(size, self.chunk_size))
+        self.position += len(chunk)
+        if chunk and callable(self.progress_fn):
+            self.progress_fn(self.position)
+        return chunk
+
+
+def query_offset(
+        transport: Transport, href: str, size: int, timeout: timeout_type = None
+) -> int | None:
+    """
+    Спросить у сервера загрузки, сколько байт он уже принял по ссылке href
+
+    Пустой PUT с Content-Range: bytes */size, сервер с поддержкой докачки отвечает 308
+    и заголовком Range: bytes=0-N.
+
+    Returns
+    -------
+    Количество принятых байт или None, если сервер докачку не поддерживает
+    """
+    try:
+        r = transport.put(
+            href, data=b"", headers={"Content-Range": f"bytes */{size}"}, timeout=timeout
+        )
+    except requests.RequestException:
+        return None
+    if r.status_code != 308:
+        return None
+    match = re.fullmatch(r"bytes=0-(\d+)", r.headers.get("Range", ""))
+    return int(match[1]) + 1 if match else 0
+
+
+class RemoteFile(typing.Protocol):
+    size: int
+    md5: str
+    sha256: str
+
+
+def is_uploaded(
+        local_pathname: str,
+        get_remote: typing.Callable[[], RemoteFile | None],
+        hash_fn: typing.Callable[[str, threading.Event], tuple[str, str] | None] = None,
+) -> bool:
+    """
+    Лежит ли на Диске файл с тем же содержимым, что и local_pathname
+
+    Локальный файл хэшируется (md5 и sha256 за одно чтение крупными блоками) в отдельном потоке,
+    пока get_remote запрашивает метаинформацию. Если размер не совпал, чтение прерывается
+    и результат возвращается, не дожидаясь потока хэширования.
+
+    Parameters
+    ----------
+    local_pathname : Локальный файл
+    get_remote : Метаинформация удалённого файла (size, md5, sha256), None - файла нет
+    hash_fn : hash_fn(pathname, stop) - хэши локального файла (md5, sha256) или None,
+        например HashCache.hashes, чтение прерывается, когда установлено stop
+    """
+    size = os.path.getsize(local_pathname)
+    stop = threading.Event()
+    if hash_fn is None:
+        block_size = default_chunk_size(local_pathname)
+
+        def hash_fn(pathname: str, stop: threading.Event) -> tuple[str, str] | None:
+            hashes = file_hashes(pathname, block_size=block_size, stop=stop)
+            return (hashes["md5"], hashes["sha256"]) if hashes else None
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        hashing = executor.submit(hash_fn, local_pathname, stop)
+        try:
+            remote = get_remote()
+        except BaseException:
+            stop.set()
+            raise
+        md5, sha256 = (getattr(remote, name, None) for name in ("md5", "sha256"))
+        if remote is None or getattr(remote, "size", None) != size or not (md5 or sha256):
+            stop.set()
+            return False
+        local_md5, local_sha256 = hashing.result()
+    finally:
+        # Прерванное хэширование завершится в своём потоке, ждать его не нужно
+        executor.shutdown(wait=False, cancel_futures=True)
+    return md5 in (None, local_md5) and sha256 in (None, local_sha256)
+
+
+def _retry_delay(
+        attempt: int, backoff: float, max_backoff: float, response: requests.Response = None
+) -> float:
+    if response is not None and (retry_after := response.headers.get("Retry-After")):
+        try:
+            return float(retry_after)
+        except ValueError:
+            ...
+    return min(max_backoff, backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1)
+
+
+def upload_file(
+        transport: Transport,
+        get_link: typing.Callable[[], UploadLink],
+        local_pathname: str,
+        *,
+        chunk_size: int = 1 << 20,
+        retries: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        resume: bool = False,
+        progress_fn: typing.Callable[[int], None] = None,
+        timeout: timeout_type = None,
+        zero_copy: bool = False,
+) -> UploadResult:
+    """
+    Загрузить файл с повторами и докачкой
+
+    При обрыве соединения, таймауте или временной ошибке сервера передача повторяется
+    с экспоненциальной задержкой. С resume=True у сервера загрузки запрашивается принятое
+    смещение (query_offset) и передача продолжается с него, иначе файл передаётся заново
+    по той же ссылке.
+    Новая ссылка запрашивается только если старая перестала действовать.
+
+    Parameters
+    ----------
+    transport : Транспорт Disk
+    get_link : Получить ссылку на загрузку (Disk.upload_file)
+    local_pathname : Локальный файл
+    chunk_size : Размер блока чтения файла
+    retries : Количество повторов после первой попытки
+    backoff : Начальная задержка перед повтором, секунды
+    max_backoff : Максимальная задержка перед повтором, секунды
+    resume : Пытаться продолжить с принятого сервером смещения. Только для сервера загрузки
+        с поддержкой докачки: запрос смещения - пустой PUT по той же ссылке, сервер без
+        поддержки может принять его как файл нулевой длины
+    progress_fn : Вызывается с количеством переданных байт
+    timeout : Таймаут запросов
+    zero_copy : Передавать файл из mmap срезами memoryview, без копии каждого блока
+
+    Raises
+    ------
+    UploadError : Сервер отказал окончательно или исчерпаны повторы
+    """
+    size = os.path.getsize(local_pathname)
+    link = get_link()
+    offset = resumed_bytes = 0
+    attempts = 0
+    with open(local_pathname, "rb") as f:
+        while True:
+            attempts += 1
+            headers = {}
+            if offset:
+                headers["Content-Range"] = f"bytes {offset}-{size - 1}/{size}"
+            response = None
+            reader_type = MmapReader if zero_copy else _FileReader
+            reader = reader_type(f, offset, size, chunk_size, progress_fn)
+            try:
+                response = transport.put(
+                    link.href, data=reader, headers=headers, timeout=timeout
+                )
+            except requests.RequestException as e:
+                error = UploadError(local_pathname, e)
+            else:
+                if response.ok:
+                    return UploadResult(
+                        operation_id=link.operation_id,
+                        href=link.href,
+                        status_code=response.status_code,
+                        size=size,
+                        attempts=attempts,
+                        resumed_bytes=resumed_bytes,
+                    )
+                error = UploadError(local_pathname, response.status_code, response.text)
+                if response.status_code not in RETRY_STATUSES | RELINK_STATUSES:
+                    raise error
+            finally:
+                if zero_copy:
+                    reader.close()
+
+            if attempts > retries:
+                raise error
+            time.sleep(_retry_delay(attempts, backoff, max_backoff, response))
+
+            if response is not None and response.status_code in RELINK_STATUSES:
+                link = get_link()
+                offset = 0
+            elif resume and (acknowledged := query_offset(transport, link.href, size, timeout)):
+                if acknowledged >= size:
+                    # Сервер уже принял весь файл, ответ на последнюю попытку просто потерялся
+                    return UploadResult(
+                        operation_id=link.operation_id,
+                        href=link.href,
+                        status_code=201,
+                        size=size,
+                        attempts=attempts,
+                        resumed_bytes=resumed_bytes + size,
+                    )
+                offset = acknowledged
+                resumed_bytes += acknowledged
+            else:
+                offset = 0
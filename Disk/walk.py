@@ -0,0 +1,104 @@
+import collections
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .rate_limit import Throttle
+
+if typing.TYPE_CHECKING:
+    from .rest_api import Disk, ResourceShort
+
+LISTING_FIELDS = ("embedded.total", "embedded.limit", "embedded.offset")
+"Поля списка, без которых не работает постраничное чтение"
+
+
+def walk(
+        disk: "Disk",
+        root: str = "/",
+        *,
+        max_workers: int = 8,
+        max_depth: int = None,
+        filter: typing.Callable[["ResourceShort"], bool] = None,
+        order: typing.Literal["bfs", "dfs"] = "bfs",
+        fields: typing.Sequence[str] = None,
+        rate: float = None,
+) -> typing.Iterator["ResourceShort"]:
+    """
+    Рекурсивный обход дерева Диска, папки читаются параллельно
+
+    Папки выдаются в порядке обхода order: bfs - по уровням, dfs - сначала вглубь.
+    Списки следующих по порядку папок (не больше max_workers) читаются заранее,
+    пока обрабатывается текущая.
+
+    Parameters
+    ----------
+    disk : Клиент Диска
+    root : Папка, с которой начинается обход (сама она не выдаётся)
+    max_workers : Сколько папок читать одновременно
+    max_depth : Глубина обхода, 1 - только содержимое root, None - без ограничения
+    filter : filter(resource) == False - ресурс не выдаётся, а папка не обходится
+    order : bfs или dfs
+    fields : Нужные поля элементов (см. projection), path и type запрашиваются всегда
+    rate : Не больше rate запросов списков в секунду, None - без ограничения
+
+    Returns
+    -------
+    Генератор ResourceShort
+
+    Raises
+    ------
+    RequestError : Ответ API с ошибкой. Папки, удалённые во время обхода, пропускаются
+    """
+    from .rest_api import RequestError, Resource, ResourceShort, projection
+
+    projected = None
+    if fields is not None:
+        item_fields = dict.fromkeys(("path", "type", *fields))
+        projected = projection(
+            Resource, *(f"embedded.items.{name}" for name in item_fields), *LISTING_FIELDS
+        )
+    throttle = Throttle(rate) if rate else None
+
+    def listing(path: str) -> tuple["Resource | None", list[dict[str, ...]]]:
+        if throttle is not None:
+            throttle.wait()
+        try:
+            resource = disk.resource_info(path, fields=projected, limit=disk.page_size)
+            return resource, list(resource._request.get_embedded(keep=False))
+        except RequestError as e:
+            if e.args[0].error != "DiskNotFoundError":
+                raise
+            return None, []
+
+    # Папки в порядке выдачи: bfs берёт из начала, dfs из конца
+    frontier: collections.deque[tuple[str, int]] = collections.deque([(root, 1)])
+    futures: dict[str, Future] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while frontier:
+                upcoming = (
+                    (frontier[i] for i in range(len(frontier)))
+                    if order == "bfs"
+                    else (frontier[-i - 1] for i in range(len(frontier)))
+                )
+                for path, _ in upcoming:
+                    if len(futures) >= max_workers:
+                        break
+                    if path not in futures:
+                        futures[path] = executor.submit(listing, path)
+
+                path, depth = frontier.popleft() if order == "bfs" else frontier.pop()
+                if path not in futures:
+                    futures[path] = executor.submit(listing, path)
+                resource, items = futures.pop(path).result()
+                subdirs = []
+                for item in items:
+                    entry = ResourceShort(resource._request, item)
+                    if filter is not None and not filter(entry):
+                        continue
+                    yield entry
+                    if item.get("type") == "dir" and (max_depth is None or depth < max_depth):
+                        subdirs.append((item["path"], depth + 1))
+                frontier.extend(subdirs if order == "bfs" else reversed(subdirs))
+        finally:
+            for future in futures.values():
+                future.cancel()
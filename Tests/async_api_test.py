@@ -0,0 +1,187 @@
+import asyncio
+import contextlib
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from Yandex.Disk.async_api import AsyncDisk, AsyncTransport
+from Yandex.Disk.rest_api import RequestError
+
+
+class StubApi:
+    """Локальный сервер aiohttp вместо API: список /d, скачивание и загрузка файлов"""
+
+    def __init__(self, total: int = 0, max_limit: int = None, delay: float = 0):
+        self.items = [
+            {"path": f"disk:/d/f{i}", "name": f"f{i}", "type": "file"} for i in range(total)
+        ]
+        self.max_limit = max_limit
+        self.delay = delay
+        self.requests: list[dict[str, str]] = []
+        self.active = 0
+        self.max_active = 0
+        self.files: dict[str, bytes] = {}
+
+    async def resources(self, request: web.Request) -> web.Response:
+        self.requests.append(dict(request.query))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if request.query["path"] != "/d":
+            return web.json_response(
+                {"error": "DiskNotFoundError", "message": "m", "description": "d"}, status=404
+            )
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", 20))
+        if self.max_limit is not None:
+            limit = min(limit, self.max_limit)
+        embedded = {
+            "items": self.items[offset:offset + limit],
+            "offset": offset,
+            "limit": limit,
+            "total": len(self.items),
+        }
+        return web.json_response({"path": "disk:/d", "type": "dir", "_embedded": embedded})
+
+    async def link(self, request: web.Request) -> web.Response:
+        kind = request.path.rsplit("/", 1)[1]
+        href = str(request.url.with_path("/" + kind).with_query(path=request.query["path"]))
+        method = "GET" if kind == "download" else "PUT"
+        return web.json_response({"href": href, "method": method, "operation_id": "op"})
+
+    async def download(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.files[request.query["path"]])
+
+    async def upload(self, request: web.Request) -> web.Response:
+        self.files[request.query["path"]] = await request.read()
+        return web.Response(status=201)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/disk/resources", self.resources)
+        app.router.add_get("/v1/disk/resources/download", self.link)
+        app.router.add_get("/v1/disk/resources/upload", self.link)
+        app.router.add_get("/download", self.download)
+        app.router.add_put("/upload", self.upload)
+        return app
+
+
+@contextlib.asynccontextmanager
+async def stub_disk(api: StubApi, max_concurrency: int = 100, **options):
+    server = TestServer(api.app())
+    await server.start_server()
+    transport = AsyncTransport(
+        base_url=str(server.make_url("")).rstrip("/"), max_concurrency=max_concurrency
+    )
+    try:
+        async with AsyncDisk("token", transport, **options) as disk:
+            yield disk
+    finally:
+        await server.close()
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def listed_paths(disk: AsyncDisk, **params) -> list[str]:
+    resource = await disk.resource_info("/d", **params)
+    return [item.path async for item in resource.embedded.items]
+
+
+def test_listing_pages_by_page_size():
+    api = StubApi(2500)
+
+    async def main():
+        async with stub_disk(api, page_size=1000) as disk:
+            return await listed_paths(disk)
+
+    assert run(main()) == [f"disk:/d/f{i}" for i in range(2500)]
+    # await выполняет запрос сразу: первая страница размера по умолчанию API
+    assert "limit" not in api.requests[0]
+    pages = sorted((int(r["offset"]), r["limit"]) for r in api.requests[1:])
+    assert pages == [(20, "1000"), (1020, "1000"), (2020, "1000")]
+
+
+def test_listing_with_server_capped_limit():
+    api = StubApi(450, max_limit=100)
+
+    async def main():
+        async with stub_disk(api, page_size=1000, prefetch_pages=4) as disk:
+            resource = await disk.resource_info("/d")
+            first = [item.path async for item in resource.embedded.items]
+            # Повторный обход из кэша страниц
+            second = [item.path async for item in resource.embedded.items]
+            return first, second
+
+    first, second = run(main())
+    assert first == second == [f"disk:/d/f{i}" for i in range(450)]
+
+
+def test_error_response_raises_request_error():
+    api = StubApi()
+
+    async def main():
+        async with stub_disk(api) as disk:
+            with pytest.raises(RequestError) as error:
+                await disk.resource_info("/missing")
+            return error.value.args[0]
+
+    assert run(main()).error == "DiskNotFoundError"
+
+
+def test_transport_limits_concurrent_requests():
+    api = StubApi(1, delay=0.02)
+
+    async def main():
+        async with stub_disk(api, max_concurrency=3) as disk:
+            return await asyncio.gather(*(disk.resource_info("/d") for _ in range(12)))
+
+    resources = run(main())
+    assert len(resources) == 12 and len(api.requests) == 12
+    assert api.max_active == 3
+
+
+def test_upload_and_download_round_trip(tmp_path):
+    api = StubApi()
+    data = bytes(range(256)) * 1000
+    source = tmp_path / "source.bin"
+    source.write_bytes(data)
+    target = tmp_path / "target.bin"
+    progress = []
+
+    async def main():
+        async with stub_disk(api) as disk:
+            await disk.upload("/f.bin", str(source), chunk_size=10000)
+            await disk.download_file("/f.bin", str(target), progress.append, chunk_size=10000)
+
+    run(main())
+    assert api.files["/f.bin"] == data
+    assert target.read_bytes() == data
+    assert progress[-1] == len(data)
+
+
+def test_file_io_does_not_block_event_loop(tmp_path, monkeypatch):
+    api = StubApi()
+    api.files["/f.bin"] = b"x" * 100000
+    threaded = []
+    to_thread = asyncio.to_thread
+
+    async def tracking_to_thread(fn, *args, **kwargs):
+        threaded.append(getattr(fn, "__name__", fn))
+        return await to_thread(fn, *args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "to_thread", tracking_to_thread)
+
+    async def main():
+        async with stub_disk(api) as disk:
+            await disk.download_file("/f.bin", str(tmp_path / "f.bin"))
+            await disk.upload("/g.bin", str(tmp_path / "f.bin"))
+
+    run(main())
+    assert {"open", "write", "read", "close"} <= set(threaded)
+    assert api.files["/g.bin"] == api.files["/f.bin"]
@@ -0,0 +1,47 @@
+import threading
+import time
+
+from Yandex.Disk.batch import run_batch
+
+
+class Missing(Exception):
+    ...
+
+
+def lookup(key: int) -> int:
+    if key == 3:
+        raise Missing(key)
+    time.sleep(0.001 * (10 - key))
+    return key * 10
+
+
+def test_ordered_keeps_input_order_and_reports_errors():
+    results = list(run_batch(lookup, range(10), max_workers=4, ordered=True, errors=(Missing,)))
+    assert [result.key for result in results] == list(range(10))
+    assert [result.value for result in results if result.ok] == [
+        key * 10 for key in range(10) if key != 3
+    ]
+    assert isinstance(results[3].error, Missing)
+
+
+def test_unordered_returns_every_key():
+    results = list(run_batch(lookup, range(10), max_workers=4, errors=(Missing,)))
+    assert sorted(result.key for result in results) == list(range(10))
+
+
+def test_in_flight_calls_are_bounded():
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def call(key):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.002)
+        with lock:
+            in_flight -= 1
+        return key
+
+    assert len(list(run_batch(call, range(50), max_workers=5))) == 50
+    assert peak <= 5
@@ -0,0 +1,127 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Yandex.Disk.buffers import BufferPool, MmapReader, iter_into
+from Yandex.Disk.download import download_ranged
+from Yandex.Disk.rest_api import Disk
+from Yandex.Disk.transport import Transport
+from Yandex.Tests.fakes import FakeResponse, FakeTransport
+
+DATA = os.urandom(300_000)
+
+
+def test_buffer_pool_reuses_buffers_across_threads():
+    pool = BufferPool(16)
+    barrier = threading.Barrier(8)
+
+    def use(_):
+        buffer = pool.acquire()
+        barrier.wait()
+        pool.release(buffer)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(use, range(8)))
+    assert pool.allocated == 8
+    buffers = [pool.acquire() for _ in range(8)]
+    assert pool.allocated == 8 and all(len(buffer) == 16 for buffer in buffers)
+
+
+def test_mmap_reader_returns_views_from_offset(tmp_path):
+    pathname = tmp_path / "file"
+    pathname.write_bytes(DATA)
+    progress = []
+    with open(pathname, "rb") as f:
+        reader = MmapReader(f, 1000, len(DATA), 65536, progress.append)
+        assert len(reader) == len(DATA) - 1000
+        chunks = []
+        while chunk := reader.read():
+            assert isinstance(chunk, memoryview)
+            chunks.append(bytes(chunk))
+            chunk.release()
+        reader.close()
+    assert b"".join(chunks) == DATA[1000:]
+    assert progress[-1] == len(DATA)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.clients.append(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(DATA)))
+        self.end_headers()
+        self.wfile.write(DATA)
+
+    def log_message(self, *args):
+        ...
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.clients = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_into_returns_connection_to_pool(http_server):
+    url = f"http://127.0.0.1:{http_server.server_address[1]}/file"
+    pool = BufferPool(65536)
+    with Transport() as transport:
+        for _ in range(3):
+            with transport.get(url, stream=True) as r:
+                assert b"".join(bytes(chunk) for chunk in iter_into(r, pool)) == DATA
+    assert pool.allocated == 1
+    # Ответ прочитан через urllib3: все запросы по одному keep-alive соединению
+    assert len(set(http_server.clients)) == 1
+
+
+def file_handler(received: dict):
+    def handler(request):
+        if request.path == "/v1/disk/resources/download":
+            return FakeResponse(200, {"href": "https://dl.test/file", "method": "GET"})
+        if request.path == "/v1/disk/resources/upload":
+            return FakeResponse(
+                200, {"href": "https://ul.test/file", "method": "PUT", "operation_id": "op"}
+            )
+        if request.method == "PUT":
+            received["body"] = request.body()
+            received["reader"] = type(request.data)
+            return FakeResponse(201)
+        return FakeResponse(200, content=DATA)
+
+    return handler
+
+
+def test_zero_copy_download_and_upload(tmp_path):
+    received = {}
+    disk = Disk("token", FakeTransport(file_handler(received)))
+    target = str(tmp_path / "file")
+    progress = []
+    disk.download_file("/file", target, progress.append, chunk_size=65536, zero_copy=True)
+    assert open(target, "rb").read() == DATA
+    assert progress[-1] == len(DATA)
+
+    result = disk.upload("/file", target, chunk_size=65536, zero_copy=True)
+    assert result.ok
+    assert received["body"] == DATA and received["reader"] is MmapReader
+
+
+def test_ranged_download_into_pool_buffers(tmp_path):
+    def handler(request):
+        start, end = map(int, request.headers["Range"].removeprefix("bytes=").split("-"))
+        return FakeResponse(206, content=DATA[start:end + 1])
+
+    pool = BufferPool(65536)
+    target = str(tmp_path / "file")
+    download_ranged(FakeTransport(handler), "https://dl.test/file", target, len(DATA), pool=pool)
+    assert open(target, "rb").read() == DATA
+    assert pool.allocated == 1
@@ -0,0 +1,32 @@
+from array import array
+
+from Yandex.Disk.columnar import MISSING, Columns
+
+ITEMS = [
+    {"path": "disk:/a.jpg", "size": 5, "media_type": "image", "modified": "2023-01-02T03:04:05+00:00"},
+    {"path": "disk:/dir", "type": "dir", "modified": "2023-01-02T06:04:05+03:00"},
+    {"path": "disk:/b.jpg", "size": 7, "media_type": "image"},
+    {"path": "disk:/c.txt", "size": 1, "media_type": "document"},
+]
+
+
+def test_columns_types_and_missing_values():
+    columns = Columns(("path", "size", "modified", "media_type")).extend(ITEMS)
+    assert len(columns) == 4
+    assert columns["size"] == array("q", [5, MISSING, 7, 1])
+    assert columns["modified"][:2] == array("q", [1672628645, 1672628645])
+    assert columns["modified"][2] == MISSING
+    assert columns["path"][1] == "disk:/dir"
+
+
+def test_category_strings_are_shared():
+    columns = Columns(("media_type",)).extend(
+        {"media_type": "".join(["im", "age"])} for _ in range(3)
+    )
+    first, *rest = columns["media_type"]
+    assert all(value is first for value in rest)
+
+
+def test_group_sum_skips_missing():
+    columns = Columns(("size", "media_type")).extend(ITEMS)
+    assert columns.group_sum("media_type") == {"image": 12, "document": 1}
@@ -39,15 +39,14 @@ def show_progress(size: int):
     print(size)
 
 
-operation_id = disk.upload(
+result = disk.upload(
     remote_pathname="/test.file",
     # local_pathname=os.path.expanduser("~") + "/ydisk_books.csv", "/run/media/sasha/slowdisk/Книги/IT/Шилдт_Г_Java_8_Руководство_для_начинающих.pdf"
     local_pathname="/run/media/sasha/slowdisk/Книги/IT/Шилдт_Г_Java_8_Руководство_для_начинающих.pdf",
     overwrite=True,
     progress_fn=show_progress,
 )
-while True:
-    print(disk.status_operation(operation_id))
+print(disk.wait_operation(result.operation_id, timeout=60))
 
 # result = disk.files()
 # for item in result.items:
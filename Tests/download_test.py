@@ -0,0 +1,208 @@
+import hashlib
+import os
+import re
+import time
+
+import pytest
+import requests
+
+from Yandex.Disk.download import (
+    MIN_RANGE_SIZE,
+    DownloadState,
+    NotAFileError,
+    STATE_SUFFIX,
+    download_ranged,
+    split_ranges,
+)
+from Yandex.Disk.rest_api import Disk
+from Yandex.Tests.fakes import FakeResponse, FakeTransport
+
+DATA = os.urandom(50_000)
+
+
+def test_split_ranges_covers_file_with_inclusive_ends():
+    ranges = split_ranges(10, 3, min_size=1)
+    assert ranges == [(0, 3), (4, 7), (8, 9)]
+    assert split_ranges(10, 8, min_size=4) == [(0, 3), (4, 7), (8, 9)]
+    assert split_ranges(5, 4) == [(0, 4)]
+    assert split_ranges(0, 4) == []
+
+
+def test_state_add_merges_adjacent_and_overlapping_ranges():
+    state = DownloadState(100)
+    state.add(50, 60)
+    state.add(0, 10)
+    state.add(10, 20)
+    state.add(55, 70)
+    assert state.completed == [[0, 20], [50, 70]]
+    assert state.completed_size == 40
+    state.add(15, 55)
+    assert state.completed == [[0, 70]]
+
+
+def test_state_missing_ranges():
+    state = DownloadState(100)
+    assert state.missing() == [(0, 99)]
+    state.add(10, 20)
+    state.add(90, 100)
+    assert state.missing() == [(0, 9), (20, 89)]
+    state.add(0, 100)
+    assert state.missing() == []
+
+
+def test_state_matches_and_persistence(tmp_path):
+    state = DownloadState(100, md5="a", modified="m", revision=1)
+    state.add(0, 10)
+    pathname = str(tmp_path / "file.ydpart")
+    state.save(pathname)
+    loaded = DownloadState.load(pathname)
+    assert loaded == state
+    assert loaded.matches(DownloadState(100, md5="a", modified="m", revision=1))
+    assert not loaded.matches(DownloadState(100, md5="a", modified="m", revision=2))
+
+    (tmp_path / "broken.ydpart").write_text("{")
+    assert DownloadState.load(str(tmp_path / "broken.ydpart")) is None
+    assert DownloadState.load(str(tmp_path / "absent.ydpart")) is None
+
+
+class BrokenResponse(FakeResponse):
+    """Соединение обрывается после первого блока"""
+
+    def iter_content(self, chunk_size: int = 1):
+        yield self.content[:chunk_size]
+        raise requests.ConnectionError("reset")
+
+
+def ranged_handler(data: bytes, broken: set[int] = frozenset()):
+    def handler(request):
+        start, end = map(int, re.fullmatch(r"bytes=(\d+)-(\d+)", request.headers["Range"]).groups())
+        response_type = BrokenResponse if start in broken else FakeResponse
+        return response_type(206, content=data[start:end + 1])
+
+    return handler
+
+
+def test_download_ranged_fetches_only_missing_ranges(tmp_path):
+    pathname = str(tmp_path / "file")
+    with open(pathname, "wb") as f:
+        f.write(DATA[:1000] + b"\0" * 19000 + DATA[20000:30000] + b"\0" * (len(DATA) - 30000))
+    state = DownloadState(len(DATA))
+    state.add(0, 1000)
+    state.add(20000, 30000)
+    transport = FakeTransport(ranged_handler(DATA))
+    download_ranged(transport, "https://dl.test/file", pathname, len(DATA), connections=3, state=state)
+
+    assert open(pathname, "rb").read() == DATA
+    assert sorted(r.headers["Range"] for r in transport.requests) == [
+        "bytes=1000-19999",
+        f"bytes=30000-{len(DATA) - 1}",
+    ]
+    assert state.completed == [[0, len(DATA)]]
+
+
+class SlowResponse(FakeResponse):
+    """Ответ, который приходит блоками с паузой"""
+
+    chunks = 0
+
+    def iter_content(self, chunk_size: int = 1):
+        for chunk in super().iter_content(chunk_size):
+            time.sleep(0.002)
+            SlowResponse.chunks += 1
+            yield chunk
+
+
+def test_download_ranged_stops_on_first_failed_range(tmp_path):
+    size = 3 * MIN_RANGE_SIZE
+    data = bytes(size)
+
+    def handler(request):
+        start, end = map(int, re.fullmatch(r"bytes=(\d+)-(\d+)", request.headers["Range"]).groups())
+        if start == 0:
+            return FakeResponse(500)
+        return SlowResponse(206, content=data[start:end + 1])
+
+    SlowResponse.chunks = 0
+    with pytest.raises(requests.HTTPError):
+        download_ranged(
+            FakeTransport(handler), "https://dl.test/file", str(tmp_path / "file"), size,
+            connections=3, chunk_size=8192,
+        )
+    # Без остановки остальные два диапазона были бы дочитаны до конца
+    assert SlowResponse.chunks < 2 * MIN_RANGE_SIZE // 8192 // 2
+
+
+def disk_handler(data: bytes, revision: int, broken: set[int], type: str = "file"):
+    file_handler = ranged_handler(data, broken)
+
+    def handler(request):
+        if request.path == "/v1/disk/resources":
+            return FakeResponse(
+                200,
+                {
+                    "type": type,
+                    "size": len(data),
+                    "md5": hashlib.md5(data).hexdigest(),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "modified": "2024-01-01T00:00:00+00:00",
+                    "revision": revision,
+                },
+            )
+        if request.path == "/v1/disk/resources/download":
+            return FakeResponse(200, {"href": "https://dl.test/file", "method": "GET"})
+        return file_handler(request)
+
+    return handler
+
+
+def test_download_file_resumes_from_state_file(tmp_path):
+    pathname = str(tmp_path / "file")
+    transport = FakeTransport(disk_handler(DATA, revision=1, broken={0}))
+    disk = Disk("token", transport)
+    with pytest.raises(requests.ConnectionError):
+        disk.download_file("/file", pathname, resume=True, chunk_size=8192)
+    assert DownloadState.load(pathname + STATE_SUFFIX).completed == [[0, 8192]]
+
+    transport.handler = disk_handler(DATA, revision=1, broken=set())
+    transport.requests.clear()
+    disk.download_file("/file", pathname, resume=True, chunk_size=8192)
+    assert open(pathname, "rb").read() == DATA
+    assert not os.path.exists(pathname + STATE_SUFFIX)
+    assert [r.headers["Range"] for r in transport.requests if "Range" in r.headers] == [
+        f"bytes=8192-{len(DATA) - 1}"
+    ]
+
+
+def test_download_file_restarts_when_remote_changed(tmp_path):
+    pathname = str(tmp_path / "file")
+    transport = FakeTransport(disk_handler(DATA, revision=1, broken={0}))
+    disk = Disk("token", transport)
+    with pytest.raises(requests.ConnectionError):
+        disk.download_file("/file", pathname, resume=True, chunk_size=8192)
+
+    changed = os.urandom(30_000)
+    transport.handler = disk_handler(changed, revision=2, broken=set())
+    transport.requests.clear()
+    disk.download_file("/file", pathname, resume=True, chunk_size=8192)
+    assert open(pathname, "rb").read() == changed
+    assert [r.headers["Range"] for r in transport.requests if "Range" in r.headers] == [
+        f"bytes=0-{len(changed) - 1}"
+    ]
+
+
+def test_download_file_in_ranges(tmp_path):
+    data = os.urandom(2 * MIN_RANGE_SIZE + 100)
+    pathname = str(tmp_path / "file")
+    transport = FakeTransport(disk_handler(data, revision=1, broken=set()))
+    progress = []
+    Disk("token", transport).download_file("/file", pathname, progress.append, connections=3)
+    assert open(pathname, "rb").read() == data
+    assert progress[-1] == len(data)
+    assert len([r for r in transport.requests if "Range" in r.headers]) == 3
+
+
+def test_download_file_rejects_folder(tmp_path):
+    transport = FakeTransport(disk_handler(DATA, revision=1, broken=set(), type="dir"))
+    with pytest.raises(NotAFileError):
+        Disk("token", transport).download_file("/dir", str(tmp_path / "dir"), connections=2)
+    assert not any(r.path == "/v1/disk/resources/download" for r in transport.requests)
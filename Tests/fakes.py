@@ -0,0 +1,206 @@
+"""
+Транспорт-заглушка для тестов: запросы Disk обрабатывает функция теста, без сети
+"""
+import hashlib
+import json
+import typing
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import requests
+
+
+@dataclass
+class FakeRequest:
+    method: str
+    url: str
+    params: dict[str, str] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+    data: typing.Any = None
+
+    @property
+    def path(self) -> str:
+        return urlsplit(self.url).path
+
+    def body(self) -> bytes:
+        """Тело запроса целиком: bytes или объект с read(), как _FileReader"""
+        if self.data is None or isinstance(self.data, (bytes, bytearray)):
+            return bytes(self.data or b"")
+        chunks = []
+        while chunk := self.data.read():
+            chunks.append(bytes(chunk))
+        return b"".join(chunks)
+
+
+class FakeResponse:
+    def __init__(
+            self,
+            status_code: int = 200,
+            body: typing.Any = None,
+            *,
+            content: bytes = None,
+            headers: dict[str, str] = None,
+    ):
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        if content is None:
+            content = json.dumps(body).encode() if body is not None else b""
+        self.content = content
+        self.raw = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1):
+        chunk_size = chunk_size or len(self.content) or 1
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(self.status_code)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        ...
+
+
+def error(status_code: int, error_code: str, **fields) -> FakeResponse:
+    """Ответ API с ошибкой, как у ErrorInfo"""
+    return FakeResponse(
+        status_code, {"error": error_code, "message": error_code, "description": error_code, **fields}
+    )
+
+
+class FakeTransport:
+    """
+    Вместо Transport: каждый запрос передаётся handler(FakeRequest) -> FakeResponse,
+    исключение handler выбрасывается из запроса, как ошибка соединения
+    """
+
+    base_url = "https://api.test"
+    timeout = None
+
+    def __init__(self, handler: typing.Callable[[FakeRequest], FakeResponse]):
+        self.handler = handler
+        self.requests: list[FakeRequest] = []
+
+    def request(
+            self,
+            method: str,
+            url: str,
+            *,
+            params: dict = None,
+            headers: dict = None,
+            data=None,
+            **kwargs,
+    ) -> FakeResponse:
+        request = FakeRequest(method, url, dict(params or {}), dict(headers or {}), data)
+        self.requests.append(request)
+        return self.handler(request)
+
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> FakeResponse:
+        return self.request("PUT", url, **kwargs)
+
+    def close(self):
+        ...
+
+
+class FakeTree:
+    """Дерево Диска для FakeTransport: ресурсы по пути и ревизия"""
+
+    def __init__(self):
+        self.revision = 10
+        self.resources: dict[str, dict] = {}
+        self.hidden: set[str] = set()
+        "Папки, которые видны в списке родителя, но при чтении отвечают 404"
+        self.add("/", "dir")
+
+    def add(
+            self,
+            path: str,
+            type: str = "file",
+            size: int = 1,
+            md5: str = None,
+            *,
+            content: bytes = None,
+            modified: str = "2024-01-02T03:04:05+00:00",
+    ):
+        resource = {
+            "path": "disk:" + path,
+            "name": path.rsplit("/", 1)[1],
+            "type": type,
+            "revision": self.revision,
+            "modified": modified,
+            "resource_id": "id" + path,
+        }
+        if content is not None:
+            resource.update(
+                size=len(content),
+                md5=hashlib.md5(content).hexdigest(),
+                sha256=hashlib.sha256(content).hexdigest(),
+            )
+        elif type == "file":
+            resource.update(size=size, md5=md5 or "md5" + path, sha256="sha256" + path)
+        self.resources[path] = resource
+        self.touch(path)
+
+    def remove(self, path: str):
+        for other in [p for p in self.resources if p == path or p.startswith(path + "/")]:
+            del self.resources[other]
+        self.touch(path)
+
+    def touch(self, path: str):
+        """Изменение ресурса меняет revision папок на пути к нему"""
+        while path != "/":
+            path = path.rsplit("/", 1)[0] or "/"
+            if path in self.resources:
+                self.resources[path]["revision"] = self.revision
+
+    def children(self, path: str) -> list[dict]:
+        return [
+            self.resources[p]
+            for p in sorted(self.resources)
+            if p != path and (p.rsplit("/", 1)[0] or "/") == path
+        ]
+
+    def handler(self, request):
+        offset = int(request.params.get("offset", 0))
+        limit = int(request.params.get("limit", 20))
+        if request.path == "/v1/disk/":
+            return FakeResponse(200, {"revision": self.revision})
+        if request.path == "/v1/disk/resources/files":
+            files = [r for p, r in sorted(self.resources.items()) if r["type"] == "file"]
+            return FakeResponse(200, {"items": files[offset:offset + limit], "limit": limit})
+        if request.path == "/v1/disk/resources/last-uploaded":
+            files = sorted(
+                (r for r in self.resources.values() if r["type"] == "file"),
+                key=lambda r: -r["revision"],
+            )
+            return FakeResponse(200, {"items": files[:limit], "limit": limit})
+        path = request.params["path"].removeprefix("disk:").rstrip("/") or "/"
+        if path not in self.resources or path in self.hidden:
+            return error(404, "DiskNotFoundError")
+        body = dict(self.resources[path])
+        if body["type"] == "dir":
+            children = self.children(path)
+            body["_embedded"] = {
+                "items": children[offset:offset + limit],
+                "limit": limit,
+                "offset": offset,
+                "total": len(children),
+            }
+        return FakeResponse(200, body)
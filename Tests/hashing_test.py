@@ -0,0 +1,75 @@
+import hashlib
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from Yandex.Disk.hashing import HashCache, file_hashes
+from Yandex.Disk.upload import is_uploaded
+
+
+def test_file_hashes_single_pass(tmp_path):
+    pathname = tmp_path / "data.bin"
+    data = os.urandom(3 << 20)
+    pathname.write_bytes(data)
+    assert file_hashes(str(pathname)) == {
+        "md5": hashlib.md5(data).hexdigest(),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def test_hash_cache_rehashes_only_changed_files(tmp_path):
+    pathname = tmp_path / "data.txt"
+    pathname.write_bytes(b"first")
+    cache = HashCache(str(tmp_path / "hashes.sqlite"))
+    first = cache.hashes(str(pathname))
+    assert cache.hashes(str(pathname)) == first
+    assert cache.hashed == 1
+
+    pathname.write_bytes(b"second!")
+    assert cache.hashes(str(pathname))[0] == hashlib.md5(b"second!").hexdigest()
+    assert cache.hashed == 2
+
+
+def test_is_uploaded_compares_size_and_hashes(tmp_path):
+    pathname = tmp_path / "data.bin"
+    data = os.urandom(1 << 20)
+    pathname.write_bytes(data)
+    remote = SimpleNamespace(
+        size=len(data), md5=hashlib.md5(data).hexdigest(), sha256=hashlib.sha256(data).hexdigest()
+    )
+    assert is_uploaded(str(pathname), lambda: remote)
+    assert not is_uploaded(str(pathname), lambda: None)
+    assert not is_uploaded(str(pathname), lambda: SimpleNamespace(**{**vars(remote), "size": 1}))
+    assert not is_uploaded(
+        str(pathname), lambda: SimpleNamespace(**{**vars(remote), "md5": "0" * 32})
+    )
+
+
+def test_is_uploaded_returns_on_size_mismatch_without_waiting_for_hash(tmp_path):
+    pathname = tmp_path / "data.bin"
+    pathname.write_bytes(b"data")
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def slow_hash(pathname, stop):
+        started.set()
+        if stop.wait(5):
+            stopped.set()
+        time.sleep(1)
+
+    begin = time.monotonic()
+    assert not is_uploaded(str(pathname), lambda: SimpleNamespace(size=1, md5="m"), slow_hash)
+    assert time.monotonic() - begin < 0.5
+    assert started.wait(1) and stopped.wait(1)
+
+
+def test_hash_cache_is_interrupted_by_stop(tmp_path):
+    pathname = tmp_path / "data.bin"
+    pathname.write_bytes(b"data")
+    cache = HashCache(str(tmp_path / "hashes.sqlite"))
+    stop = threading.Event()
+    stop.set()
+    assert cache.hashes(str(pathname), stop) is None
+    assert cache.hashed == 0
+    assert cache.hashes(str(pathname)) is not None
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from Yandex.Disk import index
+from Yandex.Disk.index import RemoteIndex
+from Yandex.Disk.rest_api import Disk
+from Yandex.Tests.fakes import FakeTransport, FakeTree
+
+
+@pytest.fixture
+def tree():
+    tree = FakeTree()
+    for path in ["/a", "/a/x", "/b", "/empty"]:
+        tree.add(path, "dir")
+    for i in range(30):
+        tree.add(f"/a/x/f{i}", size=i)
+    tree.add("/a/g")
+    tree.add("/b/h", md5="dup")
+    tree.add("/top", md5="dup")
+    return tree
+
+
+def make_index(tree: FakeTree, **disk_options) -> tuple[RemoteIndex, FakeTransport]:
+    transport = FakeTransport(tree.handler)
+    return RemoteIndex(Disk("token", transport, page_size=7, **disk_options)), transport
+
+
+def test_build_inserts_tree_in_chunks(tree, monkeypatch):
+    monkeypatch.setattr(index, "BUILD_CHUNK", 4)
+    remote_index, _ = make_index(tree)
+    result = remote_index.build()
+    assert result.revision == 10 and result.updated == 37 and result.listed_dirs == 5
+    assert remote_index.get("disk:/a/x/f3").size == 3
+    assert remote_index.get("/a/x").type == "dir"
+    assert [entry.path for entry in remote_index.find_md5("dup")] == ["/b/h", "/top"]
+    assert len(remote_index.files("/a")) == 31
+    assert [entry.path for entry in remote_index.children("/")] == ["/a", "/b", "/empty", "/top"]
+
+
+def test_build_stores_folder_metadata(tree):
+    remote_index, transport = make_index(tree)
+    remote_index.build()
+    assert remote_index.get("/empty").revision == 10
+    assert remote_index.get("/a/x").modified is not None
+
+    tree.revision = 11
+    tree.add("/b/new")
+    transport.requests.clear()
+    result = remote_index.refresh()
+    # Прочитаны только корень и изменившаяся папка, а не все папки
+    assert result.listed_dirs == 2
+    listed = {r.params["path"] for r in transport.requests if r.path == "/v1/disk/resources"}
+    assert listed == {"/", "/b"}
+    assert remote_index.get("/b/new") is not None
+
+
+def test_readers_are_not_blocked_during_build(tree):
+    remote_index, transport = make_index(tree)
+    remote_index.build()
+    tree.revision = 11
+    tree.remove("/top")
+    listing = threading.Event()
+    release = threading.Event()
+
+    def handler(request):
+        if request.params.get("path", "").endswith("/a/x"):
+            listing.set()
+            release.wait(5)
+        return tree.handler(request)
+
+    transport.handler = handler
+    builder = threading.Thread(target=remote_index.build)
+    builder.start()
+    assert listing.wait(5)
+    started = time.monotonic()
+    # Во время обхода индекс отвечает сразу и прежним состоянием
+    assert remote_index.get("/top") is not None
+    assert time.monotonic() - started < 1
+    release.set()
+    builder.join()
+    assert remote_index.get("/top") is None and remote_index.revision == 11
+
+
+def test_refresh_without_changes_reads_only_revision(tree):
+    remote_index, transport = make_index(tree)
+    remote_index.build()
+    transport.requests.clear()
+    result = remote_index.refresh()
+    assert result.revision == 10 and result.listed_dirs == 0
+    assert [request.path for request in transport.requests] == ["/v1/disk/"]
+
+
+def test_refresh_applies_changes(tree):
+    remote_index, _ = make_index(tree)
+    remote_index.refresh()
+    tree.revision = 11
+    tree.add("/b/new", size=99)
+    tree.remove("/a/x/f5")
+    tree.remove("/a/g")
+    result = remote_index.refresh()
+    assert result.revision == 11
+    assert remote_index.get("/b/new").size == 99
+    assert remote_index.get("/a/x/f5") is None and remote_index.get("/a/g") is None
+    assert len(remote_index.files()) == 32
+
+    tree.revision = 12
+    tree.remove("/b")
+    result = remote_index.refresh()
+    assert remote_index.get("/b") is None and remote_index.get("/b/h") is None
+    assert result.removed >= 3
+
+
+def test_refresh_prunes_folder_deleted_between_listings(tree):
+    remote_index, _ = make_index(tree, lazy=False)
+    remote_index.refresh()
+    tree.revision = 11
+    tree.add("/a/x/f30")
+    tree.hidden.add("/a/x")
+    remote_index.refresh()
+    assert remote_index.get("/a/x") is None and remote_index.get("/a/x/f1") is None
+    assert remote_index.get("/a/g") is not None
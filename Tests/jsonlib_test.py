@@ -0,0 +1,20 @@
+import pytest
+
+from Yandex.Disk import jsonlib
+
+PAGE = '{"items": [{"path": "disk:/Фото/1.jpg", "size": 1}], "limit": 20}'.encode()
+
+
+def test_installed_backends_decode_bytes():
+    for name in jsonlib.BACKENDS:
+        try:
+            decode = jsonlib.get_decoder(name)
+        except ImportError:
+            continue
+        assert decode(PAGE) == {"items": [{"path": "disk:/Фото/1.jpg", "size": 1}], "limit": 20}
+
+
+def test_default_and_unknown_backend():
+    assert jsonlib.loads(PAGE)["limit"] == 20
+    with pytest.raises(KeyError):
+        jsonlib.get_decoder("yaml")
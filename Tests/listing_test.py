@@ -0,0 +1,114 @@
+import threading
+
+from Yandex.Disk.rest_api import Disk
+from Yandex.Tests.fakes import FakeResponse, FakeTransport
+
+
+def listing_handler(total: int, max_limit: int = None, default_limit: int = 20):
+    items = [{"path": f"disk:/d/f{i}", "name": f"f{i}", "type": "file"} for i in range(total)]
+    lock = threading.Lock()
+
+    def handler(request):
+        offset = int(request.params.get("offset", 0))
+        limit = int(request.params.get("limit", default_limit))
+        if max_limit is not None:
+            limit = min(limit, max_limit)
+        with lock:
+            page = items[offset:offset + limit]
+        return FakeResponse(
+            200,
+            {
+                "path": "disk:/d",
+                "type": "dir",
+                "name": "d",
+                "_embedded": {"items": page, "offset": offset, "limit": limit, "total": len(items)},
+            },
+        )
+
+    return handler
+
+
+def listed_paths(disk: Disk, **params) -> list[str]:
+    return [item.path for item in disk.resource_info("/d", **params).embedded.items]
+
+
+def files_paths(disk: Disk) -> list[str]:
+    # Обход items до обращения к другим полям: запрос ещё не выполнен
+    return [item.path for item in disk.files().items]
+
+
+def test_first_page_uses_page_size():
+    transport = FakeTransport(listing_handler(2500))
+    disk = Disk("token", transport, page_size=1000)
+    paths = files_paths(disk)
+    assert paths == [f"disk:/d/f{i}" for i in range(2500)]
+    assert sorted(int(r.params.get("offset", 0)) for r in transport.requests) == [0, 1000, 2000]
+    assert all(r.params["limit"] == "1000" for r in transport.requests)
+
+
+def test_metadata_lookup_does_not_request_page_size():
+    transport = FakeTransport(listing_handler(2500))
+    disk = Disk("token", transport, page_size=1000)
+    assert disk.resource_info("/d").path == "disk:/d"
+    assert "limit" not in transport.requests[0].params
+
+
+def test_executed_request_continues_with_page_size():
+    transport = FakeTransport(listing_handler(2500))
+    disk = Disk("token", transport, page_size=1000, lazy=False)
+    assert listed_paths(disk) == [f"disk:/d/f{i}" for i in range(2500)]
+    # Первая страница уже получена размером по умолчанию API, дальше - по page_size
+    assert "limit" not in transport.requests[0].params
+    pages = sorted((int(r.params["offset"]), r.params["limit"]) for r in transport.requests[1:])
+    assert pages == [(20, "1000"), (1020, "1000"), (2020, "1000")]
+
+
+def test_explicit_limit_is_kept():
+    transport = FakeTransport(listing_handler(250))
+    disk = Disk("token", transport, page_size=1000)
+    assert len(listed_paths(disk, limit=100)) == 250
+    assert [r.params["limit"] for r in transport.requests] == ["100"] * 3
+
+
+def test_prefetch_requests_following_pages_ahead():
+    transport = FakeTransport(listing_handler(1000))
+    disk = Disk("token", transport, page_size=100, prefetch_pages=4)
+    items = iter(disk.files().items)
+    next(items)
+    assert len(transport.requests) == 1
+    for _ in range(100):
+        next(items)
+    # Первая страница прочитана: следующие prefetch_pages страниц уже запрошены
+    assert len(transport.requests) >= 2
+    assert len(list(items)) == 899
+    assert len(transport.requests) == 10
+
+
+def test_last_uploaded_is_not_paged_by_page_size():
+    transport = FakeTransport(lambda request: FakeResponse(200, {"items": [], "limit": 20}))
+    disk = Disk("token", transport, page_size=1000)
+    disk.last_uploaded()._request.execute()
+    assert "limit" not in transport.requests[0].params
+
+
+def test_server_capped_limit_returns_every_item_once():
+    transport = FakeTransport(listing_handler(3000, max_limit=100))
+    disk = Disk("token", transport, page_size=1000, prefetch_pages=4)
+    resource = disk.resource_info("/d")
+    expected = [f"disk:/d/f{i}" for i in range(3000)]
+    assert [item.path for item in resource.embedded.items] == expected
+    # Повторный обход из кэша страниц: те же элементы
+    assert [item.path for item in resource.embedded.items] == expected
+
+
+def test_capped_limit_without_total():
+    handler = listing_handler(450, max_limit=100)
+
+    def without_total(request):
+        response = handler(request)
+        body = response.json()
+        del body["_embedded"]["total"]
+        return FakeResponse(200, body)
+
+    disk = Disk("token", FakeTransport(without_total), page_size=1000)
+    assert listed_paths(disk) == [f"disk:/d/f{i}" for i in range(450)]
@@ -0,0 +1,44 @@
+from Yandex.Disk.metadata_cache import MetadataCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_lru():
+    clock = Clock()
+    cache = MetadataCache(ttl=10, max_entries=2, clock=clock)
+    for path in ("/a", "/b", "/c"):
+        cache.put(MetadataCache.key({"path": path}), {"path": path})
+    assert cache.get(MetadataCache.key({"path": "/a"})) is None
+    assert cache.get(MetadataCache.key({"path": "disk:/c/"})) == {"path": "/c"}
+    clock.now = 10
+    assert cache.get(MetadataCache.key({"path": "/c"})) is None
+
+
+def test_key_includes_fields_and_params():
+    assert MetadataCache.key({"path": "/a", "fields": "size"}) != MetadataCache.key({"path": "/a"})
+    assert MetadataCache.key({"path": "/a", "limit": "5"}) != MetadataCache.key({"path": "/a"})
+
+
+def test_invalidate_resource_children_and_parent():
+    cache = MetadataCache()
+    for path in ("/", "/a", "/a/b", "/a/b/c", "/a/bb", "/d"):
+        cache.put(MetadataCache.key({"path": path}), {})
+    cache.invalidate("disk:/a/b")
+    remaining = {key[0] for key in cache._entries}
+    assert remaining == {"/", "/a/bb", "/d"}
+
+
+def test_revision_change_clears():
+    cache = MetadataCache()
+    cache.observe_revision(1)
+    cache.put(MetadataCache.key({"path": "/a"}), {})
+    cache.observe_revision(1)
+    assert len(cache) == 1
+    cache.observe_revision(2)
+    assert len(cache) == 0
@@ -0,0 +1,165 @@
+import pickle
+from datetime import datetime
+
+from Yandex.Disk.rest_api import (
+    CommentIds,
+    Disk,
+    FileShort,
+    PublicResource,
+    Resource,
+    ResourceLike,
+    ResourceList,
+    ResourceShort,
+    _request_plan,
+    compact,
+    projection,
+    slim,
+)
+from Yandex.Tests.fakes import FakeResponse, FakeTransport
+
+RESOURCE = {
+    "path": "disk:/d",
+    "name": "d",
+    "type": "dir",
+    "modified": "2024-01-02T03:04:05+00:00",
+    "views_count": 3,
+    "custom": "value",
+    "_embedded": {
+        "items": [
+            {"path": "disk:/d/a", "name": "a", "type": "file", "size": 1, "md5": "m1"},
+            {"path": "disk:/d/b", "name": "b", "type": "file", "size": 2, "md5": "m2"},
+        ],
+        "limit": 20,
+        "offset": 0,
+        "total": 2,
+    },
+}
+
+
+def resource_disk(**options) -> tuple[Disk, FakeTransport]:
+    transport = FakeTransport(lambda request: FakeResponse(200, RESOURCE))
+    return Disk("token", transport, **options), transport
+
+
+def test_keys_rename_is_merged_along_mro():
+    # PublicResource не объявляет keys_rename, _embedded -> embedded приходит от Resource
+    assert _request_plan(PublicResource)["_embedded"][0] == "embedded"
+    disk, _ = resource_disk()
+    resource = disk.info_public_resource("key")
+    assert isinstance(resource.embedded, ResourceList)
+    assert resource.views_count == 3
+    assert [item.path for item in resource.embedded.items] == ["disk:/d/a", "disk:/d/b"]
+
+
+def test_lazy_fields_decode_on_access_and_cache():
+    disk, _ = resource_disk(lazy_fields=True)
+    resource = disk.resource_info("/d")
+    assert resource.path == "disk:/d"
+    assert "modified" not in resource.__dict__
+    modified = resource.modified
+    assert modified == datetime.fromisoformat("2024-01-02T03:04:05+00:00")
+    assert resource.__dict__["modified"] is modified
+    assert resource.modified is modified
+    # Неизвестные модели ключи читаются как есть
+    assert resource.custom == "value"
+
+
+def test_projection_maps_attributes_to_response_keys():
+    assert projection(Resource, "path", "embedded.items.size") == "path,_embedded.items.size"
+    assert projection(Resource, "path", "path") == "path"
+    # Не объявленные в модели ключи проходят как есть
+    assert projection(Resource, "_embedded.total") == "_embedded.total"
+
+
+def test_slim_keeps_only_projected_fields():
+    disk, transport = resource_disk()
+    model = slim(Resource, "path", "embedded.items.size")
+    resource = disk.resource_info("/d", fields=model)
+    assert isinstance(resource, model) and isinstance(resource, Resource)
+    assert resource.path == "disk:/d"
+    assert transport.requests[0].params["fields"] == "path,_embedded.items.size"
+    assert not hasattr(resource, "name") and not hasattr(resource, "custom")
+    items = list(resource.embedded.items)
+    assert [item.size for item in items] == [1, 2]
+    assert not hasattr(items[0], "md5")
+
+
+def test_slim_with_lazy_fields():
+    disk, _ = resource_disk(lazy_fields=True)
+    resource = disk.resource_info("/d", fields=slim(Resource, "path", "modified"))
+    assert isinstance(resource.modified, datetime)
+    assert not hasattr(resource, "name")
+
+
+def test_fields_list_is_passed_as_response_keys():
+    disk, transport = resource_disk()
+    disk.resource_info("/d", fields=["path", "_embedded.items.path"]).path
+    assert transport.requests[0].params["fields"] == "path,_embedded.items.path"
+
+
+def test_compact_slim_pickles():
+    model = compact(slim(Resource, "path", "modified", "embedded.total"))
+    resource = model(None, RESOURCE)
+    assert set(model.__request_fields__) == {"path", "modified", "embedded"}
+    assert not hasattr(resource, "__dict__")
+    restored = pickle.loads(pickle.dumps(resource))
+    assert type(restored) is model
+    assert restored.path == "disk:/d" and restored.modified == resource.modified
+    assert restored.embedded.total == resource.embedded.total
+
+
+FILE = {
+    "path": "disk:/f",
+    "name": "f",
+    "type": "file",
+    "size": 5,
+    "md5": "m",
+    "unknown": 1,
+    "comment_ids": {"private_resource": "p", "public_resource": "q"},
+}
+
+
+def test_compact_instances():
+    model = compact(FileShort)
+    item = model(None, FILE)
+    assert model.__compact_of__ is FileShort
+    assert isinstance(item, ResourceLike) and not isinstance(item, FileShort)
+    assert not hasattr(item, "__dict__") and not hasattr(item, "unknown")
+    assert (item.path, item.size, item.md5) == ("disk:/f", 5, "m")
+    assert not hasattr(item, "_request")
+    # Вложенная модель тоже компактная
+    assert type(item.comment_ids) is compact(CommentIds)
+    assert item.comment_ids.private_resource == "p"
+    assert not hasattr(item.comment_ids, "__dict__")
+
+
+def test_compact_pickles_and_keeps_request():
+    item = compact(FileShort)(None, FILE)
+    restored = pickle.loads(pickle.dumps(item))
+    assert type(restored) is compact(FileShort)
+    assert (restored.path, restored.size, restored.comment_ids.public_resource) == ("disk:/f", 5, "q")
+
+    request = object()
+    kept = compact(FileShort, keep_request=True)(request, FILE)
+    assert kept._request is request
+    assert type(pickle.loads(pickle.dumps(kept))) is compact(FileShort, keep_request=True)
+
+
+def test_compact_item_is_accepted_as_path():
+    disk, transport = resource_disk()
+    item = compact(FileShort)(None, FILE)
+    disk.resource_info(item).path
+    assert transport.requests[0].params["path"] == "disk:/f"
+
+
+def test_models_allow_other_metaclasses():
+    class Meta(type):
+        ...
+
+    class Mixin(metaclass=Meta):
+        ...
+
+    class Custom(ResourceShort, Mixin):
+        ...
+
+    assert isinstance(Custom(None, FILE), ResourceLike)
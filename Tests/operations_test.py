@@ -0,0 +1,52 @@
+import collections
+import threading
+
+from Yandex.Disk.operations import OperationWaiter, operation_id_of
+
+
+class FakeDisk:
+    def __init__(self, polls_left: dict[str, int]):
+        self.polls_left = polls_left
+        self.polls = collections.Counter()
+        self.lock = threading.Lock()
+
+    def status_operation(self, operation_id):
+        with self.lock:
+            self.polls[operation_id] += 1
+            if operation_id == "broken":
+                raise OSError("broken")
+            if operation_id == "failing":
+                return "failed"
+            left = self.polls_left[operation_id] - self.polls[operation_id]
+        return "success" if left <= 0 else "in-progress"
+
+
+def test_operation_id_of_href():
+    class Link:
+        href = "https://cloud-api.yandex.net/v1/disk/operations/abc123"
+
+    assert operation_id_of(Link()) == "abc123"
+    assert operation_id_of("abc") == "abc"
+    assert operation_id_of(None) is None
+
+
+def test_wait_many_returns_terminal_statuses():
+    disk = FakeDisk({f"op{i}": i % 3 + 1 for i in range(50)} | {"slow": 10**9})
+    waiter = OperationWaiter(disk, initial_delay=0.001, max_delay=0.01, max_workers=4)
+    operations = [f"op{i}" for i in range(50)] + ["failing", "broken", "slow", None]
+    results = {result.operation_id: result for result in waiter.wait_many(operations, timeout=0.3)}
+
+    assert all(results[f"op{i}"].ok and results[f"op{i}"].polls == i % 3 + 1 for i in range(50))
+    assert results["failing"].status == "failed"
+    assert results["broken"].status == "error" and isinstance(results["broken"].error, OSError)
+    assert results["slow"].status == "timeout" and results["slow"].elapsed >= 0.3
+    assert results[None].ok
+
+
+def test_backoff_grows_up_to_max_delay():
+    disk = FakeDisk({"op": 10**9})
+    waiter = OperationWaiter(disk, initial_delay=0.01, max_delay=0.04, jitter=0)
+    result = waiter.wait("op", timeout=0.2)
+    # 0, 0.01, 0.03, 0.07, 0.11, 0.15, 0.19, 0.2
+    assert result.status == "timeout"
+    assert 6 <= result.polls <= 9
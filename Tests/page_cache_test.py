@@ -0,0 +1,28 @@
+from Yandex.Disk.page_cache import PageCache
+
+
+def test_evicts_least_recently_used_page():
+    cache = PageCache(max_pages=2, max_bytes=None)
+    cache.put(1, {"page": 1})
+    cache.put(2, {"page": 2})
+    assert cache.get(1) == {"page": 1}
+    cache.put(3, {"page": 3})
+    assert 2 not in cache
+    assert 1 in cache and 3 in cache
+
+
+def test_byte_budget():
+    cache = PageCache(max_pages=None, max_bytes=100)
+    for page in range(5):
+        cache.put(page, {"page": page}, size=40)
+    assert len(cache) == 2
+    assert cache.size == 80
+    cache.put(9, {"page": 9}, size=500)
+    assert 9 not in cache
+
+
+def test_stream_keeps_nothing():
+    cache = PageCache.stream()
+    cache.put(1, {"page": 1}, size=10)
+    assert len(cache) == 0
+    assert cache.get(1) is None
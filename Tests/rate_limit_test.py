@@ -0,0 +1,57 @@
+import time
+
+from Yandex.Disk.rate_limit import RateLimiter, retry_after
+from Yandex.Disk.rest_api import Disk
+from Yandex.Tests.fakes import FakeResponse, FakeTransport
+
+
+def test_retry_after_header():
+    assert retry_after({"Retry-After": "2"}) == 2.0
+    assert retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) is None
+    assert retry_after({}) is None
+
+
+def test_token_bucket_limits_rate():
+    limiter = RateLimiter(rate=100, burst=1)
+    started = time.monotonic()
+    for _ in range(21):
+        limiter.acquire()
+        limiter.release()
+    assert time.monotonic() - started >= 0.19
+
+
+def test_aimd_concurrency_and_limit():
+    limiter = RateLimiter(rate=None, max_concurrency=8, backoff=0)
+    limiter.acquire()
+    limiter.release(throttled=True, retry_after=0, limit=5)
+    assert limiter.concurrency == 4
+    assert limiter.rate == 5 and limiter.burst == 5
+    assert limiter.throttled == 1
+
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release()
+    assert 4.8 < limiter.concurrency < 5
+
+
+def test_retry_after_pauses_requests():
+    limiter = RateLimiter(rate=None)
+    limiter.acquire()
+    limiter.release(throttled=True, retry_after=0.1)
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_throttle_response_with_html_body_is_retried():
+    responses = iter([
+        FakeResponse(503, content=b"<html>Service Unavailable</html>"),
+        FakeResponse(429, content=b"<html>Too Many Requests</html>", headers={"Retry-After": "0"}),
+        FakeResponse(200, {"total_space": 1}),
+    ])
+    limiter = RateLimiter(rate=None, max_concurrency=8, backoff=0)
+    transport = FakeTransport(lambda request: next(responses))
+    disk = Disk("token", transport, rate_limiter=limiter)
+    assert disk.info().total_space == 1
+    assert len(transport.requests) == 3
+    assert limiter.throttled == 2 and limiter.concurrency < 8
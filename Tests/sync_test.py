@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from Yandex.Disk.rest_api import Disk, RequestError
+from Yandex.Disk.sync import plan_sync
+from Yandex.Tests.fakes import FakeTransport, FakeTree
+
+OLD = "2000-01-01T00:00:00+00:00"
+NEW = "2100-01-01T00:00:00+00:00"
+
+
+@pytest.fixture
+def local_dir(tmp_path):
+    root = tmp_path / "local"
+    (root / "sub").mkdir(parents=True)
+    (root / "same.txt").write_bytes(b"same")
+    (root / "changed.txt").write_bytes(b"local version")
+    (root / "sub" / "new.txt").write_bytes(b"new")
+    return str(root)
+
+
+@pytest.fixture
+def tree():
+    tree = FakeTree()
+    tree.add("/backup", "dir")
+    tree.add("/backup/same.txt", content=b"same", modified=OLD)
+    tree.add("/backup/changed.txt", content=b"remote version", modified=OLD)
+    tree.add("/backup/old", "dir")
+    tree.add("/backup/old/gone.txt", content=b"gone", modified=OLD)
+    return tree
+
+
+def actions(plan) -> list[tuple[str, str]]:
+    return [(action.kind, action.path) for action in plan.actions]
+
+
+def make_disk(tree: FakeTree) -> Disk:
+    return Disk("token", FakeTransport(tree.handler))
+
+
+def test_upload_creates_updates_and_deletes(tree, local_dir):
+    plan = plan_sync(make_disk(tree), local_dir, "/backup", "upload", delete=True)
+    assert actions(plan) == [
+        ("upload", "changed.txt"),
+        ("mkdir_remote", "sub"),
+        ("upload", "sub/new.txt"),
+        # Папка удаляется целиком, без отдельного удаления вложенного файла
+        ("delete_remote", "old"),
+    ]
+    assert plan.unchanged == 1
+    assert plan.transfer_bytes == len(b"local version") + len(b"new")
+
+
+def test_both_moves_newer_copy_without_deletes(tree, local_dir):
+    tree.add("/backup/changed.txt", content=b"remote version", modified=NEW)
+    plan = plan_sync(make_disk(tree), local_dir, "/backup", "both", delete=True)
+    assert actions(plan) == [
+        ("download", "changed.txt"),
+        ("mkdir_local", "old"),
+        ("download", "old/gone.txt"),
+        ("mkdir_remote", "sub"),
+        ("upload", "sub/new.txt"),
+    ]
+
+
+def test_download_deletes_local_extras(tree, local_dir):
+    plan = plan_sync(make_disk(tree), local_dir, "/backup", "download", delete=True)
+    assert actions(plan) == [
+        ("download", "changed.txt"),
+        ("mkdir_local", "old"),
+        ("download", "old/gone.txt"),
+        ("delete_local", "sub"),
+    ]
+
+
+def test_missing_destination_is_created(tree, local_dir, tmp_path):
+    plan = plan_sync(make_disk(tree), local_dir, "/absent", "upload", delete=True)
+    assert actions(plan)[0] == ("mkdir_remote", "")
+    assert ("upload", "same.txt") in actions(plan)
+
+    target = str(tmp_path / "copy")
+    plan = plan_sync(make_disk(tree), target, "/backup", "download", delete=True)
+    assert actions(plan)[0] == ("mkdir_local", "")
+    assert not any(kind.startswith("delete") for kind, _ in actions(plan))
+
+
+def test_missing_source_is_an_error(tree, local_dir, tmp_path):
+    with pytest.raises(RequestError):
+        plan_sync(make_disk(tree), local_dir, "/misspelled", "download", delete=True)
+    assert os.path.exists(os.path.join(local_dir, "same.txt"))
+
+    with pytest.raises(FileNotFoundError):
+        plan_sync(make_disk(tree), str(tmp_path / "misspelled"), "/backup", "upload", delete=True)
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+from Yandex.Disk.timestamps import convert, parse_datetime, to_datetime, to_epoch
+
+
+def test_parse_offsets():
+    assert parse_datetime("2019-08-13T12:52:22+00:00") == datetime(
+        2019, 8, 13, 12, 52, 22, tzinfo=timezone.utc
+    )
+    assert parse_datetime("2023-01-02T03:04:05.123+03:00") == datetime(
+        2023, 1, 2, 0, 4, 5, 123000, tzinfo=timezone.utc
+    )
+    assert parse_datetime("2023-01-02T03:04:05Z").utcoffset() == timedelta(0)
+    assert parse_datetime("2023-01-02T03:04:05-05:30").utcoffset() == -timedelta(hours=5, minutes=30)
+
+
+def test_timezone_objects_are_shared():
+    first = parse_datetime("2023-01-02T03:04:05+03:00")
+    second = parse_datetime("2024-05-06T07:08:09+03:00")
+    assert first.tzinfo is second.tzinfo
+
+
+def test_modes():
+    value = "2019-08-13T12:52:22+00:00"
+    assert convert(value, "string") is value
+    assert convert(value, "epoch") == 1565700742
+    assert convert(value) == to_datetime(1565700742)
+    assert to_epoch(convert(value)) == 1565700742
@@ -0,0 +1,67 @@
+import threading
+from types import SimpleNamespace
+
+from Yandex.Disk.transfers import TransferManager
+
+
+class FakeDisk:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def upload(self, remote_pathname, local_pathname, progress_fn=None, **options):
+        with self.lock:
+            self.calls.append(("upload", remote_pathname, options))
+        if remote_pathname == "/fail":
+            raise OSError("fail")
+        progress_fn(1)
+        return SimpleNamespace(skipped=False)
+
+    def download_file(self, remote_pathname, local_pathname, progress_fn=None, **options):
+        with self.lock:
+            self.calls.append(("download", remote_pathname, options))
+
+
+def test_transfer_manager_orders_by_size_and_aggregates(tmp_path):
+    disk = FakeDisk()
+    seen = []
+    manager = TransferManager(
+        disk, max_workers=1, split_size=100, progress_fn=lambda job, stats: seen.append(job)
+    )
+    for name, size in [("small", 1), ("big", 50), ("fail", 2)]:
+        (tmp_path / name).write_bytes(b"x" * size)
+        manager.add_upload(str(tmp_path / name), "/" + name, overwrite=True)
+    manager.add_download("/huge", str(tmp_path / "huge"), size=1000)
+
+    results = list(manager.run())
+    assert [call[1] for call in disk.calls] == ["/huge", "/big", "/fail", "/small"]
+    assert disk.calls[0][2] == {"connections": 4}
+    assert disk.calls[1][2] == {"overwrite": True}
+    assert [result.key.remote_pathname for result in results if not result.ok] == ["/fail"]
+    assert manager.stats.completed == 3 and manager.stats.failed == 1
+    assert manager.stats.transferred == 1000 + 50 + 1
+    assert manager.stats.total_bytes == 1000 + 50 + 2 + 1
+    assert seen
+
+
+def test_failed_jobs_do_not_stop_run_and_stats_add_up(tmp_path):
+    disk = FakeDisk()
+    manager = TransferManager(disk, max_workers=3)
+    sizes = {"a": 3, "fail": 5, "b": 7, "c": 11}
+    for name, size in sizes.items():
+        (tmp_path / name).write_bytes(b"x" * size)
+        manager.add_upload(str(tmp_path / name), "/" + name)
+    manager.add_download("/d", str(tmp_path / "d"), size=13)
+
+    results = list(manager.run())
+    assert len(results) == 5
+    failed = [result for result in results if not result.ok]
+    assert [result.key.remote_pathname for result in failed] == ["/fail"]
+    assert isinstance(failed[0].error, OSError)
+    stats = manager.stats
+    assert (stats.files, stats.completed, stats.failed) == (5, 4, 1)
+    assert stats.total_bytes == 3 + 5 + 7 + 11 + 13
+    # Упавшее задание ничего не передало
+    assert stats.transferred == 3 + 7 + 11 + 13
+    assert stats.finished is not None and stats.throughput > 0
+    assert manager.jobs == []
@@ -0,0 +1,119 @@
+import hashlib
+import os
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from Yandex.Disk.rest_api import Disk
+from Yandex.Disk.upload import UploadError, upload_file
+from Yandex.Tests.fakes import FakeResponse, FakeTransport, error
+
+DATA = os.urandom(10_000)
+
+
+def links():
+    count = 0
+
+    def get_link():
+        nonlocal count
+        count += 1
+        return SimpleNamespace(href=f"https://ul.test/{count}", operation_id=f"op{count}")
+
+    return get_link
+
+
+@pytest.fixture
+def local_file(tmp_path):
+    pathname = tmp_path / "file"
+    pathname.write_bytes(DATA)
+    return str(pathname)
+
+
+def test_retries_temporary_error_without_probing_offset(local_file):
+    responses = iter([FakeResponse(503), FakeResponse(201)])
+
+    def handler(request):
+        assert request.body() == DATA
+        return next(responses)
+
+    transport = FakeTransport(handler)
+    result = upload_file(transport, links(), local_file, backoff=0)
+    assert result.ok and result.attempts == 2 and result.resumed_bytes == 0
+    # Без resume пустой PUT с Content-Range: bytes */size не отправляется
+    assert all("Content-Range" not in r.headers for r in transport.requests)
+
+
+def test_relinks_when_link_expired(local_file):
+    def handler(request):
+        request.body()
+        return FakeResponse(404 if request.url.endswith("/1") else 201)
+
+    transport = FakeTransport(handler)
+    result = upload_file(transport, links(), local_file, backoff=0)
+    assert result.ok and result.operation_id == "op2"
+    assert [r.url for r in transport.requests] == ["https://ul.test/1", "https://ul.test/2"]
+
+
+def test_resumes_from_acknowledged_offset(local_file):
+    received = bytearray()
+
+    def handler(request):
+        content_range = request.headers.get("Content-Range")
+        if content_range == f"bytes */{len(DATA)}":
+            return FakeResponse(308, headers={"Range": f"bytes=0-{len(received) - 1}"})
+        body = request.body()
+        if not received:
+            received.extend(body[:4000])
+            raise requests.ConnectionError("reset")
+        assert content_range == f"bytes 4000-{len(DATA) - 1}/{len(DATA)}"
+        received.extend(body)
+        return FakeResponse(201)
+
+    result = upload_file(FakeTransport(handler), links(), local_file, backoff=0, resume=True)
+    assert result.ok and result.attempts == 2 and result.resumed_bytes == 4000
+    assert bytes(received) == DATA
+
+
+def test_gives_up_after_retries(local_file):
+    def handler(request):
+        request.body()
+        return FakeResponse(500)
+
+    transport = FakeTransport(handler)
+    with pytest.raises(UploadError):
+        upload_file(transport, links(), local_file, retries=2, backoff=0)
+    assert len(transport.requests) == 3
+
+
+def test_permanent_error_is_not_retried(local_file):
+    transport = FakeTransport(lambda request: FakeResponse(413))
+    with pytest.raises(UploadError):
+        upload_file(transport, links(), local_file, backoff=0)
+    assert len(transport.requests) == 1
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_skip_identical(local_file, lazy):
+    remote = {}
+
+    def handler(request):
+        if request.path == "/v1/disk/resources":
+            if not remote:
+                return error(404, "DiskNotFoundError")
+            return FakeResponse(200, {"type": "file", **remote})
+        if request.path == "/v1/disk/resources/upload":
+            return FakeResponse(200, {"href": "https://ul.test/1", "operation_id": "op1"})
+        remote.update(
+            size=len(DATA),
+            md5=hashlib.md5(DATA).hexdigest(),
+            sha256=hashlib.sha256(DATA).hexdigest(),
+        )
+        assert request.body() == DATA
+        return FakeResponse(201)
+
+    disk = Disk("token", FakeTransport(handler), lazy=lazy)
+    first = disk.upload("/file", local_file, skip_identical=True)
+    assert first.ok and not first.skipped
+    second = disk.upload("/file", local_file, skip_identical=True)
+    assert second.ok and second.skipped and second.size == len(DATA)
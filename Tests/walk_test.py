@@ -0,0 +1,40 @@
+import pytest
+
+from Yandex.Disk.rest_api import Disk
+from Yandex.Tests.fakes import FakeTransport, FakeTree
+
+
+@pytest.fixture
+def tree():
+    tree = FakeTree()
+    for path in ["/a", "/a/x", "/a/x/y", "/b"]:
+        tree.add(path, "dir")
+    for path in ["/a/1", "/a/x/2", "/a/x/y/3", "/b/4", "/5"]:
+        tree.add(path)
+    return tree
+
+
+def walked(disk: Disk, **options) -> list[str]:
+    return [resource.path.removeprefix("disk:") for resource in disk.walk("/", **options)]
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_walk_bfs_and_dfs(tree, lazy):
+    disk = Disk("token", FakeTransport(tree.handler), page_size=2, lazy=lazy)
+    assert walked(disk, max_workers=3) == [
+        "/5", "/a", "/b", "/a/1", "/a/x", "/b/4", "/a/x/2", "/a/x/y", "/a/x/y/3"
+    ]
+    assert walked(disk, order="dfs") == [
+        "/5", "/a", "/b", "/a/1", "/a/x", "/a/x/2", "/a/x/y", "/a/x/y/3", "/b/4"
+    ]
+    assert walked(disk, max_depth=1) == ["/5", "/a", "/b"]
+    assert walked(disk, filter=lambda resource: resource.name != "x") == [
+        "/5", "/a", "/b", "/a/1", "/b/4"
+    ]
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_walk_skips_folder_deleted_during_walk(tree, lazy):
+    tree.hidden.add("/a/x")
+    disk = Disk("token", FakeTransport(tree.handler), lazy=lazy)
+    assert walked(disk) == ["/5", "/a", "/b", "/a/1", "/a/x", "/b/4"]